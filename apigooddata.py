@@ -1,9 +1,66 @@
 import requests
-from requests.exceptions import ConnectionError, RequestException
+import os
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, RequestException, Timeout
 import socket
 import re
 import json
 import time
+import threading
+import random
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from response_parser import parse_export_artifact, parse_json_text
+from metrics import METRICS
+from ratelimit import RATE_LIMITER
+import logging
+
+BASE_URL = os.environ.get("GOODDATA_BASE_URL", "https://analytics.moveresoftware.com")
+DEFAULT_HEADERS = {
+    "User-Agent": "MyApp/1.0 (Python)",
+    "Connection": "keep-alive"
+}
+JSON_ACCEPT = {"Accept": "application/json"}
+DEFAULT_POOL_SIZE = 10
+STREAM_CHUNK_SIZE = 64 * 1024
+OBJECTS_PAGE_SIZE = 500
+AUTH_PATHS = ("/gdc/account/login", "/gdc/account/token")
+
+logger = logging.getLogger("apigooddata")
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+class GoodDataAPIError(Exception):
+    """Erro da API com o status HTTP preservado, para decidir retries sem olhar o texto."""
+
+    def __init__(self, message, status_code=None, token_expired=False, transient=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.token_expired = token_expired
+        if transient is None:
+            transient = status_code in RETRYABLE_STATUS
+        self.transient = transient
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_request_exception(cls, message, e, **kwargs):
+        status_code = e.response.status_code if e.response is not None else None
+        transient = True if isinstance(e, (ConnectionError, Timeout)) else None
+        if e.response is not None and "retry_after" not in kwargs:
+            kwargs["retry_after"] = parse_retry_after(e.response.headers.get("Retry-After"))
+        return cls(message, status_code=status_code, transient=transient, **kwargs)
+
+def endpoint_class(path):
+    """Classe do endpoint (account, export, import, status, metadata), usada em métricas e limites."""
+    if path.startswith("/gdc/account"):
+        return "account"
+    if path.endswith("/partialmdexport"):
+        return "export"
+    if path.endswith("/partialmdimport"):
+        return "import"
+    if "/tasks/" in path and path.endswith("/status"):
+        return "status"
+    return "metadata"
 
 def test_dns_resolution(hostname):
     try:
@@ -12,174 +69,443 @@ def test_dns_resolution(hostname):
     except socket.gaierror:
         return False
 
-def login_gooddata(login, senha):
-    url = "https://analytics.moveresoftware.com/gdc/account/login"
-    payload = {
-        "postUserLogin": {
-            "login": login,
-            "password": senha,
-            "remember": 1
-        }
-    }
-    headers = {
-        "User-Agent": "MyApp/1.0 (Python)",
-        "Content-Type": "application/json"
-    }
-    response = requests.post(url, json=payload, headers=headers, timeout=10)
-    response.raise_for_status()
-    print("Login bem-sucedido!")
-    return response.cookies 
+def parse_retry_after(value):
+    """Converte o header Retry-After (segundos ou data HTTP) em segundos."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        quando = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, quando.timestamp() - time.time())
 
-def is_user_admin(cookies):
-    """Verifica se o usuário tem permissões de administrador"""
+def parse_export_token(html_text):
+    """Extrai o token do `<pre>` devolvido pelo partialmdexport."""
+    return _export_artifact_from_chunks((html_text,))[0]
+
+def _export_artifact_from_chunks(chunks):
     try:
-        profile_url = "https://analytics.moveresoftware.com/gdc/account/profile/current"
-        headers = {
-            "User-Agent": "MyApp/1.0 (Python)",
-            "Accept": "application/json"
+        token, status_uri = parse_export_artifact(chunks)
+    except ValueError as e:
+        raise GoodDataAPIError(f"Não foi possível extrair o JSON da resposta: {e}", transient=False)
+    if not token:
+        raise GoodDataAPIError("Token de exportação não encontrado.", transient=False)
+    return token, status_uri
+
+class GoodDataClient:
+    """Cliente da API GoodData com uma única `requests.Session`.
+
+    A sessão mantém um pool de conexões keep-alive, evitando um novo handshake
+    TLS a cada chamada (principalmente no polling de status). Cada chamada passa
+    pelo `limiter` (taxa e concorrência por classe de endpoint, compartilhados
+    por todas as threads), que se ajusta aos 429/503 do servidor.
+    """
+
+    def __init__(self, base_url=None, pool_size=DEFAULT_POOL_SIZE, session=None):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.auth = None
+        self.metrics = METRICS
+        self.limiter = RATE_LIMITER
+        # Prioridade pedida às tarefas de importação; None omite o header (jobs de fila em segundo plano).
+        self.task_priority = "high"
+
+    @property
+    def hostname(self):
+        return urlsplit(self.base_url).hostname
+
+    @property
+    def port(self):
+        partes = urlsplit(self.base_url)
+        return partes.port or (80 if partes.scheme == "http" else 443)
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def request(self, method, path, **kwargs):
+        """Envia a requisição; com um `auth` (AuthManager) anexa o TT e repete uma vez após um 401."""
+        auth = self.auth
+        if auth is None or path.startswith(AUTH_PATHS):
+            return self._send(method, path, **kwargs)
+        headers = dict(kwargs.pop("headers", None) or {})
+        tt = auth.token()
+        response = self._send(method, path, headers={**headers, **auth.headers(tt)}, **kwargs)
+        if response.status_code == 401:
+            response.close()
+            tt = auth.refresh(expired=tt)
+            response = self._send(method, path, headers={**headers, **auth.headers(tt)}, **kwargs)
+        return response
+
+    def _send(self, method, path, **kwargs):
+        """Executa a requisição dentro do limite da classe do endpoint e informa o status ao limitador."""
+        endpoint = endpoint_class(path)
+        limiter = self.limiter
+        if limiter is None:
+            return self._measured_send(method, path, endpoint, **kwargs)
+        with limiter.slot(endpoint):
+            response = self._measured_send(method, path, endpoint, **kwargs)
+        limiter.feedback(endpoint, response.status_code, parse_retry_after(response.headers.get("Retry-After")))
+        return response
+
+    def _measured_send(self, method, path, endpoint, **kwargs):
+        """Executa a requisição registrando duração, tempo até os headers e bytes em `self.metrics`."""
+        metrics = self.metrics
+        if metrics is None:
+            return self.session.request(method, self.url(path), **kwargs)
+        metrics.measure_dns(self.hostname, self.port)
+        inicio = time.time()
+        t0 = time.perf_counter()
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+        except RequestException as e:
+            metrics.record_request(method, endpoint, "error", inicio, time.perf_counter() - t0,
+                                   path=path, error=type(e).__name__)
+            raise
+        body = response.request.body
+        enviados = len(body) if body else 0
+        if kwargs.get("stream"):
+            recebidos = int(response.headers.get("Content-Length") or 0)
+        else:
+            recebidos = len(response.content)
+        metrics.record_request(method, endpoint, response.status_code, inicio, time.perf_counter() - t0,
+                               ttfb=response.elapsed.total_seconds(), bytes_sent=enviados,
+                               bytes_received=recebidos, path=path,
+                               error=None if response.status_code < 400 else f"HTTP {response.status_code}")
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def login(self, login, senha):
+        payload = {
+            "postUserLogin": {
+                "login": login,
+                "password": senha,
+                "remember": 1
+            }
         }
-        response = requests.get(profile_url, headers=headers, cookies=cookies, timeout=10)
+        response = self.post("/gdc/account/login", json=payload, timeout=10)
         response.raise_for_status()
-        profile_data = response.json()
-        permissions = profile_data.get('accountSetting', {}).get('permissions', [])
-        return 'admin' in permissions or 'manage' in permissions
-    except Exception as e:
-        print(f"Erro ao verificar permissões: {str(e)}")
-        return False
+        logger.info("Login bem-sucedido!")
+        return response.cookies
 
-def get_workspace_name(workspace_id, cookies):
-    url = f"https://analytics.moveresoftware.com/gdc/projects/{workspace_id}"
-    headers = {
-        "User-Agent": "MyApp/1.0 (Python)",
-        "Accept": "application/json"
-    }
-    try:
-        response = requests.get(url, headers=headers, cookies=cookies, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return data['project']['meta']['title']
-    except RequestException as e:
-        raise Exception(f"Erro ao buscar workspace: {str(e)}")
+    def is_user_admin(self, cookies):
+        """Verifica se o usuário tem permissões de administrador"""
+        try:
+            response = self.get("/gdc/account/profile/current", headers=JSON_ACCEPT, cookies=cookies, timeout=10)
+            response.raise_for_status()
+            profile_data = response.json()
+            permissions = profile_data.get('accountSetting', {}).get('permissions', [])
+            return 'admin' in permissions or 'manage' in permissions
+        except Exception as e:
+            logger.warning("Erro ao verificar permissões: %s", e)
+            return False
 
-def export_partial_metadata(workspace_id, report_url, cookies, exportAttributeProperties=0, crossDataCenterExport=0):
-    url = f"https://analytics.moveresoftware.com/gdc/md/{workspace_id}/maintenance/partialmdexport"
-    headers = {
-        "User-Agent": "MyApp/1.0 (Python)",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "partialMDExport": {
-            "uris": [report_url],
-            "exportAttributeProperties": int(exportAttributeProperties),
-            "crossDataCenterExport": int(crossDataCenterExport)
+    def get_workspace_name(self, workspace_id, cookies):
+        try:
+            response = self.get(f"/gdc/projects/{workspace_id}", headers=JSON_ACCEPT, cookies=cookies, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            return data['project']['meta']['title']
+        except RequestException as e:
+            raise GoodDataAPIError.from_request_exception(f"Erro ao buscar workspace: {str(e)}", e)
+
+    def get_workspace_meta(self, workspace_id, cookies, etag=None, last_modified=None):
+        """GET condicional do workspace.
+
+        Retorna (título, etag, last_modified); o título é None quando o servidor
+        responde 304 (a versão em cache continua válida).
+        """
+        headers = dict(JSON_ACCEPT)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            response = self.get(f"/gdc/projects/{workspace_id}", headers=headers, cookies=cookies, timeout=10)
+            if response.status_code == 304:
+                return None, etag, last_modified
+            response.raise_for_status()
+            titulo = response.json()['project']['meta']['title']
+            return titulo, response.headers.get("ETag"), response.headers.get("Last-Modified")
+        except RequestException as e:
+            raise GoodDataAPIError.from_request_exception(f"Erro ao buscar workspace: {str(e)}", e)
+
+    def list_user_projects(self, cookies):
+        """Lista (id, título) de todos os workspaces do usuário logado em uma única chamada."""
+        try:
+            response = self.get("/gdc/account/profile/current", headers=JSON_ACCEPT, cookies=cookies, timeout=10)
+            response.raise_for_status()
+            profile_uri = response.json()["accountSetting"]["links"]["self"]
+            response = self.get(f"{profile_uri}/projects", headers=JSON_ACCEPT, cookies=cookies, timeout=30)
+            response.raise_for_status()
+            projetos = []
+            for item in response.json().get("projects", []):
+                projeto = item.get("project", {})
+                workspace_id = projeto.get("links", {}).get("self", "").rstrip("/").rsplit("/", 1)[-1]
+                if workspace_id:
+                    projetos.append((workspace_id, projeto.get("meta", {}).get("title", "")))
+            return projetos
+        except RequestException as e:
+            raise GoodDataAPIError.from_request_exception(f"Erro ao listar workspaces: {str(e)}", e)
+
+    def export_partial_metadata(self, workspace_id, report_url, cookies, exportAttributeProperties=0, crossDataCenterExport=0):
+        """Exporta um ou mais objetos. `report_url` pode ser uma URI ou uma lista de URIs."""
+        return self.export_partial_metadata_artifact(workspace_id, report_url, cookies,
+                                                     exportAttributeProperties, crossDataCenterExport)[0]
+
+    def export_partial_metadata_artifact(self, workspace_id, report_url, cookies, exportAttributeProperties=0, crossDataCenterExport=0):
+        """Como export_partial_metadata, mas retorna (token, uri da tarefa de exportação)."""
+        uris = [report_url] if isinstance(report_url, str) else list(report_url)
+        payload = {
+            "partialMDExport": {
+                "uris": uris,
+                "exportAttributeProperties": int(exportAttributeProperties),
+                "crossDataCenterExport": int(crossDataCenterExport)
+            }
         }
-    }
-    try:
-        response = requests.post(url, headers=headers, cookies=cookies, json=payload, timeout=15)
-        response.raise_for_status()
-        match = re.search(r"<pre>(.*?)</pre>", response.text, re.DOTALL)
-        if not match:
-            raise Exception("Não foi possível extrair o JSON da resposta.")
-        json_str = match.group(1)
-        json_str = re.sub(r'<.*?>', '', json_str)
-        json_str = json_str.replace('&#x22;', '"')
-        data = json.loads(json_str)
-        token = data.get('partialMDArtifact', {}).get('token')
-        if not token:
-            raise Exception("Token de exportação não encontrado.")
-        return token
-    except RequestException as e:
-        if e.response is not None:
-            print("Resposta da API:", e.response.text)
-        raise Exception(f"Erro ao exportar metadados: {str(e)}")
+        try:
+            response = self.post(f"/gdc/md/{workspace_id}/maintenance/partialmdexport",
+                                 cookies=cookies, json=payload, timeout=15, stream=True)
+            try:
+                if response.status_code >= 400:
+                    # Com stream=True o corpo só é lido sob demanda; lê o erro antes de fechar.
+                    response.content
+                response.raise_for_status()
+                return _export_artifact_from_chunks(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+            finally:
+                response.close()
+        except RequestException as e:
+            if e.response is not None and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Resposta da API: %s", e.response.text)
+            raise GoodDataAPIError.from_request_exception(f"Erro ao exportar metadados: {str(e)}", e)
 
-def import_partial_metadata(workspace_id_destino, token, cookies, overwriteNewer=0, updateLDMObjects=0, importAttributeProperties=0):
-    url = f"https://analytics.moveresoftware.com/gdc/md/{workspace_id_destino}/maintenance/partialmdimport"
-    
-    # Headers essenciais
-    headers = {
-        "User-Agent": "MyApp/1.0 (Python)",
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "X-GDC-TASK-PRIORITY": "high"
-    }
-    
-    # Payload mínimo e correto conforme documentação
-    payload = {
-        "partialMDImport": {
-            "token": token,
-            "overwriteNewer": bool(overwriteNewer),
-            "updateLDMObjects": bool(updateLDMObjects),
-            "importAttributeProperties": bool(importAttributeProperties)
+    def import_partial_metadata(self, workspace_id_destino, token, cookies, overwriteNewer=0, updateLDMObjects=0, importAttributeProperties=0):
+        # Headers essenciais
+        headers = {"Accept": "application/json"}
+        if self.task_priority:
+            headers["X-GDC-TASK-PRIORITY"] = self.task_priority
+
+        # Payload mínimo e correto conforme documentação
+        payload = {
+            "partialMDImport": {
+                "token": token,
+                "overwriteNewer": bool(overwriteNewer),
+                "updateLDMObjects": bool(updateLDMObjects),
+                "importAttributeProperties": bool(importAttributeProperties)
+            }
         }
-    }
-    
-    try:
-        # Debug do payload antes do envio
-        print(f"\n[DEBUG] Payload final para importação:")
-        print(json.dumps(payload, indent=2))
-        
-        response = requests.post(
-            url,
-            headers=headers,
-            cookies=cookies,
-            json=payload,
-            timeout=30
-        )
 
-        # Debug da resposta
-        print(f"\n[DEBUG] Resposta da API (status {response.status_code}): {response.text}")
+        try:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Payload final para importação: %s", json.dumps(payload))
 
-        # Tratamento de respostas
-        if response.status_code == 200:
-            try:
-                return response.json()
-            except ValueError:
-                return {"status": "success", "message": "Importação realizada mas resposta inválida"}
-        
-        if response.status_code == 400:
-            error_msg = response.json().get("error", {}).get("message", "Erro na requisição")
-            if "STRUCTURE INVALID" in error_msg:
-                raise Exception("Estrutura do payload inválida - remova parâmetros redundantes")
-            raise Exception(f"Erro na requisição: {error_msg}")
-        
-        response.raise_for_status()
+            response = self.post(
+                f"/gdc/md/{workspace_id_destino}/maintenance/partialmdimport",
+                headers=headers,
+                cookies=cookies,
+                json=payload,
+                timeout=30
+            )
 
-    except Exception as e:
-        error_msg = f"Erro na importação: {str(e)}"
-        if hasattr(e, 'response') and e.response:
-            error_msg += f"\nStatus: {e.response.status_code}\nResposta: {e.response.text[:500]}"
-        raise Exception(error_msg)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Resposta da API (status %s): %s", response.status_code, response.text)
+
+            # Tratamento de respostas
+            if response.status_code == 200:
+                try:
+                    return response.json()
+                except ValueError:
+                    return {"status": "success", "message": "Importação realizada mas resposta inválida"}
+
+            if response.status_code == 400:
+                error_msg = response.json().get("error", {}).get("message", "Erro na requisição")
+                if "STRUCTURE INVALID" in error_msg:
+                    raise GoodDataAPIError("Erro na importação: Estrutura do payload inválida - remova parâmetros redundantes",
+                                           status_code=400)
+                raise GoodDataAPIError(f"Erro na importação: Erro na requisição: {error_msg}", status_code=400,
+                                       token_expired="no longer available" in error_msg.lower())
+
+            response.raise_for_status()
+
+        except RequestException as e:
+            error_msg = f"Erro na importação: {str(e)}"
+            if e.response is not None:
+                error_msg += f"\nStatus: {e.response.status_code}\nResposta: {e.response.text[:500]}"
+            expired = e.response is not None and (e.response.status_code == 410 or
+                                                  "no longer available" in e.response.text.lower())
+            raise GoodDataAPIError.from_request_exception(error_msg, e, token_expired=expired)
+
+    def get_import_status(self, workspace_id, status_uri, cookies):
+        return self.poll_import_status(workspace_id, status_uri, cookies)[0]
+
+    def poll_import_status(self, workspace_id, status_uri, cookies):
+        """Retorna (status, retry_after) — retry_after em segundos, ou None."""
+        try:
+            response = self.get(status_uri, headers=JSON_ACCEPT, cookies=cookies, timeout=15)
+            response.raise_for_status()
+            data = response.json()
+            return data.get('wTaskStatus', {}).get('status'), parse_retry_after(response.headers.get("Retry-After"))
+        except RequestException as e:
+            raise GoodDataAPIError.from_request_exception(f"Erro ao verificar status: {str(e)}", e)
+
+    def get_dependencies(self, workspace_id, object_uri, cookies, direction="using2"):
+        """Lista os objetos dos quais `object_uri` depende (`using2`) ou que o usam (`usedby2`)."""
+        object_id = object_uri.rstrip("/").rsplit("/", 1)[-1]
+        try:
+            response = self.get(f"/gdc/md/{workspace_id}/{direction}/{object_id}", headers=JSON_ACCEPT,
+                                cookies=cookies, timeout=30)
+            response.raise_for_status()
+            return response.json().get("entries", [])
+        except RequestException as e:
+            raise GoodDataAPIError.from_request_exception(f"Erro ao buscar dependências: {str(e)}", e)
+
+    def get_objects(self, workspace_id, uris, cookies):
+        """Busca vários objetos de metadados em uma chamada (`objects/get`)."""
+        payload = {"get": {"items": list(uris)}}
+        try:
+            response = self.post(f"/gdc/md/{workspace_id}/objects/get", headers=JSON_ACCEPT, cookies=cookies,
+                                 json=payload, timeout=30)
+            response.raise_for_status()
+            return response.json().get("objects", {}).get("items", [])
+        except RequestException as e:
+            raise GoodDataAPIError.from_request_exception(f"Erro ao buscar objetos: {str(e)}", e)
+
+    def identifiers_to_uris(self, workspace_id, identifiers, cookies):
+        """Mapeia identificadores para as URIs correspondentes no workspace (ausentes ficam de fora)."""
+        payload = {"identifierToUri": list(identifiers)}
+        try:
+            response = self.post(f"/gdc/md/{workspace_id}/identifiers", headers=JSON_ACCEPT, cookies=cookies,
+                                 json=payload, timeout=30)
+            response.raise_for_status()
+            return {item["identifier"]: item["uri"] for item in response.json().get("identifiers", [])}
+        except RequestException as e:
+            raise GoodDataAPIError.from_request_exception(f"Erro ao buscar identificadores: {str(e)}", e)
+
+    def query_objects_page(self, workspace_id, category, cookies, offset=0, limit=OBJECTS_PAGE_SIZE):
+        """Uma página de `objects/query` (report, projectDashboard, metric...).
+
+        Retorna (itens, próximo offset); o offset é None na última página.
+        """
+        params = {"category": category, "limit": limit, "offset": offset}
+        try:
+            response = self.get(f"/gdc/md/{workspace_id}/objects/query", headers=JSON_ACCEPT, cookies=cookies,
+                                params=params, timeout=60)
+            response.raise_for_status()
+            objetos = response.json().get("objects", {})
+            paging = objetos.get("paging", {})
+            itens = objetos.get("items", [])
+            proximo = paging.get("offset", offset) + paging.get("count", len(itens)) if paging.get("next") else None
+            return itens, proximo
+        except RequestException as e:
+            raise GoodDataAPIError.from_request_exception(f"Erro ao listar objetos ({category}): {str(e)}", e)
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_default_client():
+    """Retorna o cliente compartilhado por todas as funções do módulo."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = GoodDataClient()
+        return _default_client
+
+def set_default_client(client):
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
+def configure(base_url=None, pool_size=DEFAULT_POOL_SIZE, rate_limits=None):
+    """Troca o host da API (ex.: um servidor local de testes) recriando o cliente padrão.
+
+    `rate_limits` ajusta os limites por classe de endpoint, ex.:
+    {"export": {"rate": 1, "concurrency": 2}} (ver ratelimit.DEFAULT_LIMITS).
+    """
+    global BASE_URL
+    if base_url:
+        BASE_URL = base_url.rstrip("/")
+    if rate_limits:
+        RATE_LIMITER.configure(**rate_limits)
+    set_default_client(GoodDataClient(BASE_URL, pool_size=pool_size))
+    return get_default_client()
+
+def login_gooddata(login, senha):
+    return get_default_client().login(login, senha)
+
+def is_user_admin(cookies):
+    """Verifica se o usuário tem permissões de administrador"""
+    return get_default_client().is_user_admin(cookies)
+
+def get_workspace_name(workspace_id, cookies):
+    return get_default_client().get_workspace_name(workspace_id, cookies)
+
+def get_workspace_meta(workspace_id, cookies, etag=None, last_modified=None):
+    return get_default_client().get_workspace_meta(workspace_id, cookies, etag, last_modified)
+
+def list_user_projects(cookies):
+    return get_default_client().list_user_projects(cookies)
+
+def export_partial_metadata(workspace_id, report_url, cookies, exportAttributeProperties=0, crossDataCenterExport=0):
+    """Exporta um ou mais objetos. `report_url` pode ser uma URI ou uma lista de URIs."""
+    return get_default_client().export_partial_metadata(
+        workspace_id, report_url, cookies,
+        exportAttributeProperties=exportAttributeProperties,
+        crossDataCenterExport=crossDataCenterExport
+    )
+
+def export_partial_metadata_artifact(workspace_id, report_url, cookies, exportAttributeProperties=0, crossDataCenterExport=0):
+    return get_default_client().export_partial_metadata_artifact(
+        workspace_id, report_url, cookies,
+        exportAttributeProperties=exportAttributeProperties,
+        crossDataCenterExport=crossDataCenterExport
+    )
+
+def import_partial_metadata(workspace_id_destino, token, cookies, overwriteNewer=0, updateLDMObjects=0, importAttributeProperties=0):
+    return get_default_client().import_partial_metadata(
+        workspace_id_destino, token, cookies,
+        overwriteNewer=overwriteNewer,
+        updateLDMObjects=updateLDMObjects,
+        importAttributeProperties=importAttributeProperties
+    )
 
 def extract_json_from_html(html_text):
     try:
-        match = re.search(r"<pre[^>]*>(.*?)</pre>", html_text, re.DOTALL)
-        if match:
-            json_str = match.group(1)
-            json_str = re.sub(r'<[^>]+>', '', json_str)
-            json_str = re.sub(r'&#x22;|&quot;', '"', json_str)
-            json_str = re.sub(r'&#39;|&apos;', "'", json_str)
-            return json.loads(json_str)
-        json_match = re.search(r'({.*})', html_text, re.DOTALL)
-        if json_match:
-            return json.loads(json_match.group(1))
-        raise Exception("Nenhum JSON encontrado no HTML")
+        return parse_json_text(html_text)
     except Exception as e:
         raise Exception(f"Falha ao extrair JSON do HTML: {str(e)}")
 
 def get_import_status(workspace_id, status_uri, cookies):
-    url = f"https://analytics.moveresoftware.com{status_uri}"
-    headers = {
-        "User-Agent": "MyApp/1.0 (Python)",
-        "Accept": "application/json"
-    }
-    try:
-        response = requests.get(url, headers=headers, cookies=cookies, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        return data.get('wTaskStatus', {}).get('status')
-    except RequestException as e:
-        raise Exception(f"Erro ao verificar status: {str(e)}")
+    return get_default_client().get_import_status(workspace_id, status_uri, cookies)
+
+def poll_import_status(workspace_id, status_uri, cookies):
+    return get_default_client().poll_import_status(workspace_id, status_uri, cookies)
+
+def get_dependencies(workspace_id, object_uri, cookies, direction="using2"):
+    return get_default_client().get_dependencies(workspace_id, object_uri, cookies, direction)
+
+def get_objects(workspace_id, uris, cookies):
+    return get_default_client().get_objects(workspace_id, uris, cookies)
+
+def identifiers_to_uris(workspace_id, identifiers, cookies):
+    return get_default_client().identifiers_to_uris(workspace_id, identifiers, cookies)
+
+def query_objects_page(workspace_id, category, cookies, offset=0, limit=OBJECTS_PAGE_SIZE):
+    return get_default_client().query_objects_page(workspace_id, category, cookies, offset, limit)
 
 def extract_report_uri(report_link):
     match = re.search(r"(/gdc/md/[\w\d]+/obj/\d+)", report_link)
@@ -187,31 +513,319 @@ def extract_report_uri(report_link):
         return match.group(1)
     raise ValueError("Não foi possível extrair o caminho do relatório.")
 
-def wait_for_import_status_ok(workspace_id, status_uri, cookies, interval=5, max_attempts=60):
-    attempts = 0
-    while attempts < max_attempts:
+def split_report_links(text):
+    """Separa um texto com vários links/URIs (espaço, vírgula, ponto e vírgula ou quebra de linha)."""
+    return [parte for parte in re.split(r"[\s,;]+", text or "") if parte]
+
+def dedupe_report_uris(report_links):
+    """Extrai a URI de cada link e remove duplicadas mantendo a ordem.
+
+    Retorna (uris, mapa) onde mapa associa cada link de entrada à sua URI.
+    """
+    uris = []
+    mapa = {}
+    for link in report_links:
+        uri = extract_report_uri(link)
+        mapa[link] = uri
+        if uri not in uris:
+            uris.append(uri)
+    return uris, mapa
+
+def chunk_uris(uris, chunk_size):
+    if chunk_size < 1:
+        raise ValueError("chunk_size deve ser maior que zero.")
+    return [uris[i:i + chunk_size] for i in range(0, len(uris), chunk_size)]
+
+class PollingStrategy:
+    """Intervalos de polling: atraso inicial curto, crescimento exponencial com
+    jitter, teto por intervalo e prazo total (em vez de número de tentativas).
+    """
+
+    def __init__(self, initial_delay=0.5, factor=2.0, max_delay=15.0, jitter=0.2, deadline=1800.0):
+        self.initial_delay = initial_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+
+    @classmethod
+    def fixed(cls, interval, max_attempts):
+        """Equivalente ao comportamento antigo: intervalo fixo e N tentativas."""
+        return cls(initial_delay=interval, factor=1.0, max_delay=interval, jitter=0.0, deadline=interval * max_attempts)
+
+    def delay(self, poll, retry_after=None):
+        """Atraso antes do próximo poll; `poll` começa em 0. Respeita o Retry-After do servidor."""
+        base = self.initial_delay * (self.factor ** poll)
+        if self.jitter:
+            base *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        base = min(base, self.max_delay)
+        if retry_after is not None:
+            base = max(base, retry_after)
+        return base
+
+class PollStats:
+    """Latência de cada poll e totais, para calibrar a PollingStrategy."""
+
+    def __init__(self):
+        self.latencies = []
+        self.elapsed = 0.0
+        self.final_status = None
+
+    @property
+    def polls(self):
+        return len(self.latencies)
+
+    def summary(self):
+        return {
+            "polls": self.polls,
+            "elapsed": round(self.elapsed, 3),
+            "max_latency": round(max(self.latencies), 3) if self.latencies else 0.0,
+            "avg_latency": round(sum(self.latencies) / self.polls, 3) if self.latencies else 0.0,
+            "final_status": self.final_status
+        }
+
+DEFAULT_POLLING_STRATEGY = PollingStrategy()
+MAX_POLL_ERRORS = 3
+
+class PollLoop:
+    """Regras do polling de uma tarefa, sem I/O, usadas pelo cliente síncrono e pelo assíncrono.
+
+    A cada poll o chamador chama `start()`, faz a requisição e informa o
+    resultado com `ok(status, retry_after)` ou `error(exc)`; o retorno é o
+    atraso até o próximo poll, ou None quando a tarefa saiu de RUNNING.
+    Erros transitórios isolados são tolerados (respeitando o Retry-After de
+    um 429/503); depois de `max_errors` seguidos, ou diante de um erro não
+    transitório, a exceção sobe para quem chamou.
+    """
+
+    def __init__(self, strategy=None, stats=None, max_errors=MAX_POLL_ERRORS):
+        self.strategy = strategy or DEFAULT_POLLING_STRATEGY
+        self.stats = stats if stats is not None else PollStats()
+        self.max_errors = max_errors
+        self.inicio = time.monotonic()
+        self.limite = self.inicio + self.strategy.deadline
+        self.poll = 0
+        self.erros = 0
+        self._t0 = self.inicio
+
+    def start(self):
+        self._t0 = time.monotonic()
+
+    def ok(self, status, retry_after=None):
+        latencia = time.monotonic() - self._t0
+        self.stats.latencies.append(latencia)
+        METRICS.record_poll(latencia)
+        self.erros = 0
+        if status != "RUNNING":
+            self.stats.final_status = status
+            self.stats.elapsed = time.monotonic() - self.inicio
+            return None
+        return self._next_delay(retry_after)
+
+    def error(self, error):
+        self.stats.latencies.append(time.monotonic() - self._t0)
+        self.erros += 1
+        if self.erros >= self.max_errors or not is_retryable_error(error):
+            self.stats.elapsed = time.monotonic() - self.inicio
+            raise error
+        logger.warning("Erro ao verificar status (%s/%s): %s", self.erros, self.max_errors, error)
+        return self._next_delay(getattr(error, "retry_after", None))
+
+    def _next_delay(self, retry_after):
+        delay = self.strategy.delay(self.poll, retry_after)
+        self.poll += 1
+        if time.monotonic() + delay > self.limite:
+            self.stats.elapsed = time.monotonic() - self.inicio
+            raise Exception("Tempo máximo de espera atingido.")
+        return delay
+
+def wait_for_import_status_ok(workspace_id, status_uri, cookies, interval=None, max_attempts=None,
+                              strategy=None, stats=None, max_errors=MAX_POLL_ERRORS):
+    """Aguarda a tarefa sair de RUNNING. `interval`/`max_attempts` mantêm o modo fixo antigo."""
+    if strategy is None and (interval is not None or max_attempts is not None):
+        strategy = PollingStrategy.fixed(interval or 5, max_attempts or 60)
+    loop = PollLoop(strategy, stats, max_errors)
+    while True:
+        loop.start()
         try:
-            status = get_import_status(workspace_id, status_uri, cookies)
-            if status != "RUNNING":
-                return status
-            time.sleep(interval)
-            attempts += 1
+            status, retry_after = poll_import_status(workspace_id, status_uri, cookies)
         except Exception as e:
-            print(f"Erro ao verificar status: {str(e)}")
-            time.sleep(interval)
-            attempts += 1
-    raise Exception("Tempo máximo de espera atingido.")
+            delay = loop.error(e)
+        else:
+            delay = loop.ok(status, retry_after)
+            if delay is None:
+                return status
+        time.sleep(delay)
+
+def is_retryable_error(error):
+    """Classifica pelo tipo de exceção e status HTTP, nunca pelo texto da mensagem."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, GoodDataAPIError):
+        return error.transient or error.token_expired
+    return isinstance(error, (ConnectionError, Timeout))
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """Interrompe chamadas ao host depois de `failure_threshold` falhas seguidas.
+
+    Depois de `reset_timeout` segundos, uma única chamada de teste é
+    liberada (half-open); as demais continuam recusadas até ela terminar.
+    Se ela funcionar o circuito fecha de novo.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        with self._lock:
+            estado = self._state()
+            if estado == "half-open" and not self._probing:
+                self._probing = True
+                return
+            if estado != "closed":
+                restante = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+                raise CircuitOpenError(f"Circuito aberto: host GoodData falhando, nova tentativa em {restante:.0f}s")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._probing = False
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+class StageBudget:
+    """Orçamento de uma etapa: tentativas, backoff e tempo total máximo."""
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=10.0, max_elapsed=60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+
+DEFAULT_STAGE_BUDGETS = {
+    "export": StageBudget(max_attempts=3, base_delay=2.0, max_elapsed=60.0),
+    "import": StageBudget(max_attempts=5, base_delay=1.0, max_elapsed=60.0),
+    "poll": StageBudget(max_attempts=3, base_delay=5.0, max_elapsed=1800.0)
+}
+
+def counts_as_host_failure(error):
+    """Falhas que indicam problema no host; token expirado (410 no import) não conta."""
+    if isinstance(error, GoodDataAPIError):
+        return error.transient and not error.token_expired
+    return isinstance(error, (ConnectionError, Timeout))
+
+class RetryPolicy:
+    """Política de retry por etapa (export, import, poll) com um circuit breaker por execução.
+
+    Um `breaker` pode ser passado para compartilhá-lo entre políticas.
+    `stats` guarda, por etapa, tentativas, retries, falhas e tempo gasto.
+    """
+
+    def __init__(self, budgets=None, breaker=None):
+        self.budgets = dict(DEFAULT_STAGE_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def _record(self, stage, **incrementos):
+        with self._lock:
+            stage_stats = self.stats.setdefault(stage, {"attempts": 0, "retries": 0, "failures": 0, "elapsed": 0.0})
+            for chave, valor in incrementos.items():
+                stage_stats[chave] += valor
+
+    def call(self, stage, func, *args, on_retry=None, **kwargs):
+        """Executa `func` dentro do orçamento da etapa. `on_retry(erro, tentativa, atraso)` é opcional."""
+        budget = self.budgets.get(stage) or StageBudget()
+        inicio = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.before_call()
+            t0 = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+                self.breaker.record_success()
+                self._record(stage, attempts=1, elapsed=time.monotonic() - t0)
+                METRICS.record_stage(stage, time.monotonic() - t0)
+                return result
+            except Exception as e:
+                self._record(stage, attempts=1, failures=1, elapsed=time.monotonic() - t0)
+                METRICS.record_stage(stage, time.monotonic() - t0)
+                if counts_as_host_failure(e):
+                    self.breaker.record_failure()
+                else:
+                    # O host respondeu; isso também encerra uma chamada de teste do half-open.
+                    self.breaker.record_success()
+                delay = min(budget.base_delay * (2 ** (attempt - 1)), budget.max_delay)
+                esgotado = (attempt >= budget.max_attempts or
+                            time.monotonic() - inicio + delay > budget.max_elapsed)
+                if esgotado or not is_retryable_error(e):
+                    raise
+                if on_retry:
+                    on_retry(e, attempt, delay)
+                self._record(stage, retries=1, elapsed=delay)
+                METRICS.record_retry(stage)
+                METRICS.record_stage(stage, delay)
+                time.sleep(delay)
+
+    def summary(self):
+        with self._lock:
+            return {stage: dict(valores) for stage, valores in self.stats.items()}
+
+EXPORT_READY_STRATEGY = PollingStrategy(initial_delay=0.2, factor=1.5, max_delay=3.0, jitter=0.1, deadline=300.0)
+
+def wait_for_export_ready(workspace_id, status_uri, cookies, strategy=EXPORT_READY_STRATEGY):
+    """Aguarda o artefato de exportação ficar pronto (em vez de dormir um tempo fixo)."""
+    if not status_uri:
+        return "OK"
+    status = wait_for_import_status_ok(workspace_id, status_uri, cookies, strategy=strategy)
+    if status != "OK":
+        raise GoodDataAPIError(f"Exportação terminou com status {status}", transient=False)
+    return status
+
+def export_when_ready(workspace_id, report_url, cookies, **export_opts):
+    """Exporta e só retorna o token quando o artefato já pode ser importado."""
+    token, status_uri = export_partial_metadata_artifact(workspace_id, report_url, cookies, **export_opts)
+    wait_for_export_ready(workspace_id, status_uri, cookies)
+    return token
 
 def export_and_import(workspace_origem, workspace_destino, report_url, cookies, export_opts, import_opts):
     try:
-        print("[1/3] Exportando metadados...")
-        token = export_partial_metadata(
+        logger.info("[1/3] Exportando metadados...")
+        token = export_when_ready(
             workspace_origem,
             report_url,
             cookies,
             **export_opts
         )
-        print("[2/3] Importando (timeout 5s)...")
+        logger.info("[2/3] Importando...")
         result = import_partial_metadata(
             workspace_destino,
             token,
@@ -220,4 +834,69 @@ def export_and_import(workspace_origem, workspace_destino, report_url, cookies,
         )
         return result
     except Exception as e:
-        raise Exception(f"Falha no fluxo integrado: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Falha no fluxo integrado: {str(e)}")
+
+DEFAULT_EXPORT_CHUNK_SIZE = 50
+
+def is_refusal_error(error):
+    """Recusa do servidor ao lote (4xx não transitório, ex.: 400/413): dividir o lote pode resolver.
+
+    Autenticação (401/403) e workspace inexistente (404) não mudam com lotes menores.
+    """
+    return (isinstance(error, GoodDataAPIError) and error.status_code is not None and
+            400 <= error.status_code < 500 and error.status_code not in (401, 403, 404) and not error.transient)
+
+def _export_chunk(workspace_origem, uris, cookies, export_opts):
+    """Exporta um lote; se o servidor recusar, divide o lote ao meio e tenta de novo.
+
+    Retorna uma lista de (uris, token, erro) — um item por lote efetivamente enviado.
+    Outros erros (rede, 5xx, autenticação) não são resolvidos dividindo e sobem.
+    """
+    try:
+        token = export_when_ready(workspace_origem, uris, cookies, **export_opts)
+        return [(uris, token, None)]
+    except Exception as e:
+        if not is_refusal_error(e):
+            raise
+        if len(uris) == 1:
+            return [(uris, None, str(e))]
+        meio = len(uris) // 2
+        logger.debug("Lote de %s objetos recusado, dividindo: %s", len(uris), e)
+        return (_export_chunk(workspace_origem, uris[:meio], cookies, export_opts) +
+                _export_chunk(workspace_origem, uris[meio:], cookies, export_opts))
+
+def batch_export_and_import(workspace_origem, workspace_destino, report_links, cookies,
+                            export_opts, import_opts, chunk_size=DEFAULT_EXPORT_CHUNK_SIZE):
+    """Migra vários relatórios usando o menor número possível de exportações.
+
+    Retorna uma lista de dicionários, um por link de entrada, com as chaves
+    `link`, `uri`, `chunk`, `status` e `erro`.
+    """
+    uris, mapa = dedupe_report_uris(report_links)
+    resultado_uri = {}
+    chunk_idx = 0
+    for lote in chunk_uris(uris, chunk_size):
+        try:
+            enviados = _export_chunk(workspace_origem, lote, cookies, export_opts)
+        except Exception as e:
+            enviados = [(lote, None, str(e))]
+        for uris_enviadas, token, erro in enviados:
+            chunk_idx += 1
+            logger.info("[%s] Lote com %s objeto(s)", chunk_idx, len(uris_enviadas))
+            status = None
+            if token:
+                try:
+                    result = import_partial_metadata(workspace_destino, token, cookies, **import_opts)
+                    if result.get("uri"):
+                        status = wait_for_import_status_ok(workspace_destino, result["uri"], cookies)
+                    else:
+                        status = "OK"
+                except Exception as e:
+                    erro = str(e)
+            for uri in uris_enviadas:
+                resultado_uri[uri] = {
+                    "chunk": chunk_idx,
+                    "status": status or "ERROR",
+                    "erro": erro
+                }
+    return [dict(link=link, uri=uri, **resultado_uri[uri]) for link, uri in mapa.items()]
@@ -0,0 +1,221 @@
+import asyncio
+
+try:
+    import httpx
+except ImportError:  # dependência opcional
+    httpx = None
+
+from apigooddata import (
+    AUTH_PATHS, DEFAULT_HEADERS, DEFAULT_POOL_SIZE, EXPORT_READY_STRATEGY, JSON_ACCEPT, MAX_POLL_ERRORS,
+    GoodDataAPIError, PollLoop, get_default_client, parse_retry_after
+)
+from response_parser import parse_export_artifact
+
+
+def _api_error(message, e, **kwargs):
+    """Converte um erro do httpx em GoodDataAPIError, com status e Retry-After preservados."""
+    response = e.response if isinstance(e, httpx.HTTPStatusError) else None
+    if response is None:
+        return GoodDataAPIError(message, transient=isinstance(e, httpx.TransportError), **kwargs)
+    return GoodDataAPIError(message, status_code=response.status_code,
+                            retry_after=parse_retry_after(response.headers.get("Retry-After")), **kwargs)
+
+
+class AsyncGoodDataClient:
+    """Versão assíncrona da API GoodData, baseada em `httpx.AsyncClient`.
+
+    Um único event loop consegue acompanhar centenas de tarefas `wTaskStatus`
+    ao mesmo tempo, sem uma thread bloqueada por tarefa. Por padrão usa o host
+    e o `auth` (AuthManager) do cliente síncrono padrão: o TT vai em cada
+    chamada e um 401 renova o TT e repete a requisição uma vez.
+    """
+
+    def __init__(self, base_url=None, cookies=None, max_connections=DEFAULT_POOL_SIZE, auth=None):
+        if httpx is None:
+            raise ImportError("O cliente assíncrono requer o pacote 'httpx' (pip install httpx).")
+        padrao = get_default_client()
+        self.base_url = (base_url or padrao.base_url).rstrip("/")
+        self.auth = auth if auth is not None else padrao.auth
+        self.http = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=DEFAULT_HEADERS,
+            cookies=cookies,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await self.http.aclose()
+
+    async def request(self, method, path, **kwargs):
+        """Como GoodDataClient.request; o AuthManager é síncrono e roda fora do event loop."""
+        auth = self.auth
+        if auth is None or path.startswith(AUTH_PATHS):
+            return await self.http.request(method, path, **kwargs)
+        headers = dict(kwargs.pop("headers", None) or {})
+        tt = await asyncio.to_thread(auth.token)
+        response = await self.http.request(method, path, headers={**headers, **auth.headers(tt)}, **kwargs)
+        if response.status_code == 401:
+            tt = await asyncio.to_thread(auth.refresh, tt)
+            response = await self.http.request(method, path, headers={**headers, **auth.headers(tt)}, **kwargs)
+        return response
+
+    async def login(self, login, senha):
+        payload = {
+            "postUserLogin": {
+                "login": login,
+                "password": senha,
+                "remember": 1
+            }
+        }
+        response = await self.request("POST", "/gdc/account/login", json=payload, timeout=10)
+        response.raise_for_status()
+        return response.cookies
+
+    async def get_workspace_name(self, workspace_id):
+        try:
+            response = await self.request("GET", f"/gdc/projects/{workspace_id}", headers=JSON_ACCEPT, timeout=10)
+            response.raise_for_status()
+            return response.json()['project']['meta']['title']
+        except httpx.HTTPError as e:
+            raise _api_error(f"Erro ao buscar workspace: {str(e)}", e)
+
+    async def export_partial_metadata(self, workspace_id, report_url, exportAttributeProperties=0, crossDataCenterExport=0):
+        return (await self.export_partial_metadata_artifact(workspace_id, report_url, exportAttributeProperties,
+                                                            crossDataCenterExport))[0]
+
+    async def export_partial_metadata_artifact(self, workspace_id, report_url, exportAttributeProperties=0,
+                                               crossDataCenterExport=0):
+        """Retorna (token, uri da tarefa de exportação)."""
+        uris = [report_url] if isinstance(report_url, str) else list(report_url)
+        payload = {
+            "partialMDExport": {
+                "uris": uris,
+                "exportAttributeProperties": int(exportAttributeProperties),
+                "crossDataCenterExport": int(crossDataCenterExport)
+            }
+        }
+        try:
+            response = await self.request("POST", f"/gdc/md/{workspace_id}/maintenance/partialmdexport",
+                                          json=payload, timeout=15)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise _api_error(f"Erro ao exportar metadados: {str(e)}", e)
+        try:
+            token, status_uri = parse_export_artifact((response.text,))
+        except ValueError:
+            raise GoodDataAPIError("Não foi possível extrair o JSON da resposta.", transient=False)
+        if not token:
+            raise GoodDataAPIError("Token de exportação não encontrado.", transient=False)
+        return token, status_uri
+
+    async def export_when_ready(self, workspace_id, report_url, **export_opts):
+        """Exporta e só retorna o token quando o artefato já pode ser importado (como o síncrono)."""
+        token, status_uri = await self.export_partial_metadata_artifact(workspace_id, report_url, **export_opts)
+        if status_uri:
+            status = await self.wait_for_import_status_ok(status_uri, strategy=EXPORT_READY_STRATEGY)
+            if status != "OK":
+                raise GoodDataAPIError(f"Exportação terminou com status {status}", transient=False)
+        return token
+
+    async def import_partial_metadata(self, workspace_id_destino, token, overwriteNewer=0, updateLDMObjects=0, importAttributeProperties=0):
+        headers = {
+            "Accept": "application/json",
+            "X-GDC-TASK-PRIORITY": "high"
+        }
+        payload = {
+            "partialMDImport": {
+                "token": token,
+                "overwriteNewer": bool(overwriteNewer),
+                "updateLDMObjects": bool(updateLDMObjects),
+                "importAttributeProperties": bool(importAttributeProperties)
+            }
+        }
+        try:
+            response = await self.request(
+                "POST", f"/gdc/md/{workspace_id_destino}/maintenance/partialmdimport",
+                headers=headers, json=payload, timeout=30
+            )
+        except httpx.HTTPError as e:
+            raise _api_error(f"Erro na importação: {str(e)}", e)
+        if response.status_code == 200:
+            try:
+                return response.json()
+            except ValueError:
+                return {"status": "success", "message": "Importação realizada mas resposta inválida"}
+        if response.status_code == 400:
+            try:
+                error_msg = response.json().get("error", {}).get("message", "Erro na requisição")
+            except ValueError:
+                error_msg = response.text[:500] or "Erro na requisição"
+            raise GoodDataAPIError(f"Erro na importação: Erro na requisição: {error_msg}", status_code=400,
+                                   token_expired="no longer available" in error_msg.lower())
+        raise GoodDataAPIError(f"Erro na importação: Status: {response.status_code}\nResposta: {response.text[:500]}",
+                               status_code=response.status_code,
+                               token_expired=(response.status_code == 410 or
+                                              "no longer available" in response.text.lower()),
+                               retry_after=parse_retry_after(response.headers.get("Retry-After")))
+
+    async def get_import_status(self, status_uri):
+        return (await self.poll_import_status(status_uri))[0]
+
+    async def poll_import_status(self, status_uri):
+        try:
+            response = await self.request("GET", status_uri, headers=JSON_ACCEPT, timeout=15)
+            response.raise_for_status()
+            status = response.json().get('wTaskStatus', {}).get('status')
+            return status, parse_retry_after(response.headers.get("Retry-After"))
+        except httpx.HTTPError as e:
+            raise _api_error(f"Erro ao verificar status: {str(e)}", e)
+
+    async def wait_for_import_status_ok(self, status_uri, strategy=None, stats=None, max_errors=MAX_POLL_ERRORS):
+        """Acompanha a tarefa usando a PollingStrategy até sair de RUNNING (mesmas regras do cliente síncrono)."""
+        loop = PollLoop(strategy, stats, max_errors)
+        while True:
+            loop.start()
+            try:
+                status, retry_after = await self.poll_import_status(status_uri)
+            except Exception as e:
+                delay = loop.error(e)
+            else:
+                delay = loop.ok(status, retry_after)
+                if delay is None:
+                    return status
+            await asyncio.sleep(delay)
+
+    async def wait_many(self, status_uris, **kwargs):
+        """Acompanha várias tarefas em paralelo. Retorna uri -> status (ou a exceção)."""
+        resultados = await asyncio.gather(
+            *(self.wait_for_import_status_ok(uri, **kwargs) for uri in status_uris),
+            return_exceptions=True
+        )
+        return dict(zip(status_uris, resultados))
+
+    async def export_and_import(self, workspace_origem, workspace_destino, report_url, export_opts, import_opts):
+        token = await self.export_when_ready(workspace_origem, report_url, **export_opts)
+        result = await self.import_partial_metadata(workspace_destino, token, **import_opts)
+        if result.get("uri"):
+            return await self.wait_for_import_status_ok(result["uri"])
+        return "OK"
+
+
+def wait_many_import_status_ok(status_uris, cookies, base_url=None, auth=None, **kwargs):
+    """Wrapper síncrono: acompanha várias tarefas de importação em um único event loop."""
+    async def _run():
+        async with AsyncGoodDataClient(base_url, cookies=cookies, auth=auth) as client:
+            return await client.wait_many(status_uris, **kwargs)
+    return asyncio.run(_run())
+
+
+def async_export_and_import(workspace_origem, workspace_destino, report_url, cookies, export_opts, import_opts,
+                            base_url=None, auth=None):
+    """Wrapper síncrono de `AsyncGoodDataClient.export_and_import`."""
+    async def _run():
+        async with AsyncGoodDataClient(base_url, cookies=cookies, auth=auth) as client:
+            return await client.export_and_import(workspace_origem, workspace_destino, report_url, export_opts, import_opts)
+    return asyncio.run(_run())
@@ -0,0 +1,321 @@
+"""Pacotes de metadados exportados, guardados localmente para importar depois em vários destinos.
+
+O partialmdexport do GoodData não devolve o pacote em si, só um token
+guardado no servidor, que expira. Um pacote local reúne esse token, o
+manifesto da exportação (origem, URIs, opções) e a definição JSON de cada
+objeto no momento do export. No replay o token é reaproveitado enquanto
+valer; expirado, a exportação só é refeita a partir do manifesto se os
+objetos atuais da origem ainda forem iguais aos arquivados (ou com
+--allow-changed), para não importar às cegas um conteúdo diferente do pacote.
+
+    python artifact_store.py export job.json
+    python artifact_store.py replay <pacote> destino1 destino2 ... [--allow-changed]
+    python artifact_store.py pack <pacote> pacote.tar.gz
+    python artifact_store.py unpack pacote.tar.gz
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+
+from apigooddata import chunk_uris, configure, dedupe_report_uris, export_when_ready, get_objects
+from fanout import DEFAULT_MAX_WORKERS, SharedExportToken, fanout_export_and_import
+from incremental import OBJECTS_PER_REQUEST, fetch_fingerprints, object_fingerprint
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".reporttransfer", "artifacts")
+GZIP_LEVEL = 6
+COPY_CHUNK_SIZE = 64 * 1024
+
+logger = logging.getLogger("artifact_store")
+
+
+def _canonical(obj):
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class ArtifactStore:
+    """Armazenamento endereçado por conteúdo: cada objeto fica gravado uma única vez (gzip), pelo sha256.
+
+    Layout: objects/ab/<sha256>.json.gz e packages/<id>.json (manifesto).
+    """
+
+    def __init__(self, root=DEFAULT_STORE_PATH):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.packages_dir = os.path.join(root, "packages")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.packages_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.json.gz")
+
+    def has_object(self, digest):
+        return os.path.exists(self.object_path(digest))
+
+    def put_object(self, obj):
+        """Grava o objeto se ainda não existir; retorna o sha256 do JSON canônico."""
+        dados = _canonical(obj)
+        digest = hashlib.sha256(dados).hexdigest()
+        destino = self.object_path(digest)
+        if os.path.exists(destino):
+            return digest
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(destino), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as bruto, gzip.GzipFile(fileobj=bruto, mode="wb", compresslevel=GZIP_LEVEL) as f:
+                f.write(dados)
+            os.replace(temporario, destino)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+        return digest
+
+    def get_object(self, digest):
+        with gzip.open(self.object_path(digest), "rb") as f:
+            return json.load(f)
+
+    def package_path(self, package_id):
+        return os.path.join(self.packages_dir, f"{package_id}.json")
+
+    def save_package(self, manifest):
+        with self._lock:
+            fd, temporario = tempfile.mkstemp(dir=self.packages_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(manifest, f, ensure_ascii=False, indent=2)
+                os.replace(temporario, self.package_path(manifest["id"]))
+            except BaseException:
+                os.unlink(temporario)
+                raise
+
+    def load_package(self, package_id):
+        with open(self.package_path(package_id), encoding="utf-8") as f:
+            return json.load(f)
+
+    def list_packages(self):
+        pacotes = []
+        for nome in sorted(os.listdir(self.packages_dir)):
+            if nome.endswith(".json"):
+                manifest = self.load_package(nome[:-len(".json")])
+                pacotes.append({**{chave: manifest.get(chave) for chave in ("id", "source", "exported_at", "token_at")},
+                                "objects": len(manifest["objects"])})
+        return pacotes
+
+    def pack(self, package_id, path):
+        """Gera um .tar.gz portátil com o manifesto e os objetos do pacote, arquivo por arquivo."""
+        manifest = self.load_package(package_id)
+        with tarfile.open(path, "w:gz") as tar:
+            tar.add(self.package_path(package_id), arcname=f"packages/{package_id}.json")
+            for digest in sorted(set(manifest["objects"].values())):
+                tar.add(self.object_path(digest), arcname=f"objects/{digest[:2]}/{digest}.json.gz")
+        return path
+
+    def unpack(self, path):
+        """Importa um .tar.gz gerado por `pack`; objetos já presentes não são regravados. Retorna o id."""
+        package_id = None
+        with tarfile.open(path, "r:gz") as tar:
+            for membro in tar:
+                partes = membro.name.split("/")
+                if not membro.isfile() or ".." in partes or "" in partes:
+                    continue
+                # Só o layout gerado por `pack`: packages/<id>.json e objects/ab/<sha256>.json.gz.
+                if len(partes) == 2 and partes[0] == "packages" and partes[1].endswith(".json"):
+                    package_id = partes[1][:-len(".json")]
+                elif not (len(partes) == 3 and partes[0] == "objects" and partes[2].endswith(".json.gz")):
+                    continue
+                destino = os.path.join(self.root, *partes)
+                if partes[0] == "objects" and os.path.exists(destino):
+                    continue
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                origem = tar.extractfile(membro)
+                fd, temporario = tempfile.mkstemp(dir=os.path.dirname(destino), suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        while True:
+                            bloco = origem.read(COPY_CHUNK_SIZE)
+                            if not bloco:
+                                break
+                            f.write(bloco)
+                    os.replace(temporario, destino)
+                except BaseException:
+                    os.unlink(temporario)
+                    raise
+        if package_id is None:
+            raise ValueError(f"Nenhum manifesto de pacote em {path}")
+        return package_id
+
+
+def export_to_store(store, workspace_origem, uris, cookies, export_opts):
+    """Exporta `uris` e arquiva o pacote: token, manifesto e a definição de cada objeto.
+
+    Os objetos são buscados em lotes de `objects/get` e gravados um a um,
+    sem montar o pacote inteiro em memória. Retorna o manifesto.
+    """
+    token = export_when_ready(workspace_origem, uris, cookies, **export_opts)
+    objetos = {}
+    fingerprints = {}
+    for lote in chunk_uris(list(uris), OBJECTS_PER_REQUEST):
+        for obj in get_objects(workspace_origem, lote, cookies):
+            fp = object_fingerprint(obj)
+            objetos[fp["uri"]] = store.put_object(obj)
+            fingerprints[fp["uri"]] = fp["hash"]
+    package_id = hashlib.sha256(_canonical({"source": workspace_origem, "export": export_opts,
+                                            "objects": objetos})).hexdigest()[:16]
+    agora = time.time()
+    manifest = {
+        "id": package_id,
+        "source": workspace_origem,
+        "uris": list(uris),
+        "export": export_opts,
+        "token": token,
+        "token_at": agora,
+        "exported_at": agora,
+        "objects": objetos,
+        "fingerprints": fingerprints
+    }
+    store.save_package(manifest)
+    return manifest
+
+
+class ArchiveChangedError(Exception):
+    pass
+
+
+class ArchivedExportToken(SharedExportToken):
+    """Token de um pacote arquivado.
+
+    Enquanto o token arquivado valer, é ele que todos os destinos importam.
+    Se expirar, a reexportação só acontece quando `reexport_error` é None;
+    caso contrário cada destino falha com essa mensagem em vez de importar
+    o conteúdo atual da origem no lugar do pacote.
+    """
+
+    def __init__(self, manifest, cookies, reexport_error=None, on_export=None):
+        super().__init__(manifest["source"], manifest["uris"], cookies, manifest["export"], on_export)
+        self.token = manifest["token"]
+        self.reexport_error = reexport_error
+
+    def _export(self):
+        if self.reexport_error:
+            raise ArchiveChangedError(self.reexport_error)
+        super()._export()
+
+
+def changed_since_archive(manifest, cookies):
+    """URIs cuja definição atual na origem difere da arquivada."""
+    atuais = fetch_fingerprints(manifest["source"], manifest["uris"], cookies)
+    return [uri for uri, digest in manifest["fingerprints"].items() if atuais.get(uri, {}).get("hash") != digest]
+
+
+def replay_package(store, package_id, destinos, cookies, import_opts, max_workers=None, progress_callback=None,
+                   allow_changed=False):
+    """Importa um pacote arquivado em vários destinos em paralelo.
+
+    Antes do fan-out, os objetos atuais da origem são comparados com os
+    arquivados. O token arquivado é usado direto; se tiver expirado, uma
+    única reexportação (a partir do manifesto) é compartilhada por todos os
+    destinos e o novo token volta para o manifesto — mas só se a origem não
+    mudou desde o arquivamento ou com `allow_changed`, já que a reexportação
+    leva o conteúdo atual e não o do pacote. Retorna destino -> resultado,
+    mais a lista de URIs que mudaram na origem (None se a comparação falhou).
+    """
+    manifest = store.load_package(package_id)
+    try:
+        alterados = changed_since_archive(manifest, cookies)
+    except Exception as e:
+        logger.warning("Não foi possível comparar os objetos com o arquivo: %s", e)
+        alterados = None
+    reexport_error = None
+    if not allow_changed:
+        if alterados is None:
+            reexport_error = ("Token do pacote expirado e não foi possível conferir a origem; "
+                              "use --allow-changed para reexportar mesmo assim.")
+        elif alterados:
+            reexport_error = (f"Token do pacote expirado e {len(alterados)} objeto(s) mudaram na origem desde o "
+                              f"arquivamento; use --allow-changed para importar o conteúdo atual.")
+
+    def on_export(token):
+        manifest["token"] = token
+        manifest["token_at"] = time.time()
+        store.save_package(manifest)
+
+    shared_token = ArchivedExportToken(manifest, cookies, reexport_error, on_export)
+    resultados = fanout_export_and_import(
+        manifest["source"], destinos, manifest["uris"], cookies, manifest["export"], import_opts,
+        max_workers=max_workers or DEFAULT_MAX_WORKERS, progress_callback=progress_callback,
+        shared_token=shared_token
+    )
+    return resultados, alterados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pacotes de metadados GoodData arquivados localmente.")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Pasta do armazenamento local")
+    parser.add_argument("--login", default=os.environ.get("GOODDATA_LOGIN"))
+    parser.add_argument("--password", default=os.environ.get("GOODDATA_PASSWORD"))
+    parser.add_argument("--base-url", default=None)
+    sub = parser.add_subparsers(dest="command", required=True)
+    exportar = sub.add_parser("export", help="Exporta os relatórios de um job e arquiva o pacote")
+    exportar.add_argument("job")
+    replay = sub.add_parser("replay", help="Importa um pacote arquivado nos destinos")
+    replay.add_argument("package")
+    replay.add_argument("destinations", nargs="+")
+    replay.add_argument("--overwrite", action="store_true", help="overwriteNewer")
+    replay.add_argument("--update-ldm", action="store_true", help="updateLDMObjects")
+    replay.add_argument("--attribute-properties", action="store_true", help="importAttributeProperties")
+    replay.add_argument("--workers", type=int, default=None)
+    replay.add_argument("--allow-changed", action="store_true",
+                        help="Se o token expirou, reexporta mesmo que a origem tenha mudado desde o arquivamento")
+    sub.add_parser("list", help="Lista os pacotes arquivados")
+    empacotar = sub.add_parser("pack", help="Gera um .tar.gz portátil de um pacote")
+    empacotar.add_argument("package")
+    empacotar.add_argument("path")
+    desempacotar = sub.add_parser("unpack", help="Importa um .tar.gz gerado por pack")
+    desempacotar.add_argument("path")
+    args = parser.parse_args(argv)
+
+    store = ArtifactStore(args.store)
+    if args.command == "list":
+        print(json.dumps(store.list_packages(), ensure_ascii=False, indent=2))
+        return 0
+    if args.command == "pack":
+        print(store.pack(args.package, args.path))
+        return 0
+    if args.command == "unpack":
+        print(store.unpack(args.path))
+        return 0
+
+    if not args.login or not args.password:
+        print("Credenciais ausentes (use --login/--password ou GOODDATA_LOGIN/GOODDATA_PASSWORD)", file=sys.stderr)
+        return 2
+    from auth import authenticate
+    from migration import load_job_file
+
+    if args.base_url:
+        configure(args.base_url)
+    cookies = authenticate(args.login, args.password, cache_sst=True).cookies
+    if args.command == "export":
+        job = load_job_file(args.job)
+        uris, _ = dedupe_report_uris(job["reports"])
+        manifest = export_to_store(store, job["source"], uris, cookies, job["export"])
+        print(json.dumps({"package": manifest["id"], "objects": len(manifest["objects"])}, indent=2))
+        return 0
+
+    import_opts = {"overwriteNewer": int(args.overwrite), "updateLDMObjects": int(args.update_ldm),
+                   "importAttributeProperties": int(args.attribute_properties)}
+    resultados, alterados = replay_package(store, args.package, args.destinations, cookies, import_opts,
+                                           max_workers=args.workers, allow_changed=args.allow_changed)
+    print(json.dumps({"results": resultados, "changed_since_archive": alterados}, ensure_ascii=False, indent=2))
+    return 0 if all(r["status"] == "OK" for r in resultados.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
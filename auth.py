@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from apigooddata import JSON_ACCEPT, GoodDataAPIError, get_default_client
+
+try:
+    import keyring
+except ImportError:  # dependência opcional
+    keyring = None
+
+SST_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".reporttransfer", "sst.json")
+KEYRING_SERVICE = "ReportTransfer-GoodData"
+TT_LIFETIME = 600       # o TT do GoodData vale cerca de 10 minutos
+REFRESH_MARGIN = 60     # renova o TT este tempo antes de expirar
+
+logger = logging.getLogger("auth")
+
+
+class AuthError(GoodDataAPIError):
+    pass
+
+
+class SSTCache:
+    """Guarda o SST entre execuções: no keyring do sistema se disponível,
+    senão em um arquivo legível apenas pelo usuário (0600)."""
+
+    def __init__(self, path=SST_CACHE_PATH):
+        self.path = path
+
+    def _read_file(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_file(self, dados):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # mkstemp já cria o arquivo com 0600; o replace troca também um arquivo antigo com permissões abertas.
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(dados, f)
+            os.replace(temporario, self.path)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+
+    def load(self, login):
+        if keyring is not None:
+            return keyring.get_password(KEYRING_SERVICE, login)
+        return self._read_file().get(login)
+
+    def save(self, login, sst):
+        if keyring is not None:
+            keyring.set_password(KEYRING_SERVICE, login, sst)
+            return
+        dados = self._read_file()
+        dados[login] = sst
+        self._write_file(dados)
+
+    def delete(self, login):
+        if keyring is not None:
+            try:
+                keyring.delete_password(KEYRING_SERVICE, login)
+            except keyring.errors.PasswordDeleteError:
+                pass
+            return
+        dados = self._read_file()
+        if dados.pop(login, None) is not None:
+            self._write_file(dados)
+
+
+class AuthManager:
+    """Autenticação SST -> TT compartilhada por todas as threads.
+
+    O SST (longa duração) vem do login; o TT (curta duração) é obtido em
+    /gdc/account/token e renovado antes de expirar. Um 401 em qualquer chamada
+    renova o TT e repete a requisição (ver GoodDataClient.request); se o
+    próprio SST expirou, o login é refeito com as credenciais em memória.
+    """
+
+    def __init__(self, client=None, tt_lifetime=TT_LIFETIME, refresh_margin=REFRESH_MARGIN, sst_cache=None):
+        self.client = client or get_default_client()
+        self.tt_lifetime = tt_lifetime
+        self.refresh_margin = refresh_margin
+        self.sst_cache = sst_cache
+        self.sst = None
+        self.tt = None
+        self.expires_at = 0.0
+        self.cookies = None
+        self._credentials = None
+        self._lock = threading.RLock()
+
+    def login(self, login, senha):
+        with self._lock:
+            self._credentials = (login, senha)
+            if self.sst_cache is not None:
+                self.sst = self.sst_cache.load(login)
+                if self.sst:
+                    try:
+                        self._fetch_tt()
+                        logger.info("Sessão reaproveitada do cache (SST).")
+                        return self
+                    except AuthError:
+                        self.sst_cache.delete(login)
+            self._login()
+            return self
+
+    def _login(self):
+        login, senha = self._credentials
+        payload = {
+            "postUserLogin": {
+                "login": login,
+                "password": senha,
+                "remember": 1,
+                "verify_level": 2
+            }
+        }
+        response = self.client.post("/gdc/account/login", json=payload, headers=JSON_ACCEPT, timeout=10)
+        if response.status_code in (400, 401, 403):
+            raise AuthError("Login ou senha inválidos.", status_code=response.status_code)
+        response.raise_for_status()
+        self.sst = response.json()["userLogin"]["token"]
+        self.cookies = response.cookies
+        if self.sst_cache is not None:
+            self.sst_cache.save(login, self.sst)
+        logger.info("Login bem-sucedido!")
+        self._fetch_tt()
+
+    def _fetch_tt(self):
+        response = self.client.get("/gdc/account/token", headers={**JSON_ACCEPT, "X-GDC-AuthSST": self.sst},
+                                   timeout=10)
+        if response.status_code == 401:
+            raise AuthError("SST expirado ou inválido.", status_code=401)
+        response.raise_for_status()
+        self.tt = response.json()["userToken"]["token"]
+        self.expires_at = time.monotonic() + self.tt_lifetime
+
+    def refresh(self, expired=None):
+        """Renova o TT. Se outra thread já renovou (o TT atual difere de `expired`), só o reaproveita."""
+        with self._lock:
+            if expired is not None and self.tt != expired and time.monotonic() < self.expires_at:
+                return self.tt
+            try:
+                self._fetch_tt()
+            except AuthError:
+                if not self._credentials:
+                    raise
+                self._login()
+            return self.tt
+
+    def token(self):
+        """TT válido, renovado de forma proativa `refresh_margin` segundos antes de expirar."""
+        with self._lock:
+            if self.tt is None or time.monotonic() >= self.expires_at - self.refresh_margin:
+                self.refresh()
+            return self.tt
+
+    def headers(self, tt=None):
+        return {"X-GDC-AuthTT": tt or self.token()}
+
+    def attach(self):
+        self.client.auth = self
+        return self
+
+    def logout(self):
+        with self._lock:
+            if self.sst_cache is not None and self._credentials:
+                self.sst_cache.delete(self._credentials[0])
+            self.sst = self.tt = None
+            if self.client.auth is self:
+                self.client.auth = None
+
+
+def authenticate(login, senha, cache_sst=False, client=None):
+    """Faz login (ou reaproveita o SST em cache) e anexa o AuthManager ao cliente."""
+    manager = AuthManager(client, sst_cache=SSTCache() if cache_sst else None)
+    return manager.login(login, senha).attach()
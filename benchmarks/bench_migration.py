@@ -0,0 +1,116 @@
+"""Benchmark ponta a ponta das migrações contra o servidor mock local.
+
+    python benchmarks/bench_migration.py --runs 20 --latency 0.05 --task-duration 0.5
+
+Mede vazão (relatórios migrados por segundo) e latência p50/p95 de cada
+execução nos modos single, batch e fan-out. Nada é enviado ao host real.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import apigooddata  # noqa: E402
+from fanout import fanout_export_and_import  # noqa: E402
+from mock_server import MockGoodDataServer  # noqa: E402
+
+EXPORT_OPTS = {"exportAttributeProperties": 0, "crossDataCenterExport": 0}
+IMPORT_OPTS = {"overwriteNewer": 1, "updateLDMObjects": 0, "importAttributeProperties": 0}
+
+
+def percentile(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    k = (len(ordenados) - 1) * p / 100
+    baixo = int(k)
+    alto = min(baixo + 1, len(ordenados) - 1)
+    return ordenados[baixo] + (ordenados[alto] - ordenados[baixo]) * (k - baixo)
+
+
+def run_single(cookies, uris, destinos):
+    token = apigooddata.export_partial_metadata("origem", uris[0], cookies, **EXPORT_OPTS)
+    result = apigooddata.import_partial_metadata(destinos[0], token, cookies, **IMPORT_OPTS)
+    apigooddata.wait_for_import_status_ok(destinos[0], result["uri"], cookies)
+    return 1
+
+
+def run_batch(cookies, uris, destinos):
+    resultados = apigooddata.batch_export_and_import("origem", destinos[0], uris, cookies, EXPORT_OPTS, IMPORT_OPTS)
+    return sum(1 for r in resultados if r["status"] == "OK")
+
+
+def run_fanout(cookies, uris, destinos):
+    resultados = fanout_export_and_import("origem", destinos, uris, cookies, EXPORT_OPTS, IMPORT_OPTS)
+    return sum(len(uris) for r in resultados.values() if r["status"] == "OK")
+
+
+MODES = {"single": run_single, "batch": run_batch, "fanout": run_fanout}
+
+
+def bench(mode, runs, cookies, uris, destinos):
+    latencias = []
+    migrados = 0
+    inicio = time.perf_counter()
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        # As funções da API imprimem mensagens de depuração; não interessam aqui.
+        with contextlib.redirect_stdout(io.StringIO()):
+            migrados += MODES[mode](cookies, uris, destinos)
+        latencias.append(time.perf_counter() - t0)
+    total = time.perf_counter() - inicio
+    return {
+        "mode": mode,
+        "runs": runs,
+        "reports_migrated": migrados,
+        "throughput_per_s": round(migrados / total, 2) if total else 0.0,
+        "p50_s": round(percentile(latencias, 50), 4),
+        "p95_s": round(percentile(latencias, 95), 4),
+        "mean_s": round(statistics.mean(latencias), 4)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--reports", type=int, default=20, help="Relatórios por execução (batch/fan-out)")
+    parser.add_argument("--destinations", type=int, default=10, help="Destinos no modo fan-out")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--task-duration", type=float, default=0.3)
+    parser.add_argument("--modes", default="single,batch,fanout")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    parser.add_argument("--no-rate-limit", action="store_true", help="Desliga o limitador de taxa/concorrência do cliente")
+    args = parser.parse_args(argv)
+
+    uris = [f"/gdc/md/origem/obj/{i}" for i in range(1, args.reports + 1)]
+    destinos = [f"destino{i}" for i in range(1, args.destinations + 1)]
+    resultados = []
+    with MockGoodDataServer(latency=args.latency, failure_rate=args.failure_rate,
+                            task_duration=args.task_duration, seed=42) as server:
+        client = apigooddata.configure(server.base_url)
+        if args.no_rate_limit:
+            client.limiter = None
+        cookies = apigooddata.login_gooddata("bench@example.com", "bench")
+        for mode in args.modes.split(","):
+            resultados.append(bench(mode, args.runs, cookies, uris, destinos))
+        stats = server.stats
+
+    if args.json:
+        print(json.dumps({"results": resultados, "server": stats}, indent=2))
+        return
+    print(f"{'modo':<8} {'execuções':>9} {'migrados':>9} {'rel/s':>8} {'p50 (s)':>9} {'p95 (s)':>9}")
+    for r in resultados:
+        print(f"{r['mode']:<8} {r['runs']:>9} {r['reports_migrated']:>9} {r['throughput_per_s']:>8} "
+              f"{r['p50_s']:>9} {r['p95_s']:>9}")
+    print(f"\nConexões TCP abertas no servidor: {stats['connections']}  requisições: {stats['requests']}")
+
+
+if __name__ == "__main__":
+    main()
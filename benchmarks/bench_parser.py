@@ -0,0 +1,85 @@
+"""Micro-benchmark: parser de resposta do partialmdexport (streaming) x caminho antigo com regex.
+
+    python benchmarks/bench_parser.py --sizes 10000,1000000,10000000
+"""
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_parser import parse_export_artifact, parse_json_text  # noqa: E402
+
+CHUNK = 64 * 1024
+
+
+def legacy_export_token(html_text):
+    """Caminho antigo de export_partial_metadata."""
+    match = re.search(r"<pre>(.*?)</pre>", html_text, re.DOTALL)
+    json_str = match.group(1)
+    json_str = re.sub(r'<.*?>', '', json_str)
+    json_str = json_str.replace('&#x22;', '"')
+    return json.loads(json_str).get('partialMDArtifact', {}).get('token')
+
+
+def legacy_extract_json_from_html(html_text):
+    """Caminho antigo de extract_json_from_html."""
+    match = re.search(r"<pre[^>]*>(.*?)</pre>", html_text, re.DOTALL)
+    if match:
+        json_str = match.group(1)
+        json_str = re.sub(r'<[^>]+>', '', json_str)
+        json_str = re.sub(r'&#x22;|&quot;', '"', json_str)
+        json_str = re.sub(r'&#39;|&apos;', "'", json_str)
+        return json.loads(json_str)
+    return json.loads(re.search(r'({.*})', html_text, re.DOTALL).group(1))
+
+
+def build_response(size):
+    """Resposta no formato do servidor, com um campo de preenchimento até ~`size` bytes."""
+    artifact = {"partialMDArtifact": {"status": {"uri": "/gdc/md/ws/tasks/abc/status"}, "token": "tok123",
+                                      "padding": "x" * max(0, size - 200)}}
+    corpo = html.escape(json.dumps(artifact)).replace("&quot;", "&#x22;")
+    return f"<html><body><pre>{corpo}</pre></body></html>"
+
+
+def chunks(data):
+    return (data[i:i + CHUNK] for i in range(0, len(data), CHUNK))
+
+
+def peak_memory(func, *args):
+    tracemalloc.start()
+    func(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,1000000,10000000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    casos = [
+        ("export legado (regex)", lambda texto, dados: legacy_export_token(texto)),
+        ("export streaming", lambda texto, dados: parse_export_artifact(chunks(dados))),
+        ("extract_json legado", lambda texto, dados: legacy_extract_json_from_html(texto)),
+        ("extract_json novo", lambda texto, dados: parse_json_text(texto)),
+    ]
+    print(f"{'tamanho':>10}  {'caso':<24} {'ms/op':>9} {'pico de memória':>16}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        texto = build_response(size)
+        dados = texto.encode("utf-8")
+        for nome, func in casos:
+            tempos = timeit.repeat(lambda: func(texto, dados), number=1, repeat=args.repeat)
+            pico = peak_memory(func, texto, dados)
+            print(f"{len(dados):>10}  {nome:<24} {min(tempos) * 1000:>9.2f} {pico / 1024:>13.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
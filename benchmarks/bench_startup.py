@@ -0,0 +1,94 @@
+"""Benchmark de abertura: tempo até o primeiro frame do ReportTransfer, a partir do código e dos executáveis.
+
+    python build.py --mode onefile && python benchmarks/bench_startup.py --modes source,onefile
+    python build.py --mode onedir && python benchmarks/bench_startup.py --modes onedir
+
+O app grava o instante em que a janela fica visível no arquivo indicado por
+REPORTTRANSFER_STARTUP_PROBE e fecha sozinho.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_NAME = "ReportTransfer"
+PROBE_ENV = "REPORTTRANSFER_STARTUP_PROBE"
+
+
+def command_for(mode, dist):
+    exe = APP_NAME + (".exe" if sys.platform == "win32" else "")
+    if mode == "source":
+        return [sys.executable, os.path.join(RAIZ, "gooddata_app.py")]
+    if mode == "onefile":
+        return [os.path.join(dist, exe)]
+    if mode == "onedir":
+        return [os.path.join(dist, APP_NAME, exe)]
+    raise ValueError(f"Modo desconhecido: {mode}")
+
+
+def measure(command, timeout):
+    """Segundos entre iniciar o processo e a janela ficar visível, e se a API já estava carregada."""
+    with tempfile.TemporaryDirectory() as tmp:
+        probe = os.path.join(tmp, "probe.json")
+        env = {**os.environ, PROBE_ENV: probe}
+        inicio = time.time()
+        subprocess.run(command, env=env, timeout=timeout, check=False,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if not os.path.exists(probe):
+            raise RuntimeError(f"O app não registrou o primeiro frame: {' '.join(command)}")
+        with open(probe, encoding="utf-8") as f:
+            dados = json.load(f)
+    return dados["first_frame"] - inicio, dados["api_loaded"]
+
+
+def bench(mode, runs, dist, timeout):
+    command = command_for(mode, dist)
+    if not os.path.exists(command[-1]):
+        return {"mode": mode, "error": f"não encontrado: {command[-1]}"}
+    # A primeira abertura aquece o cache de disco do SO e não entra na conta.
+    measure(command, timeout)
+    tempos, api_carregada = [], False
+    for _ in range(runs):
+        tempo, carregada = measure(command, timeout)
+        tempos.append(tempo)
+        api_carregada = api_carregada or carregada
+    tempos.sort()
+    return {
+        "mode": mode,
+        "runs": runs,
+        "p50_s": round(statistics.median(tempos), 3),
+        "p95_s": round(tempos[min(len(tempos) - 1, int(0.95 * len(tempos)))], 3),
+        "min_s": round(tempos[0], 3),
+        "api_loaded_at_first_frame": api_carregada
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", default="source,onefile,onedir")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--dist", default=os.path.join(RAIZ, "dist"), help="Pasta com os executáveis gerados")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args(argv)
+
+    resultados = [bench(mode, args.runs, args.dist, args.timeout) for mode in args.modes.split(",")]
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+        return
+    print(f"{'modo':<8} {'execuções':>9} {'p50 (s)':>9} {'p95 (s)':>9} {'mín (s)':>9}  API no 1º frame")
+    for r in resultados:
+        if "error" in r:
+            print(f"{r['mode']:<8} {r['error']}")
+            continue
+        print(f"{r['mode']:<8} {r['runs']:>9} {r['p50_s']:>9} {r['p95_s']:>9} {r['min_s']:>9}  "
+              f"{'sim' if r['api_loaded_at_first_frame'] else 'não'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import PyInstaller.__main__
+import argparse
 import shutil
 import os
 
@@ -7,6 +8,17 @@ app_name = "ReportTransfer"
 main_script = "gooddata_app.py"
 icon_path = "icone.ico"  # Crie ou converta um ícone para .ico
 additional_files = [('config.ini', '.'), ('assets', 'assets')]
+# Módulos que o app não usa; ficam fora do pacote para reduzir o que é extraído/carregado na abertura.
+excluded_modules = [
+    'unittest', 'pydoc', 'doctest', 'pdb', 'lib2to3', 'xmlrpc', 'tkinter.test', 'test',
+    'httpx', 'apigooddata_async', 'mock_server', 'benchmarks', 'cli',
+]
+
+parser = argparse.ArgumentParser(description="Gera o executável do ReportTransfer.")
+parser.add_argument('--mode', choices=('onefile', 'onedir'), default='onefile',
+                    help="onefile: um único exe, extraído para uma pasta temporária a cada abertura; "
+                         "onedir: pasta já extraída, abertura mais rápida")
+build_args = parser.parse_args()
 
 # Limpa builds anteriores
 if os.path.exists('dist'):
@@ -17,17 +29,24 @@ if os.path.exists('build'):
 # Configura os argumentos do PyInstaller
 args = [
     '--name=%s' % app_name,
-    '--onefile',
+    '--%s' % build_args.mode,
     '--windowed',  # Não mostra console
     '--icon=%s' % icon_path,
     '--add-data=%s' % ';'.join([f'{src}{os.pathsep}{dst}' for src, dst in additional_files]),
     '--noconfirm',
     '--clean',
     '--log-level=WARN',
-    main_script
 ]
+args += ['--exclude-module=%s' % module for module in excluded_modules]
+if build_args.mode == 'onedir':
+    # DLLs comprimidas com UPX precisam ser descomprimidas a cada abertura.
+    args.append('--noupx')
+args.append(main_script)
 
 # Executa o PyInstaller
 PyInstaller.__main__.run(args)
 
-print("\nBuild completo! O executável está em: dist/" + app_name + ".exe")
\ No newline at end of file
+if build_args.mode == 'onedir':
+    print("\nBuild completo! O executável está em: dist/" + app_name + "/" + app_name + ".exe")
+else:
+    print("\nBuild completo! O executável está em: dist/" + app_name + ".exe")
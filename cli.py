@@ -0,0 +1,132 @@
+"""Execução de migrações sem interface gráfica (cron, containers).
+
+Uso:
+    GOODDATA_LOGIN=... GOODDATA_PASSWORD=... python cli.py job.json --workers 8
+
+O resultado é impresso em JSON no stdout; logs de depuração vão para o stderr.
+Código de saída: 0 tudo OK, 1 alguma migração falhou, 2 erro de configuração/login.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+
+logger = logging.getLogger("cli")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Migração de relatórios GoodData sem interface gráfica.")
+    parser.add_argument("job", help="Arquivo do job (JSON ou YAML)")
+    parser.add_argument("--login", default=os.environ.get("GOODDATA_LOGIN"), help="Email (padrão: $GOODDATA_LOGIN)")
+    parser.add_argument("--password", default=os.environ.get("GOODDATA_PASSWORD"), help="Senha (padrão: $GOODDATA_PASSWORD)")
+    parser.add_argument("--base-url", default=None, help="Host da API (padrão: $GOODDATA_BASE_URL ou o host de produção)")
+    parser.add_argument("--cache-sst", action="store_true",
+                        help="Guarda o SST com segurança para pular o login nas próximas execuções")
+    parser.add_argument("--workers", type=int, default=None, help="Importações paralelas (padrão: max_workers do job)")
+    parser.add_argument("--journal", help="Diário SQLite para retomar o job após uma queda")
+    parser.add_argument("--job-id", help="Identificador do job no diário (padrão: derivado do conteúdo do job)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Só resolve as dependências e mostra o plano de exportação, sem exportar")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Pula relatórios que não mudaram desde a última sincronização (o mesmo que incremental no job)")
+    parser.add_argument("--rate-limit", action="append", default=[], metavar="CLASSE=TAXA[/CONCORRÊNCIA]",
+                        help="Limite por classe de endpoint (account, export, import, status, metadata), "
+                             "ex.: --rate-limit export=1/2; pode ser repetido")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="Só enfileira o job na fila persistente (processada por 'python jobqueue.py work')")
+    parser.add_argument("--queue", default=None, help="Arquivo SQLite da fila (padrão: ~/.reporttransfer/queue.sqlite)")
+    parser.add_argument("--priority", type=int, default=0, help="Prioridade na fila (maior sai antes)")
+    parser.add_argument("--metrics-dir", help="Grava metrics.prom (Prometheus), spans.json (OTLP) e summary.json aqui")
+    parser.add_argument("--verbose", action="store_true", help="Mostra as mensagens de depuração da API no stderr")
+    parser.add_argument("--output", help="Grava o resultado JSON neste arquivo além do stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    saida = sys.stdout
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG if args.verbose else logging.INFO,
+                        format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    with contextlib.redirect_stdout(sys.stderr):
+        from apigooddata import configure
+        from metrics import METRICS
+        from ratelimit import RATE_LIMITER, parse_limit
+        from auth import authenticate
+        from migration import JobError, load_job_file, plan_job, run_job
+
+        try:
+            job = load_job_file(args.job)
+        except (OSError, ValueError, JobError) as e:
+            json.dump({"error": f"Job inválido: {str(e)}"}, saida)
+            saida.write("\n")
+            return 2
+        if args.incremental:
+            job["incremental"] = True
+        if args.enqueue:
+            from jobqueue import DEFAULT_QUEUE_PATH, JobQueue
+            fila = JobQueue(args.queue or DEFAULT_QUEUE_PATH)
+            try:
+                resumo = {"queued": fila.submit(job, priority=args.priority), "queue": fila.path, "stats": fila.stats()}
+            finally:
+                fila.close()
+            saida.write(json.dumps(resumo, ensure_ascii=False, indent=2) + "\n")
+            return 0
+        try:
+            rate_limits = dict(parse_limit(texto) for texto in args.rate_limit)
+        except ValueError as e:
+            json.dump({"error": str(e)}, saida)
+            saida.write("\n")
+            return 2
+        if args.base_url or rate_limits:
+            configure(args.base_url, rate_limits=rate_limits)
+        if not args.login or not args.password:
+            json.dump({"error": "Credenciais ausentes (use --login/--password ou GOODDATA_LOGIN/GOODDATA_PASSWORD)"}, saida)
+            saida.write("\n")
+            return 2
+        try:
+            cookies = authenticate(args.login, args.password, cache_sst=args.cache_sst).cookies
+        except Exception as e:
+            json.dump({"error": f"Falha no login: {str(e)}"}, saida)
+            saida.write("\n")
+            return 2
+
+        if args.dry_run:
+            try:
+                resumo = plan_job(job, cookies).to_dict()
+            except Exception as e:
+                json.dump({"error": f"Falha ao resolver dependências: {str(e)}"}, saida)
+                saida.write("\n")
+                return 2
+            saida.write(json.dumps(resumo, ensure_ascii=False, indent=2) + "\n")
+            return 0
+
+        def on_progress(destino, status, resumo):
+            logger.info("[%s] %s %s", destino, status, resumo)
+
+        journal = None
+        if args.journal:
+            from journal import MigrationJournal
+            journal = MigrationJournal(args.journal)
+        try:
+            resumo = run_job(job, cookies, max_workers=args.workers, progress_callback=on_progress,
+                             journal=journal, job_id=args.job_id)
+        finally:
+            if journal is not None:
+                journal.close()
+        resumo["metrics"] = METRICS.summary()
+        resumo["rate_limits"] = RATE_LIMITER.summary()
+        if args.metrics_dir:
+            METRICS.write(args.metrics_dir)
+
+    texto = json.dumps(resumo, ensure_ascii=False, indent=2)
+    saida.write(texto + "\n")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    return 0 if resumo["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from apigooddata import get_dependencies
+
+# Tamanho médio aproximado (bytes) de um objeto exportado, por categoria; usado só na estimativa do dry-run.
+AVG_OBJECT_BYTES = {
+    "report": 3000,
+    "reportDefinition": 6000,
+    "metric": 1500,
+    "attribute": 2500,
+    "attributeDisplayForm": 800,
+    "fact": 1000,
+    "dataSet": 2000,
+    "prompt": 1200,
+    "projectDashboard": 8000,
+    "visualizationObject": 4000
+}
+DEFAULT_OBJECT_BYTES = 2000
+
+
+class DependencyResolver:
+    """Resolve as dependências (`using2`) de objetos de metadados, com cache por workspace."""
+
+    def __init__(self, cookies, max_workers=8):
+        self.cookies = cookies
+        self.max_workers = max_workers
+        self.categories = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def dependencies(self, workspace_id, uri):
+        with self._lock:
+            cache = self._cache.setdefault(workspace_id, {})
+            if uri in cache:
+                return cache[uri]
+        entries = get_dependencies(workspace_id, uri, self.cookies)
+        deps = set()
+        with self._lock:
+            for entry in entries:
+                link = entry.get("link")
+                if link and link != uri:
+                    deps.add(link)
+                    self.categories[link] = entry.get("category")
+            self._cache[workspace_id][uri] = deps
+        return deps
+
+    def resolve(self, workspace_id, uris):
+        """Retorna uri -> conjunto de dependências, buscando em paralelo o que não está em cache."""
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(uris) or 1))) as executor:
+            deps = executor.map(lambda uri: self.dependencies(workspace_id, uri), uris)
+            return dict(zip(uris, deps))
+
+    def invalidate(self, workspace_id=None):
+        with self._lock:
+            if workspace_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(workspace_id, None)
+
+
+class ExportPlan:
+    """Lotes de exportação agrupando relatórios que compartilham dependências."""
+
+    def __init__(self, workspace_id, chunks, covered, objects, naive_objects, categories):
+        self.workspace_id = workspace_id
+        self.chunks = chunks
+        self.covered = covered
+        self.objects = objects
+        self.naive_objects = naive_objects
+        self.categories = categories
+
+    def estimated_bytes(self, uris=None):
+        uris = self.objects if uris is None else uris
+        return sum(AVG_OBJECT_BYTES.get(self.categories.get(uri), DEFAULT_OBJECT_BYTES) for uri in uris)
+
+    def to_dict(self):
+        return {
+            "workspace": self.workspace_id,
+            "chunks": [
+                {"uris": chunk["uris"], "covers": self.covered[i], "objects": len(chunk["objects"]),
+                 "estimated_bytes": self.estimated_bytes(chunk["objects"])}
+                for i, chunk in enumerate(self.chunks)
+            ],
+            "objects": sorted(self.objects),
+            "total_objects": sum(len(chunk["objects"]) for chunk in self.chunks),
+            "naive_total_objects": self.naive_objects,
+            "estimated_bytes": sum(self.estimated_bytes(chunk["objects"]) for chunk in self.chunks)
+        }
+
+
+def _components(roots, deps):
+    """Agrupa os relatórios que compartilham alguma dependência (union-find)."""
+    pai = {uri: uri for uri in roots}
+
+    def raiz(uri):
+        while pai[uri] != uri:
+            pai[uri] = pai[pai[uri]]
+            uri = pai[uri]
+        return uri
+
+    dono = {}
+    for uri in roots:
+        for dep in deps[uri]:
+            if dep in dono:
+                pai[raiz(uri)] = raiz(dono[dep])
+            else:
+                dono[dep] = uri
+    grupos = {}
+    for uri in roots:
+        grupos.setdefault(raiz(uri), []).append(uri)
+    return list(grupos.values())
+
+
+def plan_exports(resolver, workspace_id, uris, chunk_size):
+    """Calcula o conjunto mínimo de objetos e os lotes de exportação.
+
+    URIs que já são dependência de outra URI da lista não são enviadas (viajam
+    junto com quem as usa). Relatórios que compartilham dependências ficam no
+    mesmo lote sempre que cabem em `chunk_size`, para que cada dependência
+    compartilhada seja exportada uma vez só.
+    """
+    uris = list(dict.fromkeys(uris))
+    deps = resolver.resolve(workspace_id, uris)
+    # Uma URI é redundante se outra URI da lista depende dela (ciclos mantêm as duas).
+    roots = [uri for uri in uris
+             if not any(uri in deps[outra] and outra not in deps[uri] for outra in uris if outra != uri)]
+    dono = {uri: next((r for r in roots if uri in deps[r]), None) for uri in uris if uri not in roots}
+    # Sem raiz que a inclua diretamente (ex.: A -> B -> C com dependências diretas), a URI vai por conta própria.
+    roots.extend(uri for uri, root in dono.items() if root is None)
+    dono = {uri: root for uri, root in dono.items() if root is not None}
+
+    lotes = []
+    for componente in sorted(_components(roots, deps), key=len, reverse=True):
+        if len(componente) >= chunk_size:
+            lotes.extend(componente[i:i + chunk_size] for i in range(0, len(componente), chunk_size))
+            continue
+        for lote in lotes:
+            if len(lote) + len(componente) <= chunk_size:
+                lote.extend(componente)
+                break
+        else:
+            lotes.append(list(componente))
+
+    chunks = []
+    covered = []
+    for lote in lotes:
+        objetos = set(lote)
+        for uri in lote:
+            objetos |= deps[uri]
+        chunks.append({"uris": lote, "objects": objetos})
+        covered.append(lote + [uri for uri, root in dono.items() if root in lote])
+    todos = set().union(*(chunk["objects"] for chunk in chunks)) if chunks else set()
+    naive = sum(len(deps[uri]) + 1 for uri in uris)
+    return ExportPlan(workspace_id, chunks, covered, todos, naive, dict(resolver.categories))
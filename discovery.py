@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from apigooddata import OBJECTS_PAGE_SIZE, query_objects_page
+
+CATEGORIES = OrderedDict([("report", "Relatórios"), ("projectDashboard", "Dashboards"), ("metric", "Métricas")])
+# Pastas de relatórios são objetos "domain"; as de métricas, "folder".
+FOLDER_CATEGORIES = ("domain", "folder")
+DEFAULT_CATALOG_PATH = os.path.join(os.path.expanduser("~"), ".reporttransfer", "catalog.json")
+DEFAULT_TTL = 6 * 3600
+DEFAULT_MAX_WORKSPACES = 20
+
+logger = logging.getLogger("discovery")
+
+
+def iter_object_pages(workspace_id, category, cookies, page_size=OBJECTS_PAGE_SIZE):
+    """Percorre `objects/query` página a página, sem carregar a categoria inteira antes de devolver."""
+    offset = 0
+    while offset is not None:
+        itens, offset = query_objects_page(workspace_id, category, cookies, offset=offset, limit=page_size)
+        if itens:
+            yield itens
+
+
+def summarize_object(item, folders=None):
+    """Reduz um objeto de metadados ao que a lista de seleção precisa.
+
+    `folders` mapeia URI da pasta -> nome; None (nomes indisponíveis) deixa `folders` vazio.
+    """
+    categoria, corpo = next(iter(item.items()))
+    meta = corpo.get("meta", {})
+    content = corpo.get("content") or {}
+    pastas = content.get("domains") or content.get("folders") or []
+    return {
+        "uri": meta.get("uri"),
+        "category": categoria,
+        "title": meta.get("title", ""),
+        "identifier": meta.get("identifier", ""),
+        "tags": [tag for tag in (meta.get("tags") or "").split() if tag],
+        "updated": meta.get("updated", ""),
+        "folders": [folders.get(uri, uri) for uri in pastas] if folders is not None else []
+    }
+
+
+def filter_objects(objects, text="", category=None, folder=None, tag=None, updated_since=None):
+    """Filtra o catálogo: todas as palavras de `text` no título, identifier ou URI, e os filtros exatos.
+
+    `updated_since` é uma data "AAAA-MM-DD" (o `updated` do GoodData ordena como texto).
+    """
+    palavras = text.lower().split()
+    resultado = []
+    for obj in objects:
+        if category and obj["category"] != category:
+            continue
+        if folder and folder not in obj["folders"]:
+            continue
+        if tag and tag not in obj["tags"]:
+            continue
+        if updated_since and obj["updated"][:len(updated_since)] < updated_since:
+            continue
+        if palavras:
+            alvo = f"{obj['title']} {obj['identifier']} {obj['uri']}".lower()
+            if not all(p in alvo for p in palavras):
+                continue
+        resultado.append(obj)
+    return resultado
+
+
+def facets(objects):
+    """Pastas e tags presentes no catálogo, para os menus de filtro."""
+    pastas, tags = set(), set()
+    for obj in objects:
+        pastas.update(obj["folders"])
+        tags.update(obj["tags"])
+    return sorted(pastas), sorted(tags)
+
+
+class ReportCatalog:
+    """Catálogo de relatórios, dashboards e métricas por workspace, com cache em disco.
+
+    A descoberta entrega cada página assim que chega (`on_page`), para a
+    interface ir preenchendo a lista; o resultado completo fica em cache por
+    `ttl` segundos, mantendo os `max_workspaces` usados mais recentemente.
+    """
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH, ttl=DEFAULT_TTL, max_workspaces=DEFAULT_MAX_WORKSPACES):
+        self.path = path
+        self.ttl = ttl
+        self.max_workspaces = max_workspaces
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                dados = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Cache do catálogo ignorado: %s", e)
+            return
+        with self._lock:
+            self._entries.update(dados)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                dados = dict(self._entries)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, temporario = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(dados, f, ensure_ascii=False)
+                os.replace(temporario, self.path)
+            except BaseException:
+                os.unlink(temporario)
+                raise
+
+    def cached(self, workspace_id):
+        """Objetos em cache ainda dentro do TTL, ou None."""
+        with self._lock:
+            entry = self._entries.get(workspace_id)
+            if entry is None or time.time() - entry["fetched_at"] >= self.ttl:
+                return None
+            self._entries.move_to_end(workspace_id)
+            return entry["objects"]
+
+    def store(self, workspace_id, objects):
+        with self._lock:
+            self._entries[workspace_id] = {"fetched_at": time.time(), "objects": objects}
+            self._entries.move_to_end(workspace_id)
+            while len(self._entries) > self.max_workspaces:
+                self._entries.popitem(last=False)
+
+    def _folder_names(self, workspace_id, cookies):
+        """URI -> nome das pastas do workspace, ou None se a busca falhar (a descoberta segue sem elas)."""
+        nomes = {}
+        try:
+            for categoria in FOLDER_CATEGORIES:
+                for pagina in iter_object_pages(workspace_id, categoria, cookies):
+                    for item in pagina:
+                        meta = next(iter(item.values())).get("meta", {})
+                        nomes[meta.get("uri")] = meta.get("title", "")
+        except Exception as e:
+            logger.warning("Nomes das pastas indisponíveis em %s: %s", workspace_id, e)
+            return None
+        return nomes
+
+    def discover(self, workspace_id, cookies, categories=tuple(CATEGORIES), on_page=None, refresh=False):
+        """Lista os objetos do workspace; `on_page(objetos)` recebe cada página já resumida.
+
+        Os nomes das pastas são buscados em paralelo com a primeira página, e
+        cada página só é entregue já com os nomes: `on_page` costuma repassar a
+        lista para outra thread (a do Tk), então nada é alterado depois de
+        entregue. Se os nomes não puderem ser buscados, `folders` fica vazio.
+        """
+        if not refresh:
+            objetos = self.cached(workspace_id)
+            if objetos is not None:
+                objetos = [obj for obj in objetos if obj["category"] in categories]
+                if on_page:
+                    on_page(objetos)
+                return objetos
+        objetos = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            nomes = executor.submit(self._folder_names, workspace_id, cookies)
+            for categoria in categories:
+                for pagina in iter_object_pages(workspace_id, categoria, cookies):
+                    pastas = nomes.result()
+                    resumidos = [summarize_object(item, pastas) for item in pagina]
+                    objetos.extend(resumidos)
+                    if on_page:
+                        on_page(resumidos)
+        if set(categories) == set(CATEGORIES):
+            self.store(workspace_id, objetos)
+            self.save()
+        return objetos
@@ -0,0 +1,141 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from apigooddata import (
+    export_when_ready, import_partial_metadata, wait_for_import_status_ok,
+    GoodDataAPIError, RetryPolicy, StageBudget
+)
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_RETRIES = 2
+
+
+def is_token_expired_error(error):
+    return isinstance(error, GoodDataAPIError) and error.token_expired
+
+
+class SharedExportToken:
+    """Token de exportação compartilhado entre as threads de importação.
+
+    Quando uma importação descobre que o token expirou, apenas uma thread
+    refaz a exportação; as demais reaproveitam o token novo.
+    """
+
+    def __init__(self, workspace_origem, uris, cookies, export_opts, on_export=None):
+        self.workspace_origem = workspace_origem
+        self.uris = uris
+        self.cookies = cookies
+        self.export_opts = export_opts
+        self.token = None
+        self.exports = 0
+        self.on_export = on_export
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self.token is None:
+                self._export()
+            return self.token
+
+    def renew(self, expired_token):
+        with self._lock:
+            if self.token == expired_token:
+                self._export()
+            return self.token
+
+    def _export(self):
+        self.token = export_when_ready(self.workspace_origem, self.uris, self.cookies, **self.export_opts)
+        self.exports += 1
+        if self.on_export:
+            self.on_export(self.token)
+
+
+class FanoutProgress:
+    """Contadores agregados do fan-out, seguros para uso entre threads."""
+
+    def __init__(self, destinos, callback=None):
+        self.total = len(destinos)
+        self.status = {destino: "PENDENTE" for destino in destinos}
+        self.callback = callback
+        self._lock = threading.Lock()
+
+    def update(self, destino, status):
+        with self._lock:
+            self.status[destino] = status
+            snapshot = self._snapshot()
+        if self.callback:
+            self.callback(destino, status, snapshot)
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        resumo = {"total": self.total}
+        for status in self.status.values():
+            resumo[status] = resumo.get(status, 0) + 1
+        return resumo
+
+
+def _import_destino(shared_token, destino, cookies, import_opts, policy, progress, event_callback):
+    def evento(stage, **dados):
+        if event_callback:
+            event_callback(stage, destino, dados)
+
+    inicio = time.time()
+    estado = {"token": shared_token.get(), "tentativas": 0}
+
+    def importar():
+        estado["tentativas"] += 1
+        progress.update(destino, "EXECUTANDO")
+        try:
+            return import_partial_metadata(destino, estado["token"], cookies, **import_opts)
+        except Exception as e:
+            if is_token_expired_error(e):
+                estado["token"] = shared_token.renew(estado["token"])
+            raise
+
+    try:
+        result = policy.call("import", importar, on_retry=lambda *_: progress.update(destino, "REPETINDO"))
+        status = "OK"
+        if result.get("uri"):
+            evento("import", token=estado["token"], task_uri=result["uri"])
+            status = policy.call("poll", wait_for_import_status_ok, destino, result["uri"], cookies)
+        evento("done", status=status)
+        progress.update(destino, status)
+        return {"status": status, "tentativas": estado["tentativas"], "tempo": time.time() - inicio, "erro": None}
+    except Exception as e:
+        evento("done", status="ERROR", error=str(e))
+        progress.update(destino, "ERROR")
+        return {"status": "ERROR", "tentativas": estado["tentativas"], "tempo": time.time() - inicio, "erro": str(e)}
+
+
+def fanout_export_and_import(workspace_origem, destinos, report_uris, cookies, export_opts, import_opts,
+                             max_workers=DEFAULT_MAX_WORKERS, max_retries=DEFAULT_MAX_RETRIES,
+                             progress_callback=None, event_callback=None, shared_token=None):
+    """Exporta uma vez e importa em paralelo em vários workspaces de destino.
+
+    `progress_callback(destino, status, resumo)` é chamado a cada mudança de
+    estado. `event_callback(stage, destino, dados)` recebe as etapas `export`
+    (destino None), `import` (URI da tarefa) e `done` (status final), para
+    quem precisa registrá-las. Um `shared_token` já preenchido (ex.: de um
+    pacote arquivado) evita a exportação enquanto o token for válido.
+    Retorna um dicionário destino -> resultado.
+    """
+    destinos = list(dict.fromkeys(destinos))
+    policy = RetryPolicy({"import": StageBudget(max_attempts=max_retries + 1, base_delay=1.0)})
+    on_export = (lambda token: event_callback("export", None, {"token": token})) if event_callback else None
+    if shared_token is None:
+        shared_token = SharedExportToken(workspace_origem, report_uris, cookies, export_opts, on_export)
+    policy.call("export", shared_token.get)
+    progress = FanoutProgress(destinos, progress_callback)
+    resultados = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(destinos)))) as executor:
+        futures = {
+            executor.submit(_import_destino, shared_token, destino, cookies, import_opts, policy, progress, event_callback): destino
+            for destino in destinos
+        }
+        for future in as_completed(futures):
+            resultados[futures[future]] = future.result()
+    return resultados
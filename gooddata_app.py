@@ -1,15 +1,73 @@
 import customtkinter as ctk
 import tkinter as tk
 import time
-import requests
 import copy
 from tkinter import messagebox
 import threading
-from apigooddata import (
-    test_dns_resolution, login_gooddata, get_workspace_name,
-    export_partial_metadata, import_partial_metadata,
-    extract_report_uri, wait_for_import_status_ok, export_and_import
-)
+import queue
+import os
+import sys
+import types
+import json
+import logging
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+LOG_MAX_LINES = 2000           # linhas mantidas no widget (o resto fica só no arquivo)
+LOG_FLUSH_INTERVAL_MS = 100    # intervalo entre inserções em lote no widget
+LOG_FILE = os.path.join(os.path.expanduser("~"), ".reporttransfer", "reporttransfer.log")
+STARTUP_PROBE_ENV = "REPORTTRANSFER_STARTUP_PROBE"  # usado por benchmarks/bench_startup.py
+DISCOVERY_INSERT_BATCH = 500     # linhas inseridas na lista de objetos por ciclo do Tk
+DISCOVERY_TICK_MS = 50           # intervalo entre ciclos de inserção
+DISCOVERY_FILTER_DELAY_MS = 250  # espera após a digitação antes de refiltrar
+TODOS = "Todos"
+
+def create_file_logger(path=LOG_FILE, max_bytes=5 * 1024 * 1024, backups=3):
+    """Logger que grava o log completo em arquivo rotativo."""
+    logger = logging.getLogger("reporttransfer")
+    if not logger.handlers:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        except OSError as e:
+            logging.getLogger("gooddata_app").warning("Log em arquivo desativado: %s", e)
+            handler = logging.NullHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        # Mensagens da camada de API vão para o mesmo arquivo.
+        api_logger = logging.getLogger("apigooddata")
+        api_logger.addHandler(handler)
+        api_logger.setLevel(logging.INFO)
+    return logger
+
+_api = None
+_api_lock = threading.Lock()
+
+def load_api():
+    """Importa a camada de API (requests, apigooddata e módulos vizinhos) só quando necessária.
+
+    Esses imports custam boa parte da abertura do executável; o LoginFrame
+    dispara o carregamento em segundo plano depois que a janela aparece.
+    """
+    global _api
+    with _api_lock:
+        if _api is None:
+            from apigooddata import (
+                test_dns_resolution, import_partial_metadata, extract_report_uri, wait_for_import_status_ok,
+                split_report_links, dedupe_report_uris, GoodDataAPIError, RetryPolicy, get_default_client,
+                export_when_ready
+            )
+            from pipeline import pipelined_batch_export_and_import
+            from auth import authenticate
+            from fanout import fanout_export_and_import
+            from workspace_cache import WorkspaceCache
+            from discovery import CATEGORIES, ReportCatalog, facets, filter_objects
+            from migration import normalize_job
+            from jobqueue import HIGH_PRIORITY, JobQueue
+            _api = types.SimpleNamespace(**locals())
+    return _api
 
 # Configuração do tema
 ctk.set_appearance_mode("System")
@@ -21,6 +79,7 @@ class LoginFrame(ctk.CTkFrame):
         self.on_login_success = on_login_success
         self._is_destroyed = False
         self.create_widgets()
+        self.after_idle(lambda: threading.Thread(target=load_api, daemon=True).start())
 
     def create_widgets(self):
         self.grid_columnconfigure(0, weight=1)
@@ -57,12 +116,13 @@ class LoginFrame(ctk.CTkFrame):
 
         def login_thread():
             try:
-                if not test_dns_resolution("analytics.moveresoftware.com"):
+                api = load_api()
+                if not api.test_dns_resolution(api.get_default_client().hostname):
                     self.safe_update(lambda: messagebox.showerror("Erro", "Falha ao resolver o nome do host"))
                     return
-                cookies = login_gooddata(login, senha)
-                print("COOKIES LOGIN:", cookies)
-                self.safe_update(lambda: self.on_login_success(cookies))
+                auth = api.authenticate(login, senha)
+                cookies = auth.cookies
+                self.safe_update(lambda: self.on_login_success(cookies, api))
             except Exception as e:
                 self.safe_update(lambda: messagebox.showerror("Erro de Login", str(e)))
             finally:
@@ -83,11 +143,18 @@ class LoginFrame(ctk.CTkFrame):
         super().destroy()
 
 class ExportImportFrame(ctk.CTkFrame):
-    def __init__(self, master, cookies):
+    def __init__(self, master, cookies, api):
         super().__init__(master)
         self.cookies = cookies
         self.running = False
+        # Carregada pela thread do login; o loop do Tk nunca espera pelos imports da API.
+        self.api = api
+        self.workspace_cache = self.api.WorkspaceCache()
+        self.log_queue = queue.Queue()
+        self.file_logger = create_file_logger()
         self.create_widgets()
+        self._log_after_id = self.after(LOG_FLUSH_INTERVAL_MS, self._drain_log)
+        self._preload_workspaces()
 
     def create_widgets(self):
         self.grid_columnconfigure((0, 1), weight=1)
@@ -109,6 +176,7 @@ class ExportImportFrame(ctk.CTkFrame):
         self.workspace_id_entry = ctk.CTkEntry(self.origem_frame)
         self.workspace_id_entry.grid(row=0, column=0, padx=(0, 10), sticky="ew")
         self.workspace_id_entry.bind("<FocusOut>", self.update_nome_origem)
+        self.workspace_id_entry.bind("<KeyRelease>", lambda e: self._sugerir_workspace(self.workspace_id_entry, self.workspace_nome_origem))
         self.workspace_nome_origem = ctk.CTkLabel(self.origem_frame, text="", width=120, anchor="w")
         self.workspace_nome_origem.grid(row=0, column=1, sticky="ew")
 
@@ -121,13 +189,16 @@ class ExportImportFrame(ctk.CTkFrame):
         self.workspace_id_destino_entry = ctk.CTkEntry(self.destino_frame)
         self.workspace_id_destino_entry.grid(row=0, column=0, padx=(0, 10), sticky="ew")
         self.workspace_id_destino_entry.bind("<FocusOut>", self.update_nome_destino)
+        self.workspace_id_destino_entry.bind("<KeyRelease>", lambda e: self._sugerir_workspace(self.workspace_id_destino_entry, self.workspace_nome_destino))
         self.workspace_nome_destino = ctk.CTkLabel(self.destino_frame, text="", width=120, anchor="w")
         self.workspace_nome_destino.grid(row=0, column=1, sticky="ew")
 
-        self.label_report = ctk.CTkLabel(self, text="Link do relatório para Exportar:")
+        self.label_report = ctk.CTkLabel(self, text="Link(s) do relatório para Exportar (separe vários com espaço ou ';'):")
         self.label_report.grid(row=3, column=0, columnspan=2, padx=20, pady=(10, 5), sticky="w")
         self.report_link_entry = ctk.CTkEntry(self, placeholder_text="Cole aqui o link")
         self.report_link_entry.grid(row=4, column=0, columnspan=2, padx=20, pady=(0, 20), sticky="ew")
+        self.discover_btn = ctk.CTkButton(self, text="Buscar no workspace...", command=self.open_discovery, width=160)
+        self.discover_btn.grid(row=4, column=2, padx=(0, 10), pady=(0, 20), sticky="e")
 
         self.export_options_label = ctk.CTkLabel(self, text="Opções de Exportação:")
         self.export_options_label.grid(row=5, column=0, columnspan=2, padx=20, pady=(0, 5), sticky="w")
@@ -158,6 +229,10 @@ class ExportImportFrame(ctk.CTkFrame):
         self.attr_prop_var = tk.IntVar(value=0)
         self.attr_prop_chk = ctk.CTkCheckBox(self.import_checkbox_frame, text="Importar propriedades", variable=self.attr_prop_var)
         self.attr_prop_chk.grid(row=0, column=2, padx=10, pady=5, sticky="w")
+        self.queue_var = tk.IntVar(value=0)
+        self.queue_chk = ctk.CTkCheckBox(self.import_checkbox_frame, text="Enviar para a fila (roda sem a janela aberta)",
+                                         variable=self.queue_var)
+        self.queue_chk.grid(row=1, column=0, columnspan=3, padx=(20, 10), pady=5, sticky="w")
 
         self.start_btn = ctk.CTkButton(self, text="Iniciar Processo", command=self.start_process, fg_color="#239B56", width=300)
         self.start_btn.grid(row=10, column=0, columnspan=3, padx=10, pady=10, sticky="nsew")
@@ -173,24 +248,66 @@ class ExportImportFrame(ctk.CTkFrame):
     def update_nome_origem(self, event=None):
         workspace_id = self.workspace_id_entry.get().strip()
         if workspace_id:
-            try:
-                nome = get_workspace_name(workspace_id, self.cookies)
-                self.workspace_nome_origem.configure(text=nome)
-            except Exception as e:
-                self.workspace_nome_origem.configure(text="Erro ao buscar")
-                self.log(f"Erro ao buscar workspace origem: {str(e)}")
+            self._atualizar_nome(workspace_id, self.workspace_nome_origem, "origem")
 
     def update_nome_destino(self, event=None):
         workspace_id = self.workspace_id_destino_entry.get().strip()
+        destinos = self.api.split_report_links(workspace_id)
+        if len(destinos) > 1:
+            self.workspace_nome_destino.configure(text=f"{len(destinos)} destinos")
+            return
         if workspace_id:
+            self._atualizar_nome(workspace_id, self.workspace_nome_destino, "destino")
+
+    def _atualizar_nome(self, workspace_id, label, descricao):
+        """Mostra o nome em cache na hora e revalida em segundo plano, sem travar o Tk."""
+        nome = self.workspace_cache.peek(workspace_id)
+        if nome:
+            label.configure(text=nome)
+
+        def buscar():
             try:
-                nome = get_workspace_name(workspace_id, self.cookies)
-                self.workspace_nome_destino.configure(text=nome)
+                nome = self.workspace_cache.get_name(workspace_id, self.cookies)
+                self.after(0, lambda: label.configure(text=nome))
             except Exception as e:
-                self.workspace_nome_destino.configure(text="Erro ao buscar")
-                self.log(f"Erro ao buscar workspace destino: {str(e)}")
+                msg = f"Erro ao buscar workspace {descricao}: {str(e)}"
+                self.after(0, lambda: label.configure(text="Erro ao buscar"))
+                self.log(msg)
+
+        threading.Thread(target=buscar, daemon=True).start()
+
+    def _sugerir_workspace(self, entry, label):
+        """Autocompletar simples: mostra o workspace do cache que corresponde ao que foi digitado."""
+        texto = entry.get().strip()
+        if len(self.api.split_report_links(texto)) > 1:
+            return
+        sugestoes = self.workspace_cache.search(texto, limit=1)
+        label.configure(text=sugestoes[0][1] if sugestoes else "")
+
+    def _preload_workspaces(self):
+        def carregar():
+            try:
+                self.workspace_cache.preload(self.cookies)
+            except Exception as e:
+                self.file_logger.warning(f"Falha ao pré-carregar workspaces: {str(e)}")
+
+        threading.Thread(target=carregar, daemon=True).start()
+
+    def open_discovery(self):
+        workspace_id = self.workspace_id_entry.get().strip()
+        if not workspace_id:
+            messagebox.showerror("Erro", "Informe o código do projeto de origem")
+            return
+        DiscoveryWindow(self, self.api, workspace_id, self.cookies, self._usar_selecao)
+
+    def _usar_selecao(self, uris, migrar=False):
+        """Recebe a seleção da DiscoveryWindow; várias URIs seguem pelo caminho de lote."""
+        self.report_link_entry.delete(0, tk.END)
+        self.report_link_entry.insert(0, " ".join(uris))
+        self.log(f"{len(uris)} objeto(s) selecionado(s) no workspace de origem.")
+        if migrar:
+            self.start_process()
 
-    
     def start_process(self):
         if self.running:
             return
@@ -200,6 +317,9 @@ class ExportImportFrame(ctk.CTkFrame):
         if not workspace_id or not workspace_id_destino or not report_link:
             messagebox.showerror("Erro", "Preencha todos os campos obrigatórios")
             return
+        if self.queue_var.get():
+            self._enfileirar(workspace_id, workspace_id_destino, report_link)
+            return
         self.running = True
         self.start_btn.configure(state=tk.DISABLED, text="Executando...")
         cookies_clone = copy.copy(self.cookies)
@@ -215,80 +335,382 @@ class ExportImportFrame(ctk.CTkFrame):
             cookies_clone
         ), daemon=True).start()
 
+    def _enfileirar(self, workspace_id, workspace_id_destino, report_link):
+        """Grava a migração na fila persistente; os workers de `jobqueue.py work` a executam."""
+        try:
+            job = self.api.normalize_job({
+                "source": workspace_id,
+                "destinations": self.api.split_report_links(workspace_id_destino),
+                "reports": self.api.split_report_links(report_link),
+                "export": {
+                    "exportAttributeProperties": self.export_attr_var.get(),
+                    "crossDataCenterExport": self.export_cross_var.get()
+                },
+                "import": {
+                    "overwriteNewer": self.overwrite_var.get(),
+                    "updateLDMObjects": self.ldm_var.get(),
+                    "importAttributeProperties": self.attr_prop_var.get()
+                }
+            })
+            fila = self.api.JobQueue()
+            try:
+                job_id = fila.submit(job, priority=self.api.HIGH_PRIORITY)
+                pendentes = fila.stats()["queued"]
+            finally:
+                fila.close()
+        except Exception as e:
+            messagebox.showerror("Erro", f"Não foi possível enfileirar: {str(e)}")
+            return
+        self.log(f"Job {job_id} enfileirado ({len(job['reports'])} relatório(s), {len(job['destinations'])} destino(s)); "
+                 f"{pendentes} job(s) aguardando na fila.")
+
     def _process(self, workspace_id, workspace_id_destino, report_link,
              export_attr, export_cross, overwrite, ldm, attr_prop, cookies):
+        links = self.api.split_report_links(report_link)
+        destinos = self.api.split_report_links(workspace_id_destino)
+        if len(destinos) > 1:
+            self._process_fanout(workspace_id, destinos, links,
+                                 export_attr, export_cross, overwrite, ldm, attr_prop, cookies)
+            return
+        if len(links) > 1:
+            self._process_batch(workspace_id, workspace_id_destino, links,
+                                export_attr, export_cross, overwrite, ldm, attr_prop, cookies)
+            return
+        policy = self.api.RetryPolicy()
         try:
             self.log("\n=== PROCESSO INICIADO ===")
-            max_attempts = 3
-            for attempt in range(max_attempts):
+            report_url = self.api.extract_report_uri(report_link)
+
+            def on_retry(erro, tentativa, atraso):
+                self.log(f"⚠️ Tentativa {tentativa} falhou: {str(erro)}. Nova tentativa em {atraso:.0f}s...")
+
+            def exportar():
+                self.log("\n🔁 Exportando metadados...")
+                token = policy.call(
+                    "export",
+                    self.api.export_when_ready,
+                    workspace_id,
+                    report_url,
+                    cookies,
+                    exportAttributeProperties=export_attr,
+                    crossDataCenterExport=export_cross,
+                    on_retry=on_retry
+                )
+                self.log(f"✅ Token obtido: {token[:8]}...")
+                return token
+
+            estado = {"token": exportar(), "expirado": False}
+
+            def importar():
+                if estado["expirado"]:
+                    self.log("🔄 Token expirado, exportando novamente...")
+                    estado["token"] = exportar()
+                    estado["expirado"] = False
+                self.log("\n🚀 Importando metadados...")
                 try:
-                    self.log(f"\nTentativa {attempt + 1}/{max_attempts}")
-                    # 1. Exportação
-                    self.log("\n🔁 Exportando metadados...")
-                    report_url = extract_report_uri(report_link)
-                    token = export_partial_metadata(
-                        workspace_id,
-                        report_url,
+                    return self.api.import_partial_metadata(
+                        workspace_id_destino,
+                        estado["token"],
                         cookies,
-                        exportAttributeProperties=export_attr,
-                        crossDataCenterExport=export_cross
+                        overwriteNewer=overwrite,
+                        updateLDMObjects=ldm,
+                        importAttributeProperties=attr_prop
                     )
-                    self.log(f"✅ Token obtido: {token[:8]}...")
-
-                    # Retry automático na importação
-                    import_max_attempts = 5
-                    import_delay = 5  # segundos
-                    time.sleep(5)
-                    for import_attempt in range(import_max_attempts):
-                        try:
-                            self.log(f"\n🚀 Importando metadados... (tentativa {import_attempt+1}/{import_max_attempts})")
-                            start_time = time.time()
-                            result = import_partial_metadata(
-                                workspace_id_destino,
-                                token,
-                                cookies,
-                                overwriteNewer=overwrite,
-                                updateLDMObjects=ldm,
-                                importAttributeProperties=attr_prop
-                            )
-                            elapsed = time.time() - start_time
-                            self.log(f"⏱️ Tempo total: {elapsed:.2f}s")
-                            if result.get("uri"):
-                                self.log(f"\n🔍 Monitorando status: {result['uri']}")
-                                status = wait_for_import_status_ok(workspace_id_destino, result['uri'], cookies)
-                                self.log(f"\nStatus final: {status}")
-                            self.log("\n✅ Importação concluída com sucesso!")
-                            return
-                        except Exception as e:
-                            if "no longer available" in str(e) or "404" in str(e):
-                                self.log(f"⚠️ Import falhou: {str(e)}. Tentando novamente em {import_delay}s...")
-                                time.sleep(import_delay)
-                            else:
-                                raise
-                    # Se todas as tentativas de importação falharem, lança exceção
-                    raise Exception("Falha ao importar: pacote não ficou disponível após múltiplas tentativas.")
-
-                except Exception as e:
-                    if attempt == max_attempts - 1:
-                        raise
-                    self.log(f"\n⚠️ Tentativa {attempt + 1} falhou: {str(e)}")
-                    self.log("🔄 Tentando novamente...")
-                    time.sleep(5)
+                except self.api.GoodDataAPIError as e:
+                    estado["expirado"] = e.token_expired
+                    raise
+
+            start_time = time.time()
+            result = policy.call("import", importar, on_retry=on_retry)
+            elapsed = time.time() - start_time
+            self.log(f"⏱️ Tempo total: {elapsed:.2f}s")
+            if result.get("uri"):
+                self.log(f"\n🔍 Monitorando status: {result['uri']}")
+                status = policy.call("poll", self.api.wait_for_import_status_ok, workspace_id_destino, result['uri'], cookies,
+                                     on_retry=on_retry)
+                self.log(f"\nStatus final: {status}")
+            self.log("\n✅ Importação concluída com sucesso!")
 
         except Exception as e:
             self.log(f"\n❌ ERRO: {str(e)}")
-            if "no longer available" in str(e):
+            if getattr(e, "token_expired", False):
                 self.log("\n💡 Dica: O token pode ter expirado rapidamente. Tente:")
                 self.log("1. Reduzir o tempo entre exportação e importação")
                 self.log("2. Verificar a conexão com a internet")
+        finally:
+            for etapa, valores in policy.summary().items():
+                self.log(f"[{etapa}] tentativas: {valores['attempts']}, retries: {valores['retries']}, "
+                         f"tempo: {valores['elapsed']:.2f}s")
+            self.after(0, lambda: self.start_btn.configure(state=tk.NORMAL, text="Iniciar Processo"))
+            self.running = False
+
+    def _process_batch(self, workspace_id, workspace_id_destino, links,
+                       export_attr, export_cross, overwrite, ldm, attr_prop, cookies):
+        try:
+            self.log(f"\n=== PROCESSO EM LOTE INICIADO ({len(links)} links) ===")
+            resultados = self.api.pipelined_batch_export_and_import(
+                workspace_id,
+                workspace_id_destino,
+                links,
+                cookies,
+                export_opts={
+                    "exportAttributeProperties": export_attr,
+                    "crossDataCenterExport": export_cross
+                },
+                import_opts={
+                    "overwriteNewer": overwrite,
+                    "updateLDMObjects": ldm,
+                    "importAttributeProperties": attr_prop
+                },
+                on_batch=lambda r: self.log(f"Lote com {len(r['uris'])} objeto(s): {r['status']}")
+            )
+            self.log("\nLote | Status | URI")
+            for r in resultados:
+                self.log(f"{r['chunk']:>4} | {r['status']:<6} | {r['uri']}")
+                if r["erro"]:
+                    self.log(f"       ❌ {r['erro']}")
+            ok = sum(1 for r in resultados if r["status"] == "OK")
+            self.log(f"\n✅ {ok}/{len(resultados)} relatórios migrados com sucesso.")
+        except Exception as e:
+            self.log(f"\n❌ ERRO: {str(e)}")
+        finally:
+            self.after(0, lambda: self.start_btn.configure(state=tk.NORMAL, text="Iniciar Processo"))
+            self.running = False
+
+    def _process_fanout(self, workspace_id, destinos, links,
+                        export_attr, export_cross, overwrite, ldm, attr_prop, cookies):
+        try:
+            self.log(f"\n=== FAN-OUT INICIADO ({len(destinos)} destinos) ===")
+            uris, _ = self.api.dedupe_report_uris(links)
+
+            def on_progress(destino, status, resumo):
+                andamento = ", ".join(f"{k}: {v}" for k, v in resumo.items() if k != "total")
+                self.log(f"[{destino}] {status}  ({andamento})")
+
+            inicio = time.time()
+            resultados = self.api.fanout_export_and_import(
+                workspace_id,
+                destinos,
+                uris,
+                cookies,
+                export_opts={
+                    "exportAttributeProperties": export_attr,
+                    "crossDataCenterExport": export_cross
+                },
+                import_opts={
+                    "overwriteNewer": overwrite,
+                    "updateLDMObjects": ldm,
+                    "importAttributeProperties": attr_prop
+                },
+                progress_callback=on_progress
+            )
+            ok = sum(1 for r in resultados.values() if r["status"] == "OK")
+            for destino, r in resultados.items():
+                if r["erro"]:
+                    self.log(f"❌ {destino}: {r['erro']}")
+            self.log(f"\n✅ {ok}/{len(resultados)} destinos concluídos em {time.time() - inicio:.2f}s")
+        except Exception as e:
+            self.log(f"\n❌ ERRO: {str(e)}")
         finally:
             self.after(0, lambda: self.start_btn.configure(state=tk.NORMAL, text="Iniciar Processo"))
             self.running = False
 
     def log(self, msg):
-        self.log_text.insert(tk.END, msg + "\n")
-        self.log_text.see(tk.END)
-        self.update()
+        """Pode ser chamado de qualquer thread: só enfileira; o loop do Tk insere em lote."""
+        self.log_queue.put(msg)
+        self.file_logger.info(msg)
+
+    def _drain_log(self):
+        # Só as últimas LOG_MAX_LINES cabem no widget; uma rajada maior não passa pelo Tk (já está no arquivo).
+        linhas = deque(maxlen=LOG_MAX_LINES)
+        try:
+            while True:
+                linhas.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if linhas:
+            self.log_text.insert(tk.END, "\n".join(linhas) + "\n")
+            excesso = int(self.log_text.index("end-1c").split(".")[0]) - 1 - LOG_MAX_LINES
+            if excesso > 0:
+                self.log_text.delete("1.0", f"{excesso + 1}.0")
+            self.log_text.see(tk.END)
+        self._log_after_id = self.after(LOG_FLUSH_INTERVAL_MS, self._drain_log)
+
+    def destroy(self):
+        self.after_cancel(self._log_after_id)
+        super().destroy()
+
+class DiscoveryWindow(ctk.CTkToplevel):
+    """Lista relatórios, dashboards e métricas do workspace de origem para seleção em massa.
+
+    As páginas chegam de uma thread por uma fila e o loop do Tk as insere em
+    lotes na Listbox (que só desenha as linhas visíveis), então dezenas de
+    milhares de objetos não travam a janela. Busca e filtros rodam sobre o
+    catálogo já carregado, que fica em cache local (ReportCatalog).
+    """
+
+    def __init__(self, master, api, workspace_id, cookies, on_select):
+        super().__init__(master)
+        self.title(f"Objetos do workspace {workspace_id}")
+        self.geometry("780x560")
+        self.api = api
+        self.workspace_id = workspace_id
+        self.cookies = cookies
+        self.on_select = on_select
+        self.catalog = api.ReportCatalog()
+        self.objects = []
+        self.visible = []
+        self.page_queue = queue.Queue()
+        self._loading = False
+        self._tick_id = None
+        self._filter_id = None
+        self.create_widgets()
+        self.load()
+
+    def create_widgets(self):
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+
+        busca = ctk.CTkFrame(self, fg_color="transparent")
+        busca.grid(row=0, column=0, columnspan=2, padx=10, pady=(10, 5), sticky="ew")
+        busca.grid_columnconfigure(0, weight=1)
+        self.search_entry = ctk.CTkEntry(busca, placeholder_text="Buscar por título, identifier ou URI")
+        self.search_entry.grid(row=0, column=0, padx=(0, 10), sticky="ew")
+        self.search_entry.bind("<KeyRelease>", lambda e: self._schedule_filter())
+        self.refresh_btn = ctk.CTkButton(busca, text="Atualizar", width=100, command=lambda: self.load(refresh=True))
+        self.refresh_btn.grid(row=0, column=1)
+
+        filtros = ctk.CTkFrame(self, fg_color="transparent")
+        filtros.grid(row=1, column=0, columnspan=2, padx=10, pady=5, sticky="ew")
+        self.category_var = tk.StringVar(value=TODOS)
+        self.category_menu = ctk.CTkOptionMenu(filtros, variable=self.category_var, width=130,
+                                               values=[TODOS] + list(self.api.CATEGORIES.values()),
+                                               command=lambda _: self._schedule_filter())
+        self.category_menu.grid(row=0, column=0, padx=(0, 10))
+        self.folder_var = tk.StringVar(value=TODOS)
+        self.folder_menu = ctk.CTkOptionMenu(filtros, variable=self.folder_var, values=[TODOS], width=170,
+                                             command=lambda _: self._schedule_filter())
+        self.folder_menu.grid(row=0, column=1, padx=(0, 10))
+        self.tag_var = tk.StringVar(value=TODOS)
+        self.tag_menu = ctk.CTkOptionMenu(filtros, variable=self.tag_var, values=[TODOS], width=140,
+                                          command=lambda _: self._schedule_filter())
+        self.tag_menu.grid(row=0, column=2, padx=(0, 10))
+        self.date_entry = ctk.CTkEntry(filtros, placeholder_text="Alterado desde AAAA-MM-DD", width=190)
+        self.date_entry.grid(row=0, column=3)
+        self.date_entry.bind("<KeyRelease>", lambda e: self._schedule_filter())
+
+        self.listbox = tk.Listbox(self, selectmode=tk.EXTENDED, activestyle="none", font=('Consolas', 10))
+        self.listbox.grid(row=2, column=0, padx=(10, 0), pady=5, sticky="nsew")
+        scrollbar = ctk.CTkScrollbar(self, command=self.listbox.yview)
+        scrollbar.grid(row=2, column=1, padx=(0, 10), pady=5, sticky="ns")
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+
+        rodape = ctk.CTkFrame(self, fg_color="transparent")
+        rodape.grid(row=3, column=0, columnspan=2, padx=10, pady=(5, 10), sticky="ew")
+        rodape.grid_columnconfigure(0, weight=1)
+        self.status_label = ctk.CTkLabel(rodape, text="", anchor="w")
+        self.status_label.grid(row=0, column=0, sticky="ew")
+        self.use_btn = ctk.CTkButton(rodape, text="Usar seleção", width=130, command=lambda: self._confirmar(False))
+        self.use_btn.grid(row=0, column=1, padx=(10, 0))
+        self.migrate_btn = ctk.CTkButton(rodape, text="Migrar seleção", width=130, fg_color="#239B56",
+                                         command=lambda: self._confirmar(True))
+        self.migrate_btn.grid(row=0, column=2, padx=(10, 0))
+
+    def load(self, refresh=False):
+        if self._loading:
+            return
+        self._loading = True
+        self.objects = []
+        self.visible = []
+        self.listbox.delete(0, tk.END)
+        self.status_label.configure(text="Carregando objetos...")
+
+        def buscar():
+            try:
+                self.catalog.discover(self.workspace_id, self.cookies, on_page=self.page_queue.put, refresh=refresh)
+                self.page_queue.put(None)
+            except Exception as e:
+                self.page_queue.put(e)
+
+        threading.Thread(target=buscar, daemon=True).start()
+        self._schedule_tick()
+
+    def _schedule_tick(self):
+        if self._tick_id is None:
+            self._tick_id = self.after(DISCOVERY_TICK_MS, self._tick)
+
+    def _tick(self):
+        """Consome as páginas recebidas e insere no máximo DISCOVERY_INSERT_BATCH linhas por ciclo."""
+        self._tick_id = None
+        try:
+            while True:
+                item = self.page_queue.get_nowait()
+                if item is None or isinstance(item, Exception):
+                    self._loading = False
+                    self._update_facets()
+                    if isinstance(item, Exception):
+                        self.status_label.configure(text=f"Erro ao listar objetos: {str(item)}")
+                    continue
+                self.objects.extend(item)
+                self.visible.extend(self._filter(item))
+        except queue.Empty:
+            pass
+        inseridos = self.listbox.size()
+        lote = self.visible[inseridos:inseridos + DISCOVERY_INSERT_BATCH]
+        if lote:
+            self.listbox.insert(tk.END, *(self._format(obj) for obj in lote))
+        if not self.status_label.cget("text").startswith("Erro"):
+            sufixo = " (carregando...)" if self._loading else ""
+            self.status_label.configure(text=f"{len(self.visible)} de {len(self.objects)} objetos{sufixo}")
+        if self._loading or self.listbox.size() < len(self.visible):
+            self._schedule_tick()
+
+    @staticmethod
+    def _format(obj):
+        pastas = f"  [{', '.join(obj['folders'])}]" if obj["folders"] else ""
+        return f"{obj['updated'][:10]}  {obj['category']:<16} {obj['title']}{pastas}"
+
+    def _filter(self, objects):
+        categorias = {nome: chave for chave, nome in self.api.CATEGORIES.items()}
+        selecionado = lambda var: None if var.get() == TODOS else var.get()
+        return self.api.filter_objects(
+            objects,
+            text=self.search_entry.get(),
+            category=categorias.get(self.category_var.get()),
+            folder=selecionado(self.folder_var),
+            tag=selecionado(self.tag_var),
+            updated_since=self.date_entry.get().strip() or None
+        )
+
+    def _update_facets(self):
+        pastas, tags = self.api.facets(self.objects)
+        self.folder_menu.configure(values=[TODOS] + pastas)
+        self.tag_menu.configure(values=[TODOS] + tags)
+
+    def _schedule_filter(self):
+        if self._filter_id is not None:
+            self.after_cancel(self._filter_id)
+        self._filter_id = self.after(DISCOVERY_FILTER_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_id = None
+        self.visible = self._filter(self.objects)
+        self.listbox.delete(0, tk.END)
+        self._schedule_tick()
+
+    def _confirmar(self, migrar):
+        uris = [self.visible[i]["uri"] for i in self.listbox.curselection()]
+        if not uris:
+            messagebox.showerror("Erro", "Selecione ao menos um objeto", parent=self)
+            return
+        self.on_select(uris, migrar)
+        self.destroy()
+
+    def destroy(self):
+        for after_id in (self._tick_id, self._filter_id):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        super().destroy()
 
 class App(ctk.CTk):
     def __init__(self):
@@ -307,13 +729,26 @@ class App(ctk.CTk):
         self.current_frame = LoginFrame(self, self.on_login_success)
         self.current_frame.pack(fill=tk.BOTH, expand=True)
 
-    def on_login_success(self, cookies):
+    def on_login_success(self, cookies, api):
         self.cookies = cookies
         if hasattr(self, 'current_frame') and self.current_frame:
             self.current_frame.destroy()
-        self.current_frame = ExportImportFrame(self, self.cookies)
+        self.current_frame = ExportImportFrame(self, self.cookies, api)
         self.current_frame.pack(fill=tk.BOTH, expand=True)
 
+def startup_probe(app, path):
+    """Grava o instante em que a janela ficou visível e fecha o app (medição de abertura)."""
+    def marcar():
+        app.wait_visibility()
+        app.update_idletasks()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"first_frame": time.time(), "api_loaded": "apigooddata" in sys.modules}, f)
+        app.destroy()
+
+    app.after(0, marcar)
+
 if __name__ == "__main__":
     app = App()
+    if os.environ.get(STARTUP_PROBE_ENV):
+        startup_probe(app, os.environ[STARTUP_PROBE_ENV])
     app.mainloop()
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from apigooddata import chunk_uris, get_objects, identifiers_to_uris
+from dependencies import DependencyResolver
+
+DEFAULT_FINGERPRINT_PATH = os.path.join(os.path.expanduser("~"), ".reporttransfer", "fingerprints.json")
+OBJECTS_PER_REQUEST = 50
+# Campos de meta que mudam a cada gravação sem alterar o objeto em si.
+VOLATILE_META = ("uri", "created", "updated", "author", "contributor", "locked", "flags")
+_WORKSPACE_PREFIX = re.compile(r"/gdc/md/[^/\"]+/")
+
+logger = logging.getLogger("incremental")
+
+
+def object_fingerprint(obj):
+    """Impressão digital de um objeto de metadados: (identifier, updated, hash do conteúdo).
+
+    O hash ignora os campos voláteis de meta e o id do workspace nas URIs,
+    para que o mesmo relatório em dois workspaces clonados gere o mesmo valor.
+    """
+    categoria, corpo = next(iter(obj.items()))
+    meta = corpo.get("meta", {})
+    estavel = {
+        "category": categoria,
+        "meta": {k: v for k, v in meta.items() if k not in VOLATILE_META},
+        "content": corpo.get("content")
+    }
+    canonico = _WORKSPACE_PREFIX.sub("/gdc/md/_/", json.dumps(estavel, sort_keys=True, separators=(",", ":")))
+    return {
+        "uri": meta.get("uri"),
+        "identifier": meta.get("identifier"),
+        "updated": meta.get("updated"),
+        "hash": hashlib.sha256(canonico.encode("utf-8")).hexdigest()
+    }
+
+
+def fetch_fingerprints(workspace_id, uris, cookies):
+    """Busca os objetos em lotes de `objects/get` e devolve {uri: fingerprint}."""
+    fingerprints = {}
+    for lote in chunk_uris(list(uris), OBJECTS_PER_REQUEST):
+        for obj in get_objects(workspace_id, lote, cookies):
+            fp = object_fingerprint(obj)
+            if fp["uri"]:
+                fingerprints[fp["uri"]] = fp
+    return fingerprints
+
+
+class FingerprintCache:
+    """Última versão da origem sincronizada para cada par (relatório, destino).
+
+    Gravado em disco para que execuções seguidas (ex.: sync noturno) só
+    paguem pelos objetos que realmente mudaram.
+    """
+
+    def __init__(self, path=DEFAULT_FINGERPRINT_PATH):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def _key(workspace_origem, uri, workspace_destino):
+        return f"{workspace_origem}|{uri}|{workspace_destino}"
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                dados = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Cache de fingerprints ignorado: %s", e)
+            return
+        with self._lock:
+            self._entries.update(dados)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                dados = dict(self._entries)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, temporario = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(dados, f)
+                os.replace(temporario, self.path)
+            except BaseException:
+                os.unlink(temporario)
+                raise
+
+    def get(self, workspace_origem, uri, workspace_destino):
+        with self._lock:
+            return self._entries.get(self._key(workspace_origem, uri, workspace_destino))
+
+    def mark_synced(self, workspace_origem, uri, workspace_destino, fingerprint):
+        with self._lock:
+            self._entries[self._key(workspace_origem, uri, workspace_destino)] = {
+                "hash": fingerprint["hash"], "updated": fingerprint["updated"], "synced_at": time.time()
+            }
+
+
+class ChangeDetector:
+    """Decide quais pares (relatório, destino) precisam ser migrados de novo.
+
+    Um par é pulado quando o objeto já existe no destino (mesmo identifier) e
+    a versão atual da origem é a última sincronizada (cache) ou tem o mesmo
+    hash do objeto no destino. Com `include_dependencies` (padrão) o hash
+    cobre também as dependências (`using2`: definição, métricas, atributos),
+    então uma métrica alterada faz os relatórios que a usam serem migrados
+    de novo; sem ele, só o conteúdo do próprio objeto é comparado.
+    """
+
+    def __init__(self, cookies, cache=None, max_workers=8, resolver=None, include_dependencies=True):
+        self.cookies = cookies
+        self.cache = cache if cache is not None else FingerprintCache()
+        self.max_workers = max_workers
+        self.resolver = resolver or DependencyResolver(cookies, max_workers)
+        self.include_dependencies = include_dependencies
+        self.source_fingerprints = {}
+
+    def _with_dependencies(self, workspace_id, fingerprints):
+        """Troca o hash de cada objeto por um que inclui os hashes das suas dependências."""
+        if not self.include_dependencies or not fingerprints:
+            return fingerprints
+        dependencias = self.resolver.resolve(workspace_id, list(fingerprints))
+        faltando = set().union(*dependencias.values()) - set(fingerprints)
+        por_uri = fetch_fingerprints(workspace_id, faltando, self.cookies) if faltando else {}
+        por_uri.update(fingerprints)
+        combinados = {}
+        for uri, fp in fingerprints.items():
+            # Ordena pelo identifier, que é o mesmo na origem e no destino (a URI pode mudar).
+            partes = sorted(f"{dep['identifier']}:{dep['hash']}"
+                            for dep in (por_uri.get(link) for link in dependencias[uri]) if dep)
+            digest = hashlib.sha256("\n".join([fp["hash"], *partes]).encode("utf-8")).hexdigest()
+            combinados[uri] = {**fp, "hash": digest}
+        return combinados
+
+    def _destination_fingerprints(self, workspace_destino, identifiers):
+        uris = identifiers_to_uris(workspace_destino, identifiers, self.cookies) if identifiers else {}
+        por_uri = self._with_dependencies(workspace_destino,
+                                          fetch_fingerprints(workspace_destino, uris.values(), self.cookies))
+        return {fp["identifier"]: fp for fp in por_uri.values()}
+
+    def plan(self, workspace_origem, destinos, uris):
+        """Retorna o conjunto de pares (uri, destino) já atualizados, que podem ser pulados."""
+        self.source_fingerprints = self._with_dependencies(workspace_origem,
+                                                           fetch_fingerprints(workspace_origem, uris, self.cookies))
+        identifiers = [fp["identifier"] for fp in self.source_fingerprints.values() if fp["identifier"]]
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(destinos)))) as executor:
+            no_destino = dict(zip(destinos, executor.map(
+                lambda destino: self._destination_fingerprints(destino, identifiers), destinos)))
+
+        inalterados = set()
+        for uri in uris:
+            origem = self.source_fingerprints.get(uri)
+            if origem is None:
+                continue
+            for destino in destinos:
+                atual = no_destino[destino].get(origem["identifier"])
+                if atual is None:
+                    continue
+                sincronizado = self.cache.get(workspace_origem, uri, destino)
+                if (sincronizado and sincronizado["hash"] == origem["hash"]) or atual["hash"] == origem["hash"]:
+                    inalterados.add((uri, destino))
+                    self.cache.mark_synced(workspace_origem, uri, destino, origem)
+        return inalterados
+
+    def mark_synced(self, workspace_origem, pares):
+        for uri, destino in pares:
+            origem = self.source_fingerprints.get(uri)
+            if origem is not None:
+                self.cache.mark_synced(workspace_origem, uri, destino, origem)
+        self.cache.save()
@@ -0,0 +1,400 @@
+"""Fila persistente de migrações (SQLite) e pool de processos que a consome.
+
+A interface e o cli.py enfileiram jobs; os workers rodam sem janela aberta:
+
+    GOODDATA_LOGIN=... GOODDATA_PASSWORD=... python jobqueue.py work --processes 4
+    python jobqueue.py list
+    python jobqueue.py cancel 42
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+
+DEFAULT_QUEUE_PATH = os.path.join(os.path.expanduser("~"), ".reporttransfer", "queue.sqlite")
+DEFAULT_VISIBILITY_TIMEOUT = 900   # sem heartbeat por este tempo, o job volta para a fila
+DEFAULT_MAX_ATTEMPTS = 3
+IDLE_POLL_INTERVAL = 2.0
+CANCEL_CHECK_INTERVAL = 5.0        # com que frequência o worker procura um pedido de cancelamento
+RETRY_BACKOFF = 30.0               # espera antes de reentregar um job que falhou; dobra a cada tentativa
+MAX_RETRY_BACKOFF = 600.0
+STARTUP_GRACE = 30.0               # worker que morre com erro antes disso conta como falha de inicialização
+MAX_STARTUP_FAILURES = 5
+HIGH_PRIORITY = 10                 # a partir daqui as importações pedem X-GDC-TASK-PRIORITY: high
+STATES = ("queued", "running", "done", "failed", "cancelled")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (state, priority DESC, id);
+"""
+
+logger = logging.getLogger("jobqueue")
+
+
+class JobQueue:
+    """Fila de jobs de migração em SQLite, segura entre processos.
+
+    `claim` entrega o job pendente de maior prioridade com um prazo
+    (visibility timeout); o worker renova o prazo com `heartbeat`. Se o
+    worker morrer, o job volta a ser entregue quando o prazo vence, até
+    `max_attempts` tentativas; um job que falhou volta com espera crescente
+    (`lease_until` de um job na fila é o instante a partir do qual ele pode
+    ser entregue). `cancel` remove jobs da fila e pede a parada dos que estão
+    rodando (o worker confere a cada `CANCEL_CHECK_INTERVAL` segundos).
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _write(self, sql, params=()):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(sql, params)
+                self._conn.execute("COMMIT")
+                return cursor
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def submit(self, job, priority=0, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Enfileira um job normalizado (ver migration.normalize_job) e retorna o id."""
+        cursor = self._write(
+            "INSERT INTO jobs (job, priority, state, max_attempts, created_at) VALUES (?, ?, 'queued', ?, ?)",
+            (json.dumps(job, ensure_ascii=False), priority, max_attempts, time.time())
+        )
+        return cursor.lastrowid
+
+    def claim(self, worker):
+        """Reserva o próximo job (fila ou prazo vencido) para `worker`; None se não houver."""
+        agora = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Prazo vencido de job cancelado ou sem tentativas restantes: não volta para a fila.
+                self._conn.execute(
+                    "UPDATE jobs SET state = 'cancelled', finished_at = ? "
+                    "WHERE state = 'running' AND lease_until < ? AND cancel_requested = 1",
+                    (agora, agora)
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET state = 'failed', finished_at = ?, error = 'visibility timeout' "
+                    "WHERE state = 'running' AND lease_until < ? AND attempts >= max_attempts",
+                    (agora, agora)
+                )
+                linha = self._conn.execute(
+                    "SELECT id FROM jobs WHERE (state = 'queued' AND (lease_until IS NULL OR lease_until <= ?)) "
+                    "OR (state = 'running' AND lease_until < ?) ORDER BY priority DESC, id LIMIT 1", (agora, agora)
+                ).fetchone()
+                if linha is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET state = 'running', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                    "started_at = COALESCE(started_at, ?) WHERE id = ?",
+                    (worker, agora + self.visibility_timeout, agora, linha[0])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(linha[0])
+
+    def heartbeat(self, job_id, worker):
+        """Renova o prazo; False se o job foi cancelado ou já não pertence a este worker."""
+        cursor = self._write(
+            "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND state = 'running' AND cancel_requested = 0",
+            (time.time() + self.visibility_timeout, job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker, result):
+        estado = "done" if result.get("failed", 0) == 0 else "failed"
+        self._write(
+            "UPDATE jobs SET state = ?, finished_at = ?, result = ?, error = NULL WHERE id = ? AND worker = ?",
+            (estado, time.time(), json.dumps(result, ensure_ascii=False), job_id, worker)
+        )
+
+    def fail(self, job_id, worker, error, backoff=RETRY_BACKOFF, max_backoff=MAX_RETRY_BACKOFF):
+        """Registra o erro; o job volta para a fila enquanto houver tentativas, após `backoff * 2^(tentativa-1)` s."""
+        agora = time.time()
+        self._write(
+            "UPDATE jobs SET state = CASE WHEN cancel_requested = 1 THEN 'cancelled' "
+            "WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END, "
+            "finished_at = CASE WHEN cancel_requested = 0 AND attempts < max_attempts THEN NULL ELSE ? END, "
+            "lease_until = CASE WHEN cancel_requested = 0 AND attempts < max_attempts "
+            "THEN ? + MIN(? * (1 << (attempts - 1)), ?) ELSE NULL END, "
+            "error = ? WHERE id = ? AND worker = ?",
+            (agora, agora, backoff, max_backoff, error, job_id, worker)
+        )
+
+    def mark_cancelled(self, job_id, worker):
+        self._write("UPDATE jobs SET state = 'cancelled', finished_at = ? WHERE id = ? AND worker = ?",
+                    (time.time(), job_id, worker))
+
+    def cancel_requested(self, job_id):
+        with self._lock:
+            linha = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(linha and linha[0])
+
+    def cancel(self, job_id):
+        """Cancela um job na fila na hora; um job rodando para na próxima verificação do worker."""
+        agora = time.time()
+        cursor = self._write(
+            "UPDATE jobs SET state = CASE WHEN state = 'queued' THEN 'cancelled' ELSE state END, "
+            "finished_at = CASE WHEN state = 'queued' THEN ? ELSE finished_at END, cancel_requested = 1 "
+            "WHERE id = ? AND state IN ('queued', 'running')",
+            (agora, job_id)
+        )
+        return cursor.rowcount == 1
+
+    def get(self, job_id):
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            linha = cursor.fetchone()
+            if linha is None:
+                return None
+            return self._row(cursor.description, linha)
+
+    def list(self, state=None, limit=100):
+        with self._lock:
+            if state:
+                cursor = self._conn.execute("SELECT * FROM jobs WHERE state = ? ORDER BY id DESC LIMIT ?",
+                                            (state, limit))
+            else:
+                cursor = self._conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+            return [self._row(cursor.description, linha) for linha in cursor.fetchall()]
+
+    def stats(self):
+        with self._lock:
+            contagem = dict(self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+        return {estado: contagem.get(estado, 0) for estado in STATES}
+
+    @staticmethod
+    def _row(description, linha):
+        job = dict(zip([c[0] for c in description], linha))
+        job["job"] = json.loads(job["job"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+def _run_claimed(fila, item, worker, cookies, journal):
+    """Roda um job reservado, renovando o prazo em paralelo; True se foi cancelado no meio."""
+    from apigooddata import get_default_client
+    from migration import run_job
+
+    estado = {}
+
+    def executar():
+        try:
+            estado["result"] = run_job(item["job"], cookies, journal=journal, job_id=f"queue-{item['id']}")
+        except Exception as e:
+            estado["error"] = str(e)
+
+    get_default_client().task_priority = "high" if item["priority"] >= HIGH_PRIORITY else None
+    execucao = threading.Thread(target=executar, daemon=True)
+    execucao.start()
+    intervalo_heartbeat = fila.visibility_timeout / 3
+    ultimo_heartbeat = time.monotonic()
+    while True:
+        execucao.join(min(CANCEL_CHECK_INTERVAL, intervalo_heartbeat))
+        if not execucao.is_alive():
+            break
+        if fila.cancel_requested(item["id"]):
+            return True
+        if time.monotonic() - ultimo_heartbeat >= intervalo_heartbeat:
+            if not fila.heartbeat(item["id"], worker):
+                return True
+            ultimo_heartbeat = time.monotonic()
+    if "error" in estado:
+        fila.fail(item["id"], worker, estado["error"])
+    else:
+        fila.complete(item["id"], worker, estado["result"])
+    return False
+
+
+def worker_main(path, login, senha, base_url=None, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT, once=False):
+    """Laço de um processo worker: reserva, executa e registra jobs até a fila esvaziar (`once`) ou para sempre.
+
+    O journal fica ao lado da fila, então um job entregue de novo após um
+    prazo vencido pula os pares (relatório, destino) já concluídos.
+    """
+    from apigooddata import configure
+    from auth import authenticate
+    from journal import MigrationJournal
+
+    if base_url:
+        configure(base_url)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    fila = JobQueue(path, visibility_timeout)
+    journal = MigrationJournal(f"{os.path.splitext(path)[0]}.journal.sqlite")
+    cookies = authenticate(login, senha, cache_sst=True).cookies
+    try:
+        while True:
+            item = fila.claim(worker)
+            if item is None:
+                if once:
+                    return
+                time.sleep(IDLE_POLL_INTERVAL)
+                continue
+            logger.info("[%s] job %s (prioridade %s, tentativa %s)",
+                        worker, item["id"], item["priority"], item["attempts"])
+            if _run_claimed(fila, item, worker, cookies, journal):
+                # A thread da migração não pode ser interrompida: este worker sai (fechando journal e
+                # fila) e o pool sobe outro; com `once`, o comando termina.
+                fila.mark_cancelled(item["id"], worker)
+                logger.info("[%s] job %s cancelado", worker, item["id"])
+                return
+    finally:
+        journal.close()
+        fila.close()
+
+
+class WorkerPool:
+    """Mantém `processes` workers consumindo a fila e repõe os que terminarem (queda ou cancelamento).
+
+    O login é validado uma vez no processo pai, que grava o SST em cache
+    para os workers. Se os workers continuarem morrendo logo ao iniciar
+    (`MAX_STARTUP_FAILURES` seguidos), o pool desiste em vez de repetir o
+    login sem parar.
+    """
+
+    def __init__(self, path, login, senha, processes=None, base_url=None,
+                 visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+        self.path = path
+        self.login = login
+        self.senha = senha
+        self.base_url = base_url
+        self.processes = processes or os.cpu_count() or 2
+        self.args = (path, login, senha, base_url, visibility_timeout)
+        self.startup_failures = 0
+        self._workers = []
+        self._stop = threading.Event()
+
+    def _spawn(self):
+        processo = multiprocessing.Process(target=worker_main, args=self.args, daemon=True)
+        processo.start()
+        return processo, time.monotonic()
+
+    def _replace(self, processo, iniciado):
+        if processo.is_alive():
+            return processo, iniciado
+        if processo.exitcode != 0 and time.monotonic() - iniciado < STARTUP_GRACE:
+            self.startup_failures += 1
+            if self.startup_failures >= MAX_STARTUP_FAILURES:
+                raise RuntimeError(f"{self.startup_failures} workers seguidos falharam ao iniciar "
+                                   f"(último código de saída {processo.exitcode}); pool encerrado.")
+        else:
+            self.startup_failures = 0
+        return self._spawn()
+
+    def run(self):
+        from apigooddata import configure
+        from auth import authenticate
+
+        if self.base_url:
+            configure(self.base_url)
+        authenticate(self.login, self.senha, cache_sst=True)
+        self._workers = [self._spawn() for _ in range(self.processes)]
+        try:
+            while not self._stop.wait(IDLE_POLL_INTERVAL):
+                self._workers = [self._replace(processo, iniciado) for processo, iniciado in self._workers]
+        finally:
+            for processo, _ in self._workers:
+                processo.terminate()
+            for processo, _ in self._workers:
+                processo.join()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fila persistente de migrações GoodData.")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_PATH, help="Arquivo SQLite da fila")
+    sub = parser.add_subparsers(dest="command", required=True)
+    work = sub.add_parser("work", help="Consome a fila com um pool de processos")
+    work.add_argument("--processes", type=int, default=None, help="Processos worker (padrão: núcleos da CPU)")
+    work.add_argument("--login", default=os.environ.get("GOODDATA_LOGIN"))
+    work.add_argument("--password", default=os.environ.get("GOODDATA_PASSWORD"))
+    work.add_argument("--base-url", default=None)
+    work.add_argument("--visibility-timeout", type=float, default=DEFAULT_VISIBILITY_TIMEOUT)
+    work.add_argument("--once", action="store_true", help="Um único worker, até a fila esvaziar")
+    listar = sub.add_parser("list", help="Mostra os jobs da fila")
+    listar.add_argument("--state", choices=STATES)
+    listar.add_argument("--limit", type=int, default=50)
+    cancelar = sub.add_parser("cancel", help="Cancela um job")
+    cancelar.add_argument("job_id", type=int)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    if args.command == "work":
+        if not args.login or not args.password:
+            print("Credenciais ausentes (use --login/--password ou GOODDATA_LOGIN/GOODDATA_PASSWORD)", file=sys.stderr)
+            return 2
+        if args.once:
+            worker_main(args.queue, args.login, args.password, args.base_url, args.visibility_timeout, once=True)
+            return 0
+        pool = WorkerPool(args.queue, args.login, args.password, args.processes, args.base_url,
+                          args.visibility_timeout)
+        try:
+            pool.run()
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            print(f"Pool de workers encerrado: {str(e)}", file=sys.stderr)
+            return 2
+        return 0
+
+    fila = JobQueue(args.queue)
+    try:
+        if args.command == "cancel":
+            if not fila.cancel(args.job_id):
+                print(f"Job {args.job_id} não está na fila nem rodando.", file=sys.stderr)
+                return 1
+            return 0
+        print(json.dumps({"stats": fila.stats(), "jobs": [
+            {**{chave: item[chave] for chave in ("id", "priority", "state", "attempts", "worker", "error")},
+             "source": item["job"]["source"], "reports": len(item["job"]["reports"]),
+             "ok": (item["result"] or {}).get("ok"), "failed": (item["result"] or {}).get("failed")}
+            for item in fila.list(args.state, args.limit)
+        ]}, ensure_ascii=False, indent=2))
+        return 0
+    finally:
+        fila.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
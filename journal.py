@@ -0,0 +1,96 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS steps (
+    job_id TEXT NOT NULL,
+    uri TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    token TEXT,
+    task_uri TEXT,
+    status TEXT,
+    error TEXT,
+    started_at REAL,
+    updated_at REAL,
+    PRIMARY KEY (job_id, uri, destination)
+)
+"""
+
+
+def job_fingerprint(job):
+    """Identificador estável do job: mesma origem, destinos, relatórios e opções."""
+    chave = {
+        "source": job["source"],
+        "destinations": sorted(job["destinations"]),
+        "reports": sorted(job["reports"]),
+        "export": job["export"],
+        "import": job["import"]
+    }
+    return hashlib.sha1(json.dumps(chave, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class MigrationJournal:
+    """Diário em SQLite de cada etapa por (relatório, destino).
+
+    Etapas: `export` (token obtido), `import` (tarefa criada, com a URI do
+    wTaskStatus) e `done` (status final). Permite retomar um job após uma
+    queda pulando o que já terminou com OK.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def record(self, job_id, uri, destination, stage, token=None, task_uri=None, status=None, error=None):
+        """Registra a etapa do par (relatório, destino).
+
+        `export` chega para todos os destinos do lote, inclusive quando o token
+        é renovado no meio do fan-out: só cria os pares que faltam e não rebaixa
+        os que já estão em `import` ou `done`.
+        """
+        agora = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO steps (job_id, uri, destination, stage, token, task_uri, status, error, started_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (job_id, uri, destination) DO UPDATE SET
+                    stage = excluded.stage,
+                    token = COALESCE(excluded.token, steps.token),
+                    task_uri = COALESCE(excluded.task_uri, steps.task_uri),
+                    status = excluded.status,
+                    error = excluded.error,
+                    updated_at = excluded.updated_at
+                WHERE excluded.stage != 'export' OR steps.stage = 'export'
+                """,
+                (job_id, uri, destination, stage, token, task_uri, status, error, agora, agora)
+            )
+            self._conn.commit()
+
+    def steps(self, job_id):
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT uri, destination, stage, token, task_uri, status, error, started_at, updated_at "
+                "FROM steps WHERE job_id = ?", (job_id,)
+            )
+            colunas = [c[0] for c in cursor.description]
+            return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+
+    def completed(self, job_id):
+        """Pares (uri, destino) já concluídos com OK."""
+        return {(s["uri"], s["destination"]) for s in self.steps(job_id) if s["stage"] == "done" and s["status"] == "OK"}
+
+    def running_tasks(self, job_id):
+        """Importações cuja tarefa foi criada mas cujo status final não foi registrado."""
+        return [s for s in self.steps(job_id) if s["stage"] == "import" and s["task_uri"]]
@@ -0,0 +1,275 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MAX_SPANS = 10000
+PROBE_TIMEOUT = 5.0                # limite do connect da sonda de DNS/TCP
+
+
+class _Histogram:
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.total += 1
+        self.sum += value
+        for i, limite in enumerate(self.buckets):
+            if value <= limite:
+                self.counts[i] += 1
+
+    def quantile(self, q):
+        """Aproximação pelo limite do bucket (suficiente para o resumo da execução)."""
+        if not self.total:
+            return 0.0
+        alvo = q * self.total
+        for limite, count in zip(self.buckets, self.counts):
+            if count >= alvo:
+                return limite
+        return float("inf")
+
+
+def _labels(**labels):
+    return ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+
+
+class Metrics:
+    """Métricas das chamadas à API: duração, tempo até os headers, bytes, retries e polls.
+
+    Exporta em texto do Prometheus, em spans no formato OTLP/JSON e em um
+    resumo JSON da execução.
+    """
+
+    def __init__(self, service_name="reporttransfer"):
+        self.service_name = service_name
+        self.trace_id = uuid.uuid4().hex
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.durations = {}
+            self.ttfb = {}
+            self.bytes_sent = {}
+            self.bytes_received = {}
+            self.retries = {}
+            self.stage_elapsed = {}
+            self.polls = 0
+            self.poll_durations = _Histogram()
+            self.dns = {}
+            self.connect = {}
+            self._probes = []
+            self.spans = deque(maxlen=MAX_SPANS)
+
+    def measure_dns(self, hostname, port=443):
+        """Mede a resolução DNS e o handshake TCP uma vez por host, em segundo plano.
+
+        O requests/urllib3 não expõe esses tempos por conexão (elas ficam no
+        pool e são reaproveitadas), então uma conexão de teste separada serve
+        de amostra; TLS não entra na medida. A sonda roda numa thread à parte
+        para não atrasar a primeira requisição real.
+        """
+        with self._lock:
+            if hostname in self.dns or not hostname:
+                return
+            self.dns[hostname] = None
+            sonda = threading.Thread(target=self._probe, args=(hostname, port), daemon=True,
+                                     name=f"metrics-probe-{hostname}")
+            self._probes.append(sonda)
+        sonda.start()
+
+    def _probe(self, hostname, port):
+        inicio = time.perf_counter()
+        try:
+            endereco = socket.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)[0]
+            dns = time.perf_counter() - inicio
+        except OSError:
+            with self._lock:
+                self.dns[hostname] = float("nan")
+            return
+        familia, tipo, proto, _, sockaddr = endereco
+        inicio = time.perf_counter()
+        try:
+            with socket.socket(familia, tipo, proto) as sock:
+                sock.settimeout(PROBE_TIMEOUT)
+                sock.connect(sockaddr)
+            connect = time.perf_counter() - inicio
+        except OSError:
+            connect = float("nan")
+        with self._lock:
+            self.dns[hostname] = dns
+            self.connect[hostname] = connect
+
+    def wait_probes(self, timeout=PROBE_TIMEOUT):
+        """Espera as sondas de DNS/TCP em andamento por até `timeout` segundos no total."""
+        limite = time.monotonic() + timeout
+        with self._lock:
+            sondas = list(self._probes)
+        for sonda in sondas:
+            sonda.join(max(0.0, limite - time.monotonic()))
+
+    def record_request(self, method, endpoint, status, start, duration, ttfb=None, bytes_sent=0, bytes_received=0,
+                       path=None, error=None):
+        chave = (endpoint, str(status))
+        with self._lock:
+            self.requests[chave] = self.requests.get(chave, 0) + 1
+            self.durations.setdefault(endpoint, _Histogram()).observe(duration)
+            if ttfb is not None:
+                self.ttfb.setdefault(endpoint, _Histogram()).observe(ttfb)
+            self.bytes_sent[endpoint] = self.bytes_sent.get(endpoint, 0) + bytes_sent
+            self.bytes_received[endpoint] = self.bytes_received.get(endpoint, 0) + bytes_received
+            atributos = {"http.method": method, "http.status_code": status, "gooddata.endpoint": endpoint,
+                         "http.request_content_length": bytes_sent, "http.response_content_length": bytes_received}
+            if path:
+                atributos["url.path"] = path
+            self.spans.append({
+                "name": f"{method} {endpoint}",
+                "start": start,
+                "end": start + duration,
+                "attributes": atributos,
+                "error": error
+            })
+
+    def record_retry(self, stage):
+        with self._lock:
+            self.retries[stage] = self.retries.get(stage, 0) + 1
+
+    def record_stage(self, stage, elapsed):
+        with self._lock:
+            self.stage_elapsed[stage] = self.stage_elapsed.get(stage, 0.0) + elapsed
+
+    def record_poll(self, latency):
+        with self._lock:
+            self.polls += 1
+            self.poll_durations.observe(latency)
+
+    def prometheus_text(self):
+        linhas = []
+        with self._lock:
+            linhas += ["# HELP gooddata_requests_total Requisições à API GoodData.",
+                       "# TYPE gooddata_requests_total counter"]
+            for (endpoint, status), valor in sorted(self.requests.items()):
+                linhas.append(f"gooddata_requests_total{{{_labels(endpoint=endpoint, status=status)}}} {valor}")
+            for nome, ajuda, dados in (
+                ("gooddata_request_duration_seconds", "Duração total da requisição.", self.durations),
+                ("gooddata_time_to_headers_seconds", "Tempo até receber os headers da resposta.", self.ttfb),
+            ):
+                linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} histogram"]
+                for endpoint, hist in sorted(dados.items()):
+                    linhas += self._histogram_lines(nome, hist, endpoint=endpoint)
+            for nome, ajuda, dados in (
+                ("gooddata_bytes_sent_total", "Bytes enviados no corpo das requisições.", self.bytes_sent),
+                ("gooddata_bytes_received_total", "Bytes recebidos no corpo das respostas.", self.bytes_received),
+            ):
+                linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} counter"]
+                for endpoint, valor in sorted(dados.items()):
+                    linhas.append(f"{nome}{{{_labels(endpoint=endpoint)}}} {valor}")
+            linhas += ["# HELP gooddata_retries_total Retries por etapa.", "# TYPE gooddata_retries_total counter"]
+            for stage, valor in sorted(self.retries.items()):
+                linhas.append(f"gooddata_retries_total{{{_labels(stage=stage)}}} {valor}")
+            linhas += ["# HELP gooddata_stage_seconds_total Tempo gasto por etapa.",
+                       "# TYPE gooddata_stage_seconds_total counter"]
+            for stage, valor in sorted(self.stage_elapsed.items()):
+                linhas.append(f"gooddata_stage_seconds_total{{{_labels(stage=stage)}}} {valor:.6f}")
+            linhas += ["# HELP gooddata_poll_duration_seconds Latência de cada poll de status.",
+                       "# TYPE gooddata_poll_duration_seconds histogram"]
+            linhas += self._histogram_lines("gooddata_poll_duration_seconds", self.poll_durations)
+            linhas += ["# HELP gooddata_dns_seconds Tempo de resolução DNS por host.",
+                       "# TYPE gooddata_dns_seconds gauge"]
+            for host, valor in sorted(self.dns.items()):
+                if valor is not None:
+                    linhas.append(f"gooddata_dns_seconds{{{_labels(host=host)}}} {valor:.6f}")
+            linhas += ["# HELP gooddata_connect_seconds Tempo do handshake TCP por host (conexão de teste).",
+                       "# TYPE gooddata_connect_seconds gauge"]
+            for host, valor in sorted(self.connect.items()):
+                linhas.append(f"gooddata_connect_seconds{{{_labels(host=host)}}} {valor:.6f}")
+        return "\n".join(linhas) + "\n"
+
+    @staticmethod
+    def _histogram_lines(nome, hist, **labels):
+        linhas = []
+        for limite, count in zip(hist.buckets, hist.counts):
+            linhas.append(f"{nome}_bucket{{{_labels(le=limite, **labels)}}} {count}")
+        linhas.append(f"{nome}_bucket{{{_labels(le='+Inf', **labels)}}} {hist.total}")
+        sufixo = f"{{{_labels(**labels)}}}" if labels else ""
+        linhas.append(f"{nome}_sum{sufixo} {hist.sum:.6f}")
+        linhas.append(f"{nome}_count{sufixo} {hist.total}")
+        return linhas
+
+    def otlp_spans(self):
+        """Spans no formato JSON do OTLP (resourceSpans), prontos para um coletor OpenTelemetry."""
+        with self._lock:
+            spans = list(self.spans)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "apigooddata"},
+                "spans": [{
+                    "traceId": self.trace_id,
+                    "spanId": uuid.uuid4().hex[:16],
+                    "name": span["name"],
+                    "kind": 3,
+                    "startTimeUnixNano": int(span["start"] * 1e9),
+                    "endTimeUnixNano": int(span["end"] * 1e9),
+                    "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span["attributes"].items()],
+                    "status": {"code": 2, "message": span["error"]} if span["error"] else {"code": 1}
+                } for span in spans]
+            }]
+        }]}
+
+    def summary(self):
+        with self._lock:
+            return {
+                "elapsed": round(time.time() - self.started_at, 3),
+                "requests": sum(self.requests.values()),
+                "by_endpoint": {
+                    endpoint: {
+                        "count": hist.total,
+                        "total_s": round(hist.sum, 3),
+                        "p50_s": hist.quantile(0.5),
+                        "p95_s": hist.quantile(0.95),
+                        "bytes_sent": self.bytes_sent.get(endpoint, 0),
+                        "bytes_received": self.bytes_received.get(endpoint, 0)
+                    } for endpoint, hist in self.durations.items()
+                },
+                "status_codes": {f"{endpoint}:{status}": valor for (endpoint, status), valor in self.requests.items()},
+                "retries": dict(self.retries),
+                "stage_elapsed_s": {stage: round(valor, 3) for stage, valor in self.stage_elapsed.items()},
+                "polls": self.polls,
+                "poll_total_s": round(self.poll_durations.sum, 3),
+                "dns_s": {host: valor for host, valor in self.dns.items() if valor is not None},
+                "connect_s": dict(self.connect)
+            }
+
+    def write(self, directory):
+        """Grava metrics.prom, spans.json e summary.json em `directory`."""
+        self.wait_probes()
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "metrics.prom"), "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        with open(os.path.join(directory, "spans.json"), "w", encoding="utf-8") as f:
+            json.dump(self.otlp_spans(), f)
+        with open(os.path.join(directory, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+def _otlp_value(valor):
+    if isinstance(valor, bool):
+        return {"boolValue": valor}
+    if isinstance(valor, int):
+        return {"intValue": str(valor)}
+    if isinstance(valor, float):
+        return {"doubleValue": valor}
+    return {"stringValue": str(valor)}
+
+
+METRICS = Metrics()
@@ -0,0 +1,259 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from apigooddata import (
+    DEFAULT_EXPORT_CHUNK_SIZE, chunk_uris, dedupe_report_uris, extract_report_uri, wait_for_import_status_ok
+)
+from fanout import DEFAULT_MAX_RETRIES, DEFAULT_MAX_WORKERS, fanout_export_and_import
+from dependencies import DependencyResolver, plan_exports
+from incremental import ChangeDetector
+from journal import job_fingerprint
+
+EXPORT_OPTIONS = ("exportAttributeProperties", "crossDataCenterExport")
+IMPORT_OPTIONS = ("overwriteNewer", "updateLDMObjects", "importAttributeProperties")
+
+logger = logging.getLogger("migration")
+
+
+class JobError(Exception):
+    pass
+
+
+def load_job_file(path):
+    """Lê um job de migração em JSON ou YAML (YAML requer PyYAML)."""
+    with open(path, encoding="utf-8") as f:
+        conteudo = f.read()
+    if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise JobError("Arquivos YAML requerem o pacote 'PyYAML' (pip install pyyaml).")
+        job = yaml.safe_load(conteudo)
+    else:
+        job = json.loads(conteudo)
+    return normalize_job(job)
+
+
+def _int_option(job, chave, padrao, minimo):
+    try:
+        valor = int(job.get(chave, padrao))
+    except (TypeError, ValueError):
+        raise JobError(f"{chave} deve ser um número inteiro.")
+    if valor < minimo:
+        raise JobError(f"{chave} deve ser maior ou igual a {minimo}.")
+    return valor
+
+
+def normalize_job(job):
+    """Valida o job e preenche os valores padrão.
+
+    Formato:
+        source: id do workspace de origem
+        destinations: lista de ids (ou um único id)
+        reports: lista de links ou URIs /gdc/md/<ws>/obj/<id>
+        export: opções de exportação (as mesmas caixas do ExportImportFrame)
+        import: opções de importação
+        chunk_size, max_workers, max_retries: opcionais
+        resolve_dependencies: agrupa os lotes pelas dependências compartilhadas
+        incremental: pula relatórios que não mudaram desde a última sincronização
+    """
+    if not isinstance(job, dict):
+        raise JobError("O job deve ser um objeto com as chaves source, destinations e reports.")
+    faltando = [chave for chave in ("source", "destinations", "reports") if not job.get(chave)]
+    if faltando:
+        raise JobError(f"Campos obrigatórios ausentes no job: {', '.join(faltando)}")
+    destinos = job["destinations"]
+    if isinstance(destinos, str):
+        destinos = [destinos]
+    if not isinstance(job["reports"], (list, tuple)):
+        raise JobError("reports deve ser uma lista de links ou URIs.")
+    desconhecidas = (set(job.get("export", {})) - set(EXPORT_OPTIONS)) | (set(job.get("import", {})) - set(IMPORT_OPTIONS))
+    if desconhecidas:
+        raise JobError(f"Opções desconhecidas no job: {', '.join(sorted(desconhecidas))}")
+    invalidos = []
+    for link in job["reports"]:
+        try:
+            extract_report_uri(link)
+        except (TypeError, ValueError):
+            invalidos.append(str(link))
+    if invalidos:
+        raise JobError(f"Links de relatório inválidos no job: {', '.join(invalidos)}")
+    return {
+        "source": job["source"],
+        "destinations": list(destinos),
+        "reports": list(job["reports"]),
+        "export": {opt: int(job.get("export", {}).get(opt, 0)) for opt in EXPORT_OPTIONS},
+        "import": {opt: int(job.get("import", {}).get(opt, 0)) for opt in IMPORT_OPTIONS},
+        "chunk_size": _int_option(job, "chunk_size", DEFAULT_EXPORT_CHUNK_SIZE, minimo=1),
+        "max_workers": _int_option(job, "max_workers", DEFAULT_MAX_WORKERS, minimo=1),
+        "max_retries": _int_option(job, "max_retries", DEFAULT_MAX_RETRIES, minimo=0),
+        "resolve_dependencies": bool(job.get("resolve_dependencies", False)),
+        "incremental": bool(job.get("incremental", False))
+    }
+
+
+def _wait_tasks(destinos, cookies, max_workers):
+    """Status final de cada tarefa (`destinos`: URI da tarefa -> workspace) -> (status, erro).
+
+    Com o httpx, todas as tarefas são acompanhadas num único event loop
+    (apigooddata_async); sem ele, uma thread por tarefa, até `max_workers`.
+    """
+    try:
+        from apigooddata_async import wait_many_import_status_ok
+        finais = wait_many_import_status_ok(list(destinos), cookies)
+    except ImportError:
+        def acompanhar(task_uri):
+            try:
+                return wait_for_import_status_ok(destinos[task_uri], task_uri, cookies)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(destinos)))) as executor:
+            finais = dict(zip(destinos, executor.map(acompanhar, destinos)))
+    return {uri: ("ERROR", str(final)) if isinstance(final, Exception) else (final, None)
+            for uri, final in finais.items()}
+
+
+def _resume_running_tasks(journal, job_id, cookies, max_workers):
+    """Retoma o polling das tarefas que estavam RUNNING quando o job parou."""
+    tarefas = journal.running_tasks(job_id)
+    retomados = {}
+    if not tarefas:
+        return retomados
+    # Os pares de um mesmo lote compartilham a tarefa de importação: cada uma é acompanhada uma vez.
+    finais = _wait_tasks({t["task_uri"]: t["destination"] for t in tarefas}, cookies, max_workers)
+    for tarefa in tarefas:
+        status, erro = finais[tarefa["task_uri"]]
+        journal.record(job_id, tarefa["uri"], tarefa["destination"], "done", status=status, error=erro)
+        if status == "OK":
+            retomados[(tarefa["uri"], tarefa["destination"])] = {
+                "chunk": None, "status": status, "attempts": 0,
+                "elapsed": round(time.time() - tarefa["started_at"], 3), "error": None, "resumed": True
+            }
+    return retomados
+
+
+def _journal_recorder(journal, job_id, lote, destinos):
+    def on_event(stage, destino, dados):
+        alvos = destinos if destino is None else [destino]
+        for uri in lote:
+            for d in alvos:
+                journal.record(job_id, uri, d, stage, **dados)
+    return on_event
+
+
+def plan_job(job, cookies, resolver=None):
+    """Dry-run: resolve as dependências e devolve o plano de exportação sem exportar nada."""
+    uris, _ = dedupe_report_uris(job["reports"])
+    resolver = resolver or DependencyResolver(cookies)
+    return plan_exports(resolver, job["source"], uris, job["chunk_size"])
+
+
+def _job_batches(job, uris, resolver):
+    """Lista de (URIs enviadas, URIs cobertas pelo lote)."""
+    if resolver is None:
+        return [(lote, lote) for lote in chunk_uris(uris, job["chunk_size"])]
+    plan = plan_exports(resolver, job["source"], uris, job["chunk_size"])
+    return [(chunk["uris"], plan.covered[i]) for i, chunk in enumerate(plan.chunks)]
+
+
+def _failed_results(destinos, error):
+    return {destino: {"status": "ERROR", "tentativas": 0, "tempo": 0.0, "erro": str(error)} for destino in destinos}
+
+
+def _store_results(por_par, chunk_idx, uris, resultados):
+    for uri in uris:
+        for destino, r in resultados.items():
+            por_par[(uri, destino)] = {
+                "chunk": chunk_idx, "status": r["status"], "attempts": r["tentativas"],
+                "elapsed": round(r["tempo"], 3), "error": r["erro"]
+            }
+
+
+def run_job(job, cookies, max_workers=None, progress_callback=None, journal=None, job_id=None,
+            change_detector=None):
+    """Executa um job normalizado: cada lote é exportado uma vez e importado em todos os destinos.
+
+    Com um `journal` (MigrationJournal), pares (relatório, destino) já
+    concluídos são pulados e tarefas que ficaram RUNNING voltam a ser
+    acompanhadas pela URI registrada. Com `incremental` no job, pares cujo
+    relatório não mudou (ver incremental.ChangeDetector) também são pulados.
+    Retorna um resumo com um resultado por (link, destino).
+    """
+    inicio = time.time()
+    uris, mapa = dedupe_report_uris(job["reports"])
+    max_workers = max_workers or job["max_workers"]
+    job_id = job_id or job_fingerprint(job)
+    por_par = {}
+    if journal is not None:
+        por_par.update(_resume_running_tasks(journal, job_id, cookies, max_workers))
+        for par in journal.completed(job_id):
+            por_par.setdefault(par, {"chunk": None, "status": "OK", "attempts": 0, "elapsed": 0.0,
+                                     "error": None, "skipped": True})
+
+    if job["incremental"] or change_detector is not None:
+        change_detector = change_detector or ChangeDetector(cookies, max_workers=max_workers)
+        pendentes = [uri for uri in uris if any((uri, d) not in por_par for d in job["destinations"])]
+        try:
+            inalterados = change_detector.plan(job["source"], job["destinations"], pendentes)
+        except Exception as e:
+            # Sem as impressões digitais, migra tudo como no modo normal.
+            logger.warning("Modo incremental desativado nesta execução: %s", e)
+            change_detector, inalterados = None, set()
+        for par in inalterados:
+            por_par.setdefault(par, {"chunk": None, "status": "OK", "attempts": 0, "elapsed": 0.0,
+                                     "error": None, "skipped": True, "unchanged": True})
+
+    # Agrupa os relatórios pelo conjunto de destinos que ainda faltam, para exportar cada grupo uma vez.
+    grupos = {}
+    for uri in uris:
+        faltando = tuple(d for d in job["destinations"] if (uri, d) not in por_par)
+        if faltando:
+            grupos.setdefault(faltando, []).append(uri)
+
+    resolver = DependencyResolver(cookies) if job["resolve_dependencies"] else None
+    chunk_idx = 0
+    for destinos, uris_grupo in grupos.items():
+        try:
+            lotes = _job_batches(job, uris_grupo, resolver)
+        except Exception as e:
+            # Sem o plano (ex.: falha ao buscar as dependências), o grupo inteiro fica com o erro.
+            chunk_idx += 1
+            _store_results(por_par, chunk_idx, uris_grupo, _failed_results(destinos, e))
+            continue
+        for lote, cobertas in lotes:
+            chunk_idx += 1
+            on_event = _journal_recorder(journal, job_id, cobertas, destinos) if journal is not None else None
+            try:
+                resultados = fanout_export_and_import(
+                    job["source"], list(destinos), lote, cookies, job["export"], job["import"],
+                    max_workers=max_workers, max_retries=job["max_retries"],
+                    progress_callback=progress_callback, event_callback=on_event
+                )
+            except Exception as e:
+                resultados = _failed_results(destinos, e)
+            _store_results(por_par, chunk_idx, cobertas, resultados)
+
+    if change_detector is not None:
+        change_detector.mark_synced(job["source"], [par for par, r in por_par.items()
+                                                    if r["status"] == "OK" and not r.get("unchanged")])
+
+    resultados = []
+    for link, uri in mapa.items():
+        for destino in job["destinations"]:
+            resultados.append(dict(link=link, uri=uri, destination=destino, **por_par[(uri, destino)]))
+    ok = sum(1 for r in resultados if r["status"] == "OK")
+    return {
+        "job_id": job_id,
+        "source": job["source"],
+        "total": len(resultados),
+        "ok": ok,
+        "failed": len(resultados) - ok,
+        "skipped": sum(1 for r in resultados if r.get("skipped") or r.get("resumed")),
+        "unchanged": sum(1 for r in resultados if r.get("unchanged")),
+        "elapsed": round(time.time() - inicio, 3),
+        "results": resultados
+    }
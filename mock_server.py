@@ -0,0 +1,326 @@
+"""Servidor local que imita os endpoints da API GoodData usados pelo ReportTransfer.
+
+Serve para medir desempenho e testar falhas sem tocar no host de produção:
+
+    python mock_server.py --port 8765 --latency 0.05 --failure-rate 0.02 --task-duration 2
+    GOODDATA_BASE_URL=http://127.0.0.1:8765 python cli.py job.json
+
+Latência, taxa de falhas (503), duração das tarefas e validade dos tokens são
+configuráveis. `stats` conta requisições por endpoint e conexões TCP abertas,
+o que mostra se o cliente está reaproveitando conexões (keep-alive).
+"""
+import argparse
+import html
+import json
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class MockConfig:
+    def __init__(self, latency=0.0, failure_rate=0.0, task_duration=1.0, token_ttl=300.0, export_duration=0.0,
+                 tt_ttl=600.0, require_auth=False, catalog_size=200, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.task_duration = task_duration
+        self.export_duration = export_duration
+        self.tt_ttl = tt_ttl
+        self.require_auth = require_auth
+        self.catalog_size = catalog_size
+        self.token_ttl = token_ttl
+        self.random = random.Random(seed)
+
+
+class MockState:
+    def __init__(self, config):
+        self.config = config
+        self.tokens = {}
+        self.exported = {}
+        self.present = {}
+        self.tasks = {}
+        self.ssts = set()
+        self.tts = {}
+        self.stats = {"connections": 0, "requests": {}}
+        self.lock = threading.Lock()
+
+    def count(self, chave):
+        with self.lock:
+            self.stats["requests"][chave] = self.stats["requests"].get(chave, 0) + 1
+
+    def new_task(self, duration=None):
+        task_id = uuid.uuid4().hex
+        with self.lock:
+            self.tasks[task_id] = time.time() + (self.config.task_duration if duration is None else duration)
+        return task_id
+
+
+ROUTES = [
+    ("POST", re.compile(r"^/gdc/account/login$"), "login"),
+    ("GET", re.compile(r"^/gdc/account/token$"), "token"),
+    ("GET", re.compile(r"^/gdc/account/profile/current$"), "profile"),
+    ("GET", re.compile(r"^/gdc/account/profile/(?P<profile>[^/]+)/projects$"), "projects"),
+    ("GET", re.compile(r"^/gdc/projects/(?P<ws>[^/]+)$"), "project"),
+    ("POST", re.compile(r"^/gdc/md/(?P<ws>[^/]+)/maintenance/partialmdexport$"), "export"),
+    ("POST", re.compile(r"^/gdc/md/(?P<ws>[^/]+)/maintenance/partialmdimport$"), "import"),
+    ("GET", re.compile(r"^/gdc/md/(?P<ws>[^/]+)/tasks/(?P<task>[^/]+)/status$"), "task_status"),
+    ("GET", re.compile(r"^/gdc/md/(?P<ws>[^/]+)/(?P<direction>using2|usedby2)/(?P<obj>\d+)$"), "dependencies"),
+    ("POST", re.compile(r"^/gdc/md/(?P<ws>[^/]+)/objects/get$"), "objects"),
+    ("POST", re.compile(r"^/gdc/md/(?P<ws>[^/]+)/identifiers$"), "identifiers"),
+    ("GET", re.compile(r"^/gdc/md/(?P<ws>[^/]+)/objects/query$"), "query"),
+]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def setup(self):
+        super().setup()
+        # Headers e corpo saem em writes separados; sem isso o Nagle atrasa cada resposta em ~40 ms.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.state.lock:
+            self.state.stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        path, _, query = self.path.partition("?")
+        self.query = {chave: valores[0] for chave, valores in parse_qs(query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        for route_method, pattern, nome in ROUTES:
+            match = pattern.match(path)
+            if route_method == method and match:
+                break
+        else:
+            self._send_json(404, {"error": {"message": f"Not found: {path}"}})
+            return
+        self.state.count(nome)
+        config = self.state.config
+        if config.require_auth and nome not in ("login", "token") and not self._tt_valido():
+            self._send_json(401, {"error": {"message": "Unauthorized"}})
+            return
+        if config.latency:
+            time.sleep(config.latency)
+        if nome != "login" and config.failure_rate and config.random.random() < config.failure_rate:
+            self._send_json(503, {"error": {"message": "Service temporarily unavailable"}}, {"Retry-After": "1"})
+            return
+        payload = json.loads(body) if body else {}
+        getattr(self, f"_handle_{nome}")(payload, **match.groupdict())
+
+    def _send(self, status, body, content_type, headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for chave, valor in (headers or {}).items():
+            self.send_header(chave, valor)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status, data, headers=None):
+        self._send(status, json.dumps(data), "application/json", headers)
+
+    def _tt_valido(self):
+        tt = self.headers.get("X-GDC-AuthTT")
+        with self.state.lock:
+            return tt is not None and self.state.tts.get(tt, 0) > time.time()
+
+    def _handle_login(self, payload):
+        sst = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.ssts.add(sst)
+        user_login = {"profile": "/gdc/account/profile/mock", "state": "/gdc/account/login/mock"}
+        if payload.get("postUserLogin", {}).get("verify_level") == 2:
+            user_login["token"] = sst
+        self._send_json(200, {"userLogin": user_login},
+                        {"Set-Cookie": f"GDCAuthSST={sst}; Path=/gdc/account; HttpOnly"})
+
+    def _handle_token(self, payload):
+        with self.state.lock:
+            valido = self.headers.get("X-GDC-AuthSST") in self.state.ssts
+        if not valido:
+            self._send_json(401, {"error": {"message": "SST invalid"}})
+            return
+        tt = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.tts[tt] = time.time() + self.state.config.tt_ttl
+        self._send_json(200, {"userToken": {"token": tt}})
+
+    def _handle_profile(self, payload):
+        self._send_json(200, {"accountSetting": {"login": "mock@example.com", "permissions": [],
+                                                 "links": {"self": "/gdc/account/profile/mock"}}})
+
+    def _handle_projects(self, payload, profile):
+        projetos = [{"project": {"meta": {"title": f"Workspace ws{i}"}, "links": {"self": f"/gdc/projects/ws{i}"}}}
+                    for i in range(1, 51)]
+        self._send_json(200, {"projects": projetos})
+
+    def _handle_project(self, payload, ws):
+        etag = f'"{ws}-v1"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, "", "application/json", {"ETag": etag})
+            return
+        self._send_json(200, {"project": {"meta": {"title": f"Workspace {ws}"}}}, {"ETag": etag})
+
+    def _handle_export(self, payload, ws):
+        uris = payload.get("partialMDExport", {}).get("uris", [])
+        if not uris:
+            self._send_json(400, {"error": {"message": "uris must not be empty"}})
+            return
+        token = uuid.uuid4().hex
+        ids = {uri.rsplit("/", 1)[-1] for uri in uris}
+        with self.state.lock:
+            self.state.tokens[token] = time.time() + self.state.config.token_ttl
+            self.state.exported[token] = ids
+            self.state.present.setdefault(ws, set()).update(ids)
+        task_id = self.state.new_task(duration=self.state.config.export_duration)
+        artifact = {"partialMDArtifact": {"status": {"uri": f"/gdc/md/{ws}/tasks/{task_id}/status"}, "token": token}}
+        # O servidor real devolve o JSON dentro de um <pre> com aspas escapadas.
+        corpo = html.escape(json.dumps(artifact, indent=2)).replace("&quot;", "&#x22;")
+        self._send(200, f"<html><body><pre>{corpo}</pre></body></html>", "text/html")
+
+    def _handle_import(self, payload, ws):
+        token = payload.get("partialMDImport", {}).get("token")
+        with self.state.lock:
+            expira = self.state.tokens.get(token)
+        if expira is None or expira < time.time():
+            self._send_json(400, {"error": {"message": "Import token is no longer available"}})
+            return
+        with self.state.lock:
+            self.state.present.setdefault(ws, set()).update(self.state.exported.get(token, ()))
+        task_id = self.state.new_task()
+        self._send_json(200, {"uri": f"/gdc/md/{ws}/tasks/{task_id}/status"})
+
+    def _handle_task_status(self, payload, ws, task):
+        with self.state.lock:
+            fim = self.state.tasks.get(task)
+        if fim is None:
+            self._send_json(404, {"error": {"message": "Task not found"}})
+            return
+        status = "OK" if time.time() >= fim else "RUNNING"
+        self._send_json(200, {"wTaskStatus": {"status": status}})
+
+    def _handle_dependencies(self, payload, ws, direction, obj):
+        # Grafo sintético: cada objeto depende de duas métricas compartilhadas entre vizinhos.
+        base = int(obj)
+        entries = [{"link": f"/gdc/md/{ws}/obj/{9000 + (base + i) % 50}", "category": "metric"} for i in range(2)]
+        self._send_json(200, {"entries": entries})
+
+    def _handle_objects(self, payload, ws):
+        # Relatórios sintéticos: o mesmo id tem o mesmo conteúdo em qualquer workspace.
+        itens = []
+        for uri in payload.get("get", {}).get("items", []):
+            obj_id = uri.rsplit("/", 1)[-1]
+            itens.append({"report": {
+                "meta": {"uri": f"/gdc/md/{ws}/obj/{obj_id}", "identifier": f"report.{obj_id}",
+                         "title": f"Report {obj_id}", "updated": "2024-01-01 00:00:00"},
+                "content": {"definitions": [f"/gdc/md/{ws}/obj/{obj_id}0"]}
+            }})
+        self._send_json(200, {"objects": {"items": itens}})
+
+    def _handle_identifiers(self, payload, ws):
+        # Só resolve identificadores de objetos exportados deste workspace ou importados nele.
+        with self.state.lock:
+            presentes = set(self.state.present.get(ws, ()))
+        encontrados = [{"identifier": identifier, "uri": f"/gdc/md/{ws}/obj/{identifier.rsplit('.', 1)[-1]}"}
+                       for identifier in payload.get("identifierToUri", [])
+                       if identifier.rsplit(".", 1)[-1] in presentes]
+        self._send_json(200, {"identifiers": encontrados})
+
+    def _handle_query(self, payload, ws):
+        # Catálogo sintético: `catalog_size` objetos por categoria, em 10 pastas e com 5 tags.
+        categoria = self.query.get("category", "report")
+        offset = int(self.query.get("offset", 0))
+        limit = int(self.query.get("limit", 50))
+        total = self.state.config.catalog_size if categoria in ("report", "projectDashboard", "metric") else 10
+        itens = []
+        for i in range(offset, min(offset + limit, total)):
+            meta = {"uri": f"/gdc/md/{ws}/obj/{i + 1}", "identifier": f"{categoria}.{i + 1}",
+                    "title": f"{categoria} {i + 1}", "tags": f"tag{i % 5}",
+                    "updated": f"2024-{i % 12 + 1:02d}-01 00:00:00"}
+            content = {"domains": [f"/gdc/md/{ws}/obj/{900000 + i % 10}"]} if categoria == "report" else {}
+            if categoria == "domain":
+                meta["uri"] = f"/gdc/md/{ws}/obj/{900000 + i}"
+            itens.append({categoria: {"meta": meta, "content": content}})
+        paging = {"offset": offset, "count": len(itens)}
+        if offset + limit < total:
+            paging["next"] = f"/gdc/md/{ws}/objects/query?category={categoria}&offset={offset + limit}&limit={limit}"
+        self._send_json(200, {"objects": {"paging": paging, "items": itens}})
+
+
+class MockGoodDataServer:
+    """Servidor mock em uma thread própria; use como context manager."""
+
+    def __init__(self, host="127.0.0.1", port=0, **config):
+        self.state = MockState(MockConfig(**config))
+        handler = type("BoundMockHandler", (MockHandler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self):
+        with self.state.lock:
+            return {"connections": self.state.stats["connections"], "requests": dict(self.state.stats["requests"])}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API GoodData.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Atraso por requisição, em segundos")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fração de requisições que recebem 503")
+    parser.add_argument("--task-duration", type=float, default=1.0, help="Duração das tarefas de importação")
+    parser.add_argument("--token-ttl", type=float, default=300.0, help="Validade dos tokens de exportação")
+    parser.add_argument("--tt-ttl", type=float, default=600.0, help="Validade do TT emitido em /gdc/account/token")
+    parser.add_argument("--require-auth", action="store_true", help="Exige X-GDC-AuthTT válido (responde 401)")
+    parser.add_argument("--export-duration", type=float, default=0.0, help="Tempo até o artefato exportado ficar pronto")
+    args = parser.parse_args(argv)
+    server = MockGoodDataServer(args.host, args.port, latency=args.latency, failure_rate=args.failure_rate,
+                                task_duration=args.task_duration, token_ttl=args.token_ttl,
+                                export_duration=args.export_duration, tt_ttl=args.tt_ttl,
+                                require_auth=args.require_auth)
+    print(f"Mock GoodData em {server.base_url} (Ctrl+C para sair)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
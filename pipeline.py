@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+
+from apigooddata import (
+    DEFAULT_EXPORT_CHUNK_SIZE, GoodDataAPIError, RetryPolicy, chunk_uris, dedupe_report_uris,
+    export_when_ready, import_partial_metadata, is_refusal_error, wait_for_import_status_ok
+)
+
+_FIM = object()
+
+
+class PipelinedMigration:
+    """Exportação e importação em pipeline para um destino.
+
+    Uma thread exporta o lote N+1 (e espera o artefato ficar pronto) enquanto
+    o lote N é importado. `prefetch` limita quantos tokens existem à frente
+    do importador (contando o que está sendo exportado), para que não
+    envelheçam na fila: a vaga é reservada antes de exportar e devolvida
+    quando o importador pega o token. Se um token expirar, o lote é
+    exportado de novo na hora. Um lote recusado pelo servidor é dividido ao
+    meio, como em `batch_export_and_import`.
+    """
+
+    def __init__(self, workspace_origem, workspace_destino, cookies, export_opts, import_opts,
+                 policy=None, prefetch=1):
+        self.workspace_origem = workspace_origem
+        self.workspace_destino = workspace_destino
+        self.cookies = cookies
+        self.export_opts = export_opts
+        self.import_opts = import_opts
+        self.policy = policy or RetryPolicy()
+        self.prefetch = prefetch
+        self._cancelado = None
+        self._vagas = None
+
+    def _export(self, lote):
+        return self.policy.call("export", export_when_ready, self.workspace_origem, lote, self.cookies,
+                                **self.export_opts)
+
+    def _reservar(self):
+        """Espera uma vaga para mais um token; False se a migração foi encerrada."""
+        while not self._vagas.acquire(timeout=0.1):
+            if self._cancelado.is_set():
+                return False
+        return True
+
+    def _export_split(self, lote):
+        """Gera (uris, token, erro) por lote enviado, dividindo ao meio os lotes recusados."""
+        if not self._reservar():
+            return
+        try:
+            token = self._export(lote)
+        except Exception as e:
+            self._vagas.release()
+            if len(lote) == 1 or not is_refusal_error(e):
+                yield lote, None, str(e)
+                return
+            meio = len(lote) // 2
+            yield from self._export_split(lote[:meio])
+            yield from self._export_split(lote[meio:])
+            return
+        yield lote, token, None
+
+    def _produzir(self, lotes, fila):
+        try:
+            for lote in lotes:
+                if self._cancelado.is_set():
+                    return
+                for enviado, token, erro in self._export_split(lote):
+                    if self._cancelado.is_set():
+                        return
+                    fila.put((enviado, token, erro, time.monotonic()))
+        finally:
+            fila.put(_FIM)
+
+    def _importar(self, lote, token):
+        estado = {"token": token, "expirado": False, "exports": 1}
+
+        def importar():
+            if estado["expirado"]:
+                estado["token"] = self._export(lote)
+                estado["exports"] += 1
+                estado["expirado"] = False
+            try:
+                return import_partial_metadata(self.workspace_destino, estado["token"], self.cookies,
+                                               **self.import_opts)
+            except GoodDataAPIError as e:
+                estado["expirado"] = e.token_expired
+                raise
+
+        result = self.policy.call("import", importar)
+        status = "OK"
+        if result.get("uri"):
+            status = self.policy.call("poll", wait_for_import_status_ok, self.workspace_destino, result["uri"],
+                                      self.cookies)
+        return status, estado["exports"]
+
+    def run(self, lotes, on_batch=None):
+        """Executa os lotes; `on_batch(resultado)` é chamado ao fim de cada um."""
+        self._cancelado = threading.Event()
+        self._vagas = threading.Semaphore(max(1, self.prefetch))
+        fila = queue.Queue()
+        produtor = threading.Thread(target=self._produzir, args=(list(lotes), fila), daemon=True)
+        produtor.start()
+        resultados = []
+        try:
+            while True:
+                item = fila.get()
+                if item is _FIM:
+                    break
+                lote, token, erro, pronto_em = item
+                if token:
+                    self._vagas.release()
+                resultado = {"uris": lote, "status": "ERROR", "erro": erro, "exports": 1,
+                             "espera_token": round(time.monotonic() - pronto_em, 3)}
+                if token:
+                    try:
+                        resultado["status"], resultado["exports"] = self._importar(lote, token)
+                    except Exception as e:
+                        resultado["erro"] = str(e)
+                resultados.append(resultado)
+                if on_batch:
+                    on_batch(resultado)
+        finally:
+            # O produtor percebe o cancelamento em até 0,1 s enquanto espera uma vaga.
+            self._cancelado.set()
+            produtor.join()
+        return resultados
+
+
+def pipelined_batch_export_and_import(workspace_origem, workspace_destino, report_links, cookies,
+                                      export_opts, import_opts, chunk_size=DEFAULT_EXPORT_CHUNK_SIZE,
+                                      on_batch=None):
+    """Versão em pipeline de `batch_export_and_import`, com a mesma tabela de resultados."""
+    uris, mapa = dedupe_report_uris(report_links)
+    migracao = PipelinedMigration(workspace_origem, workspace_destino, cookies, export_opts, import_opts)
+    por_uri = {}
+    for chunk_idx, resultado in enumerate(migracao.run(chunk_uris(uris, chunk_size), on_batch), start=1):
+        for uri in resultado["uris"]:
+            por_uri[uri] = {"chunk": chunk_idx, "status": resultado["status"], "erro": resultado["erro"]}
+    return [dict(link=link, uri=uri, **por_uri[uri]) for link, uri in mapa.items()]
@@ -0,0 +1,210 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Limites iniciais por classe de endpoint (ver apigooddata.endpoint_class):
+# requisições por segundo, rajada e requisições simultâneas.
+DEFAULT_LIMITS = {
+    "account": {"rate": 5.0, "burst": 5, "concurrency": 4},
+    "export": {"rate": 2.0, "burst": 4, "concurrency": 4},
+    "import": {"rate": 2.0, "burst": 4, "concurrency": 4},
+    "status": {"rate": 10.0, "burst": 10, "concurrency": 8},
+    "metadata": {"rate": 10.0, "burst": 10, "concurrency": 8},
+}
+THROTTLE_STATUS = {429, 503}
+MIN_RATE = 0.2
+DECREASE_FACTOR = 0.5
+INCREASE_AFTER = 20     # respostas OK seguidas antes de aumentar o limite
+INCREASE_STEP = 0.1     # fração do limite configurado somada a cada aumento
+
+
+class TokenBucket:
+    """Balde de tokens: `rate` requisições por segundo com rajadas de até `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, agora):
+        self.tokens = min(self.burst, self.tokens + (agora - self.updated) * self.rate)
+        self.updated = agora
+
+    def acquire(self):
+        """Bloqueia até haver um token; retorna o tempo de espera."""
+        espera_total = 0.0
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._refill(agora)
+                if agora >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return espera_total
+                espera = max(self.paused_until - agora, (1 - self.tokens) / self.rate)
+            time.sleep(espera)
+            espera_total += espera
+
+    def pause(self, seconds):
+        """Suspende a emissão de tokens (ex.: Retry-After) e esvazia o balde."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class AdaptiveSemaphore:
+    """Semáforo cujo limite pode ser alterado com requisições em andamento."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def set_limit(self, limit):
+        with self._cond:
+            self.limit = max(1, limit)
+            self._cond.notify_all()
+
+
+class EndpointLimiter:
+    """Taxa e concorrência de uma classe de endpoint, ajustadas em AIMD.
+
+    Um 429/503 reduz taxa e concorrência pela metade (e respeita o
+    Retry-After); cada `INCREASE_AFTER` respostas OK seguidas devolvem uma
+    fração do limite configurado, até voltar a ele.
+    """
+
+    def __init__(self, rate, burst, concurrency):
+        self.max_rate = rate
+        self.max_concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst)
+        self.semaphore = AdaptiveSemaphore(concurrency)
+        self.successes = 0
+        self.throttled = 0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        espera = self.bucket.acquire()
+        inicio = time.monotonic()
+        self.semaphore.acquire()
+        with self._lock:
+            self.waited += espera + time.monotonic() - inicio
+        try:
+            yield
+        finally:
+            self.semaphore.release()
+
+    def feedback(self, status, retry_after=None):
+        with self._lock:
+            if status in THROTTLE_STATUS:
+                self.throttled += 1
+                self.successes = 0
+                self.bucket.rate = max(MIN_RATE, self.bucket.rate * DECREASE_FACTOR)
+                self.semaphore.set_limit(int(self.semaphore.limit * DECREASE_FACTOR))
+                if retry_after:
+                    self.bucket.pause(retry_after)
+                return
+            if status >= 400:
+                return
+            self.successes += 1
+            if self.successes < INCREASE_AFTER:
+                return
+            self.successes = 0
+            self.bucket.rate = min(self.max_rate, self.bucket.rate + self.max_rate * INCREASE_STEP)
+            if self.semaphore.limit < self.max_concurrency:
+                self.semaphore.set_limit(self.semaphore.limit + 1)
+
+    def summary(self):
+        with self._lock:
+            return {
+                "rate": round(self.bucket.rate, 3),
+                "max_rate": self.max_rate,
+                "concurrency": self.semaphore.limit,
+                "max_concurrency": self.max_concurrency,
+                "throttled": self.throttled,
+                "waited_s": round(self.waited, 3)
+            }
+
+
+class RateLimiter:
+    """Limites por classe de endpoint, compartilhados por todas as threads do processo."""
+
+    def __init__(self, limits=None):
+        self._lock = threading.Lock()
+        self._limiters = {}
+        self.configure(**{**DEFAULT_LIMITS, **(limits or {})})
+
+    def configure(self, **limits):
+        """Troca os limites de uma ou mais classes: configure(export={"rate": 1, "concurrency": 2})."""
+        novos = {}
+        for endpoint, opcoes in limits.items():
+            base = validate_limit(endpoint, {**DEFAULT_LIMITS.get(endpoint, {}), **opcoes})
+            novos[endpoint] = EndpointLimiter(float(base["rate"]), int(base["burst"]), int(base["concurrency"]))
+        with self._lock:
+            self._limiters.update(novos)
+
+    def limiter(self, endpoint):
+        with self._lock:
+            if endpoint not in self._limiters:
+                base = DEFAULT_LIMITS["metadata"]
+                self._limiters[endpoint] = EndpointLimiter(base["rate"], base["burst"], base["concurrency"])
+            return self._limiters[endpoint]
+
+    def slot(self, endpoint):
+        return self.limiter(endpoint).slot()
+
+    def feedback(self, endpoint, status, retry_after=None):
+        self.limiter(endpoint).feedback(status, retry_after)
+
+    def summary(self):
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {endpoint: limiter.summary() for endpoint, limiter in limiters.items()}
+
+
+def validate_limit(endpoint, opcoes):
+    """Rejeita classes desconhecidas e limites que travariam o balde (taxa <= 0, concorrência < 1)."""
+    if endpoint not in DEFAULT_LIMITS:
+        raise ValueError(f"Classe de endpoint desconhecida: {endpoint!r} (use {', '.join(DEFAULT_LIMITS)})")
+    if not float(opcoes["rate"]) > 0:
+        raise ValueError(f"Taxa de {endpoint} deve ser maior que zero: {opcoes['rate']!r}")
+    if int(opcoes["concurrency"]) < 1:
+        raise ValueError(f"Concorrência de {endpoint} deve ser ao menos 1: {opcoes['concurrency']!r}")
+    if int(opcoes["burst"]) < 1:
+        raise ValueError(f"Rajada de {endpoint} deve ser ao menos 1: {opcoes['burst']!r}")
+    return opcoes
+
+
+def parse_limit(texto):
+    """Converte "export=2/4" (taxa/concorrência, concorrência opcional) em ("export", {...})."""
+    endpoint, _, valor = texto.partition("=")
+    endpoint = endpoint.strip()
+    if not endpoint or not valor:
+        raise ValueError(f"Limite inválido: {texto!r} (use classe=taxa[/concorrência])")
+    taxa, _, concorrencia = valor.partition("/")
+    try:
+        opcoes = {"rate": float(taxa), "burst": max(1, int(float(taxa)))}
+        if concorrencia:
+            opcoes["concurrency"] = int(concorrencia)
+    except (ValueError, OverflowError):
+        raise ValueError(f"Limite inválido: {texto!r} (use classe=taxa[/concorrência])")
+    validate_limit(endpoint, {**DEFAULT_LIMITS.get(endpoint, {}), **opcoes})
+    return endpoint, opcoes
+
+
+RATE_LIMITER = RateLimiter()
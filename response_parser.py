@@ -0,0 +1,175 @@
+import codecs
+import json
+import re
+from html.parser import HTMLParser
+
+_decoder = json.JSONDecoder()
+
+# Campos do partialMDArtifact procurados no texto à medida que ele chega.
+_ARTIFACT_FIELD = re.compile(r'"(token|uri)"\s*:\s*("(?:[^"\\]|\\.)*")|"(partialMDArtifact)"\s*:')
+# Quanto do fim do texto já lido é guardado para um campo partido entre dois pedaços.
+_MAX_FIELD_CHARS = 64 * 1024
+
+
+class _PreJSONExtractor(HTMLParser):
+    """Guarda apenas o texto dentro do primeiro `<pre>` (entidades HTML já decodificadas).
+
+    Enquanto nenhum `<pre>` aparece, o texto fora das tags também é guardado,
+    para o caso de o JSON vir solto no HTML.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.pre_parts = None
+        self.text_parts = []
+        self._depth = 0
+        self._done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "pre" and not self._done:
+            self._depth += 1
+            if self.pre_parts is None:
+                self.pre_parts = []
+                self.text_parts = None
+
+    def handle_endtag(self, tag):
+        if tag == "pre" and self._depth:
+            self._depth -= 1
+            if not self._depth:
+                self._done = True
+
+    def handle_data(self, data):
+        if self._depth and not self._done:
+            self.pre_parts.append(data)
+        elif self.text_parts is not None:
+            self.text_parts.append(data)
+
+
+class _ArtifactScanner:
+    """Procura token e URI de status do partialMDArtifact sem guardar a resposta inteira."""
+
+    def __init__(self):
+        self.found = False
+        self.token = None
+        self.status_uri = None
+        self._tail = ""
+
+    @property
+    def done(self):
+        return self.token is not None and self.status_uri is not None
+
+    def feed(self, text):
+        janela = self._tail + text
+        fim = 0
+        for match in _ARTIFACT_FIELD.finditer(janela):
+            fim = match.end()
+            if match.group(3):
+                self.found = True
+                continue
+            valor = json.loads(match.group(2))
+            if not isinstance(valor, str):
+                continue
+            if match.group(1) == "token" and self.token is None:
+                self.token = valor
+            elif match.group(1) == "uri" and self.status_uri is None:
+                self.status_uri = valor
+        self._tail = janela[fim:][-_MAX_FIELD_CHARS:]
+
+
+class _HTMLArtifactScanner(HTMLParser):
+    """Repassa ao scanner o texto do HTML (entidades já decodificadas), ignorando tags e atributos."""
+
+    def __init__(self, scanner):
+        super().__init__(convert_charrefs=True)
+        self.scanner = scanner
+
+    def handle_data(self, data):
+        self.scanner.feed(data)
+
+
+def _iter_text(chunks):
+    """Decodifica os pedaços (str ou bytes UTF-8) em sequência, sem partir caracteres multibyte."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in chunks:
+        if isinstance(chunk, (bytes, bytearray)):
+            chunk = decoder.decode(chunk)
+        elif not isinstance(chunk, str):
+            raise ValueError(f"Pedaço de resposta inválido: {type(chunk).__name__}")
+        if chunk:
+            yield chunk
+    resto = decoder.decode(b"", final=True)
+    if resto:
+        yield resto
+
+
+def _decode_first_object(text):
+    """Decodifica o primeiro objeto JSON do texto, sem regex gulosa."""
+    inicio = text.find("{")
+    if inicio < 0:
+        raise ValueError("Nenhum JSON encontrado no HTML")
+    obj, _ = _decoder.raw_decode(text, inicio)
+    return obj
+
+
+def parse_json_stream(chunks):
+    """Extrai o JSON de uma resposta (HTML com `<pre>` ou JSON puro) lendo os pedaços em sequência.
+
+    `chunks` é qualquer iterável de str/bytes, como `response.iter_content()`.
+    Entrada malformada sempre levanta ValueError.
+    """
+    parser = None
+    raw_parts = None
+    for chunk in _iter_text(chunks):
+        if parser is None and raw_parts is None:
+            inicio = chunk.lstrip()
+            if not inicio:
+                continue
+            if inicio[0] in "{[":
+                raw_parts = []
+            else:
+                parser = _PreJSONExtractor()
+        if raw_parts is not None:
+            raw_parts.append(chunk)
+        else:
+            parser.feed(chunk)
+    if raw_parts is not None:
+        return json.loads("".join(raw_parts))
+    if parser is None:
+        raise ValueError("Resposta vazia")
+    parser.close()
+    if parser.pre_parts is not None:
+        return json.loads("".join(parser.pre_parts))
+    return _decode_first_object("".join(parser.text_parts))
+
+
+def parse_json_text(text):
+    return parse_json_stream((text,))
+
+
+def parse_export_artifact(chunks):
+    """Retorna (token, uri_da_tarefa) do partialMDArtifact; a URI pode ser None.
+
+    O texto é varrido à medida que chega e a leitura para assim que token e URI
+    aparecem, sem montar a resposta inteira na memória. Levanta ValueError se a
+    resposta não tiver um partialMDArtifact.
+    """
+    scanner = _ArtifactScanner()
+    parser = None
+    for chunk in _iter_text(chunks):
+        if parser is None:
+            inicio = chunk.lstrip()
+            if not inicio:
+                continue
+            # JSON puro vai direto ao scanner; HTML passa antes pelo parser para decodificar as entidades.
+            parser = scanner if inicio[0] in "{[" else _HTMLArtifactScanner(scanner)
+        parser.feed(chunk)
+        if scanner.found and scanner.done:
+            break
+    else:
+        if parser is None:
+            raise ValueError("Resposta vazia")
+        if parser is not scanner:
+            parser.close()
+    if not scanner.found:
+        raise ValueError("Nenhum partialMDArtifact encontrado na resposta")
+    return scanner.token, scanner.status_uri
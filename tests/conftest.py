@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import apigooddata  # noqa: E402
+from mock_server import MockGoodDataServer  # noqa: E402
+
+
+@pytest.fixture
+def mock_server():
+    with MockGoodDataServer(task_duration=0.0) as server:
+        yield server
+
+
+@pytest.fixture
+def client(mock_server, monkeypatch):
+    """Cliente padrão apontando para o mock, sem limitador nem sonda de DNS/conexão."""
+    anterior = apigooddata.get_default_client()
+    monkeypatch.setattr(apigooddata, "BASE_URL", mock_server.base_url)
+    novo = apigooddata.GoodDataClient(mock_server.base_url)
+    novo.limiter = None
+    novo.metrics = None
+    apigooddata.set_default_client(novo)
+    yield novo
+    novo.close()
+    apigooddata.set_default_client(anterior)
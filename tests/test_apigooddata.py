@@ -0,0 +1,186 @@
+import html
+import json
+import time
+
+import pytest
+
+import apigooddata
+from apigooddata import (
+    CircuitBreaker, CircuitOpenError, GoodDataAPIError, PollingStrategy, PollStats, RetryPolicy, StageBudget,
+    chunk_uris, dedupe_report_uris, extract_report_uri, parse_export_token, parse_retry_after, split_report_links
+)
+
+LINK = "https://analytics.example.com/#s=/gdc/projects/ws1|analysisPage|head|/gdc/md/ws1/obj/123"
+
+
+def _artifact_html(token="abc", uri="/gdc/md/ws1/tasks/t1/status"):
+    artifact = {"partialMDArtifact": {"status": {"uri": uri}, "token": token}}
+    corpo = html.escape(json.dumps(artifact, indent=2)).replace("&quot;", "&#x22;")
+    return f"<html><body><pre>{corpo}</pre></body></html>"
+
+
+def test_parse_export_token_from_html_pre():
+    assert parse_export_token(_artifact_html("tok-1")) == "tok-1"
+
+
+@pytest.mark.parametrize("corpo", [
+    "<html><body><pre>{}</pre></body></html>",
+    "<html><body><pre>{\"partialMDArtifact\": {}}</pre></body></html>",
+    "[1, 2]",
+    "",
+])
+def test_parse_export_token_without_token(corpo):
+    with pytest.raises(GoodDataAPIError):
+        parse_export_token(corpo)
+
+
+def test_extract_and_dedupe_report_uris():
+    assert extract_report_uri(LINK) == "/gdc/md/ws1/obj/123"
+    with pytest.raises(ValueError):
+        extract_report_uri("not-a-link")
+    uris, mapa = dedupe_report_uris([LINK, "/gdc/md/ws1/obj/123", "/gdc/md/ws1/obj/7"])
+    assert uris == ["/gdc/md/ws1/obj/123", "/gdc/md/ws1/obj/7"]
+    assert mapa[LINK] == "/gdc/md/ws1/obj/123"
+
+
+def test_split_and_chunk():
+    assert split_report_links("a, b;c\nd  e") == ["a", "b", "c", "d", "e"]
+    assert chunk_uris(list(range(5)), 2) == [[0, 1], [2, 3], [4]]
+    with pytest.raises(ValueError):
+        chunk_uris([1], 0)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("Thu, 01 Jan 1970 00:00:00 GMT") == 0.0
+
+
+def test_export_chunk_halves_only_on_refusal(monkeypatch):
+    enviados = []
+
+    def exportar(workspace_id, uris, cookies, **opts):
+        enviados.append(list(uris))
+        if len(uris) > 2:
+            raise GoodDataAPIError("payload too large", status_code=413)
+        return f"tok-{uris[0]}"
+
+    monkeypatch.setattr(apigooddata, "export_when_ready", exportar)
+    lotes = apigooddata._export_chunk("ws1", ["a", "b", "c", "d", "e"], {}, {})
+    assert [uris for uris, _, _ in lotes] == [["a", "b"], ["c"], ["d", "e"]]
+    assert all(token and erro is None for _, token, erro in lotes)
+    assert len(enviados) == 5
+
+
+@pytest.mark.parametrize("status_code", [503, 404, 401])
+def test_export_chunk_reraises_errors_that_splitting_does_not_fix(monkeypatch, status_code):
+    enviados = []
+
+    def exportar(workspace_id, uris, cookies, **opts):
+        enviados.append(list(uris))
+        raise GoodDataAPIError("falhou", status_code=status_code)
+
+    monkeypatch.setattr(apigooddata, "export_when_ready", exportar)
+    with pytest.raises(GoodDataAPIError):
+        apigooddata._export_chunk("ws1", ["a", "b"], {}, {})
+    assert len(enviados) == 1
+
+
+def test_batch_export_and_import_against_mock(client, mock_server):
+    links = [f"/gdc/md/ws1/obj/{i}" for i in range(1, 6)] + ["https://analytics.example.com/#s=/gdc/md/ws1/obj/1"]
+    resultados = apigooddata.batch_export_and_import("ws1", "ws2", links, {}, {}, {}, chunk_size=2)
+    assert [r["status"] for r in resultados] == ["OK"] * 6
+    assert [r["chunk"] for r in resultados] == [1, 1, 2, 2, 3, 1]
+    assert mock_server.stats["requests"]["export"] == 3
+
+
+def test_retry_policy_retries_transient_errors():
+    chamadas = []
+
+    def instavel():
+        chamadas.append(1)
+        if len(chamadas) < 3:
+            raise GoodDataAPIError("indisponível", status_code=503)
+        return "ok"
+
+    policy = RetryPolicy({"import": StageBudget(max_attempts=3, base_delay=0.0)})
+    assert policy.call("import", instavel) == "ok"
+    assert policy.summary()["import"]["retries"] == 2
+
+
+@pytest.mark.parametrize("status_code", [400, 403, 404])
+def test_retry_policy_does_not_retry_permanent_errors(status_code):
+    policy = RetryPolicy({"import": StageBudget(max_attempts=5, base_delay=0.0)})
+    chamadas = []
+
+    def invalido():
+        chamadas.append(1)
+        raise GoodDataAPIError("payload inválido", status_code=status_code)
+
+    with pytest.raises(GoodDataAPIError):
+        policy.call("import", invalido)
+    assert len(chamadas) == 1
+
+
+def test_expired_tokens_do_not_open_the_breaker():
+    policy = RetryPolicy({"import": StageBudget(max_attempts=8, base_delay=0.0)},
+                         breaker=CircuitBreaker(failure_threshold=2))
+
+    def expirado():
+        raise GoodDataAPIError("token expirado", status_code=410, token_expired=True)
+
+    with pytest.raises(GoodDataAPIError):
+        policy.call("import", expirado)
+    assert policy.breaker.state == "closed"
+    assert RetryPolicy().breaker is not RetryPolicy().breaker
+
+
+def test_missing_workspace_on_import_is_not_an_expired_token(client, mock_server):
+    with pytest.raises(GoodDataAPIError) as erro:
+        apigooddata.import_partial_metadata("ws1/inexistente", "tok", {})
+    assert erro.value.status_code == 404
+    assert not erro.value.token_expired and not erro.value.transient
+
+
+def test_circuit_breaker_allows_a_single_half_open_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    time.sleep(0.06)
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_polling_strategy_respects_retry_after():
+    strategy = PollingStrategy(initial_delay=0.5, factor=2.0, max_delay=4.0, jitter=0.0)
+    assert [strategy.delay(i) for i in range(5)] == [0.5, 1.0, 2.0, 4.0, 4.0]
+    assert strategy.delay(0, retry_after=3.0) == 3.0
+
+
+def test_poll_permanent_errors_escape_at_once(client):
+    stats = PollStats()
+    strategy = PollingStrategy(initial_delay=0.01, factor=1.0, max_delay=0.01, jitter=0.0, deadline=5)
+    with pytest.raises(GoodDataAPIError) as erro:
+        apigooddata.wait_for_import_status_ok("ws1", "/gdc/md/ws1/tasks/nope/status", {}, strategy=strategy,
+                                              stats=stats, max_errors=3)
+    assert erro.value.status_code == 404
+    assert stats.polls == 1
+
+
+def test_poll_transient_errors_escape_after_max_errors_honouring_retry_after(client, mock_server):
+    mock_server.state.config.failure_rate = 1.0
+    stats = PollStats()
+    strategy = PollingStrategy(initial_delay=0.01, factor=1.0, max_delay=0.01, jitter=0.0, deadline=5)
+    inicio = time.monotonic()
+    with pytest.raises(GoodDataAPIError) as erro:
+        apigooddata.wait_for_import_status_ok("ws1", "/gdc/md/ws1/tasks/x/status", {}, strategy=strategy,
+                                              stats=stats, max_errors=2)
+    assert erro.value.retry_after == 1.0
+    assert stats.polls == 2
+    assert time.monotonic() - inicio >= 1.0
@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("httpx")
+
+from apigooddata_async import async_export_and_import, wait_many_import_status_ok  # noqa: E402
+from auth import AuthManager  # noqa: E402
+from journal import MigrationJournal  # noqa: E402
+from migration import normalize_job, run_job  # noqa: E402
+
+
+def test_export_and_import_waits_for_the_exported_artifact(client, mock_server):
+    mock_server.state.config.export_duration = 0.3
+    assert async_export_and_import("ws1", "ws2", "/gdc/md/ws1/obj/1", {}, {}, {}) == "OK"
+    requisicoes = mock_server.stats["requests"]
+    assert requisicoes["export"] == 1 and requisicoes["import"] == 1
+    # Pelo menos um poll da tarefa de exportação antes do da importação.
+    assert requisicoes["task_status"] >= 2
+
+
+def test_wait_many_tracks_every_task_in_one_loop(client, mock_server):
+    uris = [f"/gdc/md/ws2/tasks/{mock_server.state.new_task(0.2)}/status" for _ in range(50)]
+    assert wait_many_import_status_ok(uris, {}) == {uri: "OK" for uri in uris}
+    assert mock_server.stats["connections"] <= 10
+
+
+def test_async_client_sends_the_tt_and_renews_it_after_a_401(client, mock_server):
+    mock_server.state.config.require_auth = True
+    AuthManager(client).login("voce@empresa.com", "senha").attach()
+    uri = f"/gdc/md/ws2/tasks/{mock_server.state.new_task(0)}/status"
+    assert wait_many_import_status_ok([uri], {}) == {uri: "OK"}
+    with mock_server.state.lock:
+        mock_server.state.tts.clear()
+    assert async_export_and_import("ws1", "ws2", "/gdc/md/ws1/obj/1", {}, {}, {}) == "OK"
+    assert mock_server.stats["requests"]["token"] == 2
+
+
+def test_resumed_job_polls_running_tasks_from_the_journal(client, mock_server, tmp_path):
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    job = normalize_job({"source": "ws1", "destinations": ["ws2"],
+                         "reports": ["/gdc/md/ws1/obj/1", "/gdc/md/ws1/obj/2"]})
+    task_uri = f"/gdc/md/ws2/tasks/{mock_server.state.new_task(0.2)}/status"
+    journal.record("job", "/gdc/md/ws1/obj/1", "ws2", "import", token="t1", task_uri=task_uri)
+    resumo = run_job(job, {}, journal=journal, job_id="job")
+    journal.close()
+    assert resumo["ok"] == 2
+    assert [r.get("resumed", False) for r in resumo["results"]] == [True, False]
+    assert mock_server.stats["requests"]["export"] == 1
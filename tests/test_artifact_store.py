@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+import artifact_store
+from artifact_store import ArtifactStore, export_to_store, replay_package
+
+URIS = ["/gdc/md/ws1/obj/1", "/gdc/md/ws1/obj/2"]
+
+
+def _report(ws, obj_id):
+    return {"report": {"meta": {"uri": f"/gdc/md/{ws}/obj/{obj_id}", "identifier": f"report.{obj_id}",
+                                "title": "Report", "updated": "2024-01-01 00:00:00"},
+                       "content": {"definitions": [f"/gdc/md/{ws}/obj/{obj_id}0"]}}}
+
+
+def _archived_with_expired_token(tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    manifest = export_to_store(store, "ws1", URIS, {}, {})
+    manifest["token"] = "expirado"
+    store.save_package(manifest)
+    return store, manifest["id"]
+
+
+def test_pack_and_unpack(tmp_path):
+    origem = ArtifactStore(str(tmp_path / "origem"))
+    digest = origem.put_object(_report("ws1", 5))
+    assert origem.put_object(_report("ws1", 5)) == digest
+    origem.save_package({"id": "pkg1", "source": "ws1", "objects": {"/gdc/md/ws1/obj/5": digest}})
+    arquivo = origem.pack("pkg1", str(tmp_path / "pkg1.tar.gz"))
+    destino = ArtifactStore(str(tmp_path / "destino"))
+    assert destino.unpack(arquivo) == "pkg1"
+    assert destino.get_object(digest) == _report("ws1", 5)
+    assert destino.list_packages()[0]["objects"] == 1
+
+
+def test_put_object_leaves_no_temp_file_on_failure(tmp_path, monkeypatch):
+    store = ArtifactStore(str(tmp_path))
+
+    def falhar(*args):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(os, "replace", falhar)
+    with pytest.raises(OSError):
+        store.put_object(_report("ws1", 5))
+    assert [nome for _, _, nomes in os.walk(store.objects_dir) for nome in nomes] == []
+
+
+def test_replay_uses_the_archived_token(client, mock_server, tmp_path):
+    store = ArtifactStore(str(tmp_path / "store"))
+    manifest = export_to_store(store, "ws1", URIS, {}, {})
+    resultados, alterados = replay_package(store, manifest["id"], ["ws2", "ws3"], {}, {})
+    assert {r["status"] for r in resultados.values()} == {"OK"}
+    assert alterados == []
+    assert mock_server.stats["requests"]["export"] == 1
+
+
+def test_expired_token_reexports_an_unchanged_source(client, mock_server, tmp_path):
+    store, package_id = _archived_with_expired_token(tmp_path)
+    resultados, alterados = replay_package(store, package_id, ["ws2", "ws3"], {}, {})
+    assert {r["status"] for r in resultados.values()} == {"OK"}
+    assert alterados == []
+    assert mock_server.stats["requests"]["export"] == 2
+    assert store.load_package(package_id)["token"] != "expirado"
+
+
+def test_expired_token_does_not_reexport_a_changed_source(client, mock_server, tmp_path, monkeypatch):
+    store, package_id = _archived_with_expired_token(tmp_path)
+    monkeypatch.setattr(artifact_store, "fetch_fingerprints", lambda *args: {})
+    resultados, alterados = replay_package(store, package_id, ["ws2", "ws3"], {}, {})
+    assert alterados == URIS
+    assert {r["status"] for r in resultados.values()} == {"ERROR"}
+    assert all("--allow-changed" in r["erro"] for r in resultados.values())
+    assert mock_server.stats["requests"]["export"] == 1
+
+    resultados, _ = replay_package(store, package_id, ["ws2", "ws3"], {}, {}, allow_changed=True)
+    assert {r["status"] for r in resultados.values()} == {"OK"}
+    assert mock_server.stats["requests"]["export"] == 2
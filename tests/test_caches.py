@@ -0,0 +1,78 @@
+import os
+import stat
+import threading
+
+import pytest
+
+import auth
+from incremental import FingerprintCache, object_fingerprint
+from workspace_cache import WorkspaceCache
+
+
+def _report(ws, obj_id, title="Report", updated="2024-01-01 00:00:00"):
+    return {"report": {"meta": {"uri": f"/gdc/md/{ws}/obj/{obj_id}", "identifier": f"report.{obj_id}",
+                                "title": title, "updated": updated},
+                       "content": {"definitions": [f"/gdc/md/{ws}/obj/{obj_id}0"]}}}
+
+
+def test_workspace_cache_persists_evicts_and_searches(tmp_path):
+    path = str(tmp_path / "workspaces.json")
+    cache = WorkspaceCache(path, max_entries=2)
+    for workspace_id, titulo in (("ws1", "Vendas"), ("ws2", "Financeiro"), ("ws3", "Vendas Sul")):
+        cache._store(workspace_id, titulo)
+    cache.save()
+    recarregado = WorkspaceCache(path, max_entries=2)
+    assert recarregado.peek("ws1") is None
+    assert [workspace_id for workspace_id, _ in recarregado.search("vendas")] == ["ws3"]
+
+
+def test_workspace_cache_concurrent_saves(tmp_path):
+    path = str(tmp_path / "workspaces.json")
+    cache = WorkspaceCache(path)
+
+    def gravar(i):
+        for j in range(20):
+            cache._store(f"ws{i}-{j}", "t")
+            cache.save()
+
+    threads = [threading.Thread(target=gravar, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(WorkspaceCache(path)._entries) == 120
+    assert os.listdir(tmp_path) == ["workspaces.json"]
+
+
+def test_workspace_cache_revalidates_with_etag(client, mock_server, tmp_path):
+    cache = WorkspaceCache(str(tmp_path / "workspaces.json"), ttl=0)
+    assert cache.get_name("ws7", {}) == "Workspace ws7"
+    assert cache.get_name("ws7", {}) == "Workspace ws7"
+    assert mock_server.stats["requests"]["project"] == 2
+
+
+def test_fingerprint_ignores_volatile_meta_and_workspace():
+    origem = object_fingerprint(_report("ws1", 5))
+    clone = _report("ws2", 5, updated="2025-02-02 00:00:00")
+    assert object_fingerprint(clone)["hash"] == origem["hash"]
+    assert object_fingerprint(_report("ws1", 5, title="Outro"))["hash"] != origem["hash"]
+
+
+def test_fingerprint_cache_round_trip(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    cache = FingerprintCache(path)
+    cache.mark_synced("ws1", "/gdc/md/ws1/obj/5", "ws2", object_fingerprint(_report("ws1", 5)))
+    cache.save()
+    assert FingerprintCache(path).get("ws1", "/gdc/md/ws1/obj/5", "ws2")["updated"] == "2024-01-01 00:00:00"
+
+
+@pytest.mark.skipif(os.name != "posix", reason="permissões POSIX")
+def test_sst_file_cache_is_private(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth, "keyring", None)
+    path = tmp_path / "sst.json"
+    path.write_text("{}")
+    os.chmod(path, 0o644)
+    cache = auth.SSTCache(str(path))
+    cache.save("voce@empresa.com", "sst-1")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert cache.load("voce@empresa.com") == "sst-1"
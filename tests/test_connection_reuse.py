@@ -0,0 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import apigooddata
+
+
+def test_sequential_calls_share_one_connection(client, mock_server):
+    for _ in range(30):
+        assert apigooddata.get_import_status("ws1", f"/gdc/md/ws1/tasks/{mock_server.state.new_task(0)}/status",
+                                             {}) == "OK"
+    stats = mock_server.stats
+    assert stats["requests"]["task_status"] == 30
+    assert stats["connections"] == 1
+
+
+def test_parallel_calls_stay_within_the_pool(client, mock_server):
+    def poll(_):
+        uri = f"/gdc/md/ws1/tasks/{mock_server.state.new_task(0)}/status"
+        return apigooddata.get_import_status("ws1", uri, {})
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert set(executor.map(poll, range(80))) == {"OK"}
+    assert mock_server.stats["connections"] <= 4
+
+
+def test_without_session_every_call_opens_a_connection(mock_server):
+    for _ in range(5):
+        requests.get(f"{mock_server.base_url}/gdc/md/ws1/tasks/x/status")
+    assert mock_server.stats["connections"] == 5
@@ -0,0 +1,30 @@
+from dependencies import plan_exports
+
+
+class FakeResolver:
+    def __init__(self, deps, categories=None):
+        self.deps = deps
+        self.categories = categories or {}
+
+    def resolve(self, workspace_id, uris):
+        return {uri: set(self.deps.get(uri, ())) for uri in uris}
+
+
+def test_shared_dependencies_go_in_the_same_chunk():
+    resolver = FakeResolver({"r1": {"m1"}, "r2": {"m1"}, "r3": {"m2"}})
+    plan = plan_exports(resolver, "ws1", ["r1", "r3", "r2"], chunk_size=2)
+    assert [sorted(chunk["uris"]) for chunk in plan.chunks] == [["r1", "r2"], ["r3"]]
+    assert plan.to_dict()["total_objects"] == 5
+
+
+def test_uris_already_carried_by_another_report_are_covered():
+    resolver = FakeResolver({"r1": {"m1"}})
+    plan = plan_exports(resolver, "ws1", ["r1", "m1"], chunk_size=10)
+    assert plan.chunks[0]["uris"] == ["r1"]
+    assert plan.covered == [["r1", "m1"]]
+
+
+def test_chain_without_a_direct_root_is_still_exported():
+    resolver = FakeResolver({"a": {"b"}, "b": {"c"}})
+    plan = plan_exports(resolver, "ws1", ["a", "b", "c"], chunk_size=10)
+    assert sorted(uri for covered in plan.covered for uri in covered) == ["a", "b", "c"]
@@ -0,0 +1,55 @@
+import copy
+
+import discovery
+from discovery import FOLDER_CATEGORIES, ReportCatalog, filter_objects
+
+
+def test_report_catalog_ttl_and_lru(tmp_path):
+    path = str(tmp_path / "catalog.json")
+    catalogo = ReportCatalog(path, ttl=60, max_workspaces=1)
+    catalogo.store("ws1", [{"uri": "a"}])
+    catalogo.store("ws2", [{"uri": "b"}])
+    catalogo.save()
+    recarregado = ReportCatalog(path, ttl=60, max_workspaces=1)
+    assert recarregado.cached("ws1") is None
+    assert recarregado.cached("ws2") == [{"uri": "b"}]
+    assert ReportCatalog(path, ttl=0).cached("ws2") is None
+
+
+def test_discover_pages_and_filters(client, mock_server, tmp_path):
+    mock_server.state.config.catalog_size = 1200
+    catalogo = ReportCatalog(str(tmp_path / "catalog.json"))
+    paginas = []
+    objetos = catalogo.discover("ws1", {}, on_page=paginas.append)
+    assert len(objetos) == 3600 and len(paginas[0]) == 500
+    assert objetos[0]["folders"] == ["domain 1"]
+    filtrados = filter_objects(objetos, text="report 11", category="report", tag="tag0")
+    assert filtrados and all("11" in obj["title"] and obj["tags"] == ["tag0"] for obj in filtrados)
+    assert "/gdc/md/ws1/obj/11" in [obj["uri"] for obj in filtrados]
+    requisicoes = mock_server.stats["requests"]["query"]
+    assert catalogo.discover("ws1", {}) == objetos
+    assert mock_server.stats["requests"]["query"] == requisicoes
+
+
+
+
+def test_pages_are_final_when_published(client, mock_server, tmp_path):
+    catalogo = ReportCatalog(str(tmp_path / "catalog.json"))
+    publicadas = []
+    objetos = catalogo.discover("ws1", {}, on_page=lambda pagina: publicadas.append(copy.deepcopy(pagina)))
+    assert [obj for pagina in publicadas for obj in pagina] == objetos
+    assert publicadas[0][0]["folders"] == ["domain 1"]
+
+
+def test_folder_lookup_failure_leaves_folders_empty(client, mock_server, tmp_path, monkeypatch):
+    consultar = discovery.query_objects_page
+
+    def query(workspace_id, category, cookies, **kwargs):
+        if category in FOLDER_CATEGORIES:
+            raise RuntimeError("pastas indisponíveis")
+        return consultar(workspace_id, category, cookies, **kwargs)
+
+    monkeypatch.setattr(discovery, "query_objects_page", query)
+    objetos = ReportCatalog(str(tmp_path / "catalog.json")).discover("ws1", {})
+    assert len(objetos) == 600
+    assert all(obj["folders"] == [] for obj in objetos)
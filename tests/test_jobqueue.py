@@ -0,0 +1,91 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import auth
+import jobqueue
+from jobqueue import JobQueue
+from journal import MigrationJournal
+
+JOB = {"source": "ws1", "destinations": ["ws2"], "reports": ["/gdc/md/ws1/obj/1"]}
+
+
+@pytest.fixture
+def fila(tmp_path):
+    fila = JobQueue(str(tmp_path / "queue.sqlite"), visibility_timeout=0.2)
+    yield fila
+    fila.close()
+
+
+def test_claim_follows_priority_then_order(fila):
+    baixa = fila.submit(JOB, priority=0)
+    alta = fila.submit(JOB, priority=10)
+    assert fila.claim("w1")["id"] == alta
+    assert fila.claim("w1")["id"] == baixa
+    assert fila.claim("w1") is None
+
+
+def test_expired_lease_is_redelivered_until_max_attempts(fila):
+    job_id = fila.submit(JOB, max_attempts=2)
+    assert fila.claim("w1")["attempts"] == 1
+    assert fila.claim("w2") is None
+    time.sleep(0.25)
+    item = fila.claim("w2")
+    assert (item["id"], item["worker"], item["attempts"]) == (job_id, "w2", 2)
+    assert not fila.heartbeat(job_id, "w1")
+    time.sleep(0.25)
+    assert fila.claim("w3") is None
+    assert fila.get(job_id)["state"] == "failed"
+
+
+def test_heartbeat_extends_the_lease(fila):
+    job_id = fila.submit(JOB)
+    fila.claim("w1")
+    time.sleep(0.15)
+    assert fila.heartbeat(job_id, "w1")
+    time.sleep(0.1)
+    assert fila.claim("w2") is None
+
+
+def test_fail_requeues_with_backoff(fila):
+    job_id = fila.submit(JOB, max_attempts=3)
+    fila.claim("w1")
+    fila.fail(job_id, "w1", "boom", backoff=0.2)
+    assert fila.get(job_id)["state"] == "queued"
+    assert fila.claim("w1") is None
+    time.sleep(0.25)
+    assert fila.claim("w1")["attempts"] == 2
+
+
+def test_cancel(fila):
+    na_fila = fila.submit(JOB)
+    rodando = fila.submit(JOB, priority=1)
+    fila.claim("w1")
+    assert fila.cancel(na_fila) and fila.cancel(rodando)
+    assert fila.get(na_fila)["state"] == "cancelled"
+    assert fila.cancel_requested(rodando)
+    assert not fila.heartbeat(rodando, "w1")
+    fila.fail(rodando, "w1", "interrompido")
+    assert fila.get(rodando)["state"] == "cancelled"
+    assert fila.stats()["cancelled"] == 2
+
+
+def test_cancelled_job_ends_once_worker_and_closes_its_databases(tmp_path, monkeypatch):
+    path = str(tmp_path / "queue.sqlite")
+    fila = JobQueue(path)
+    job_id = fila.submit(JOB)
+    fila.close()
+    fechados = []
+    for classe in (JobQueue, MigrationJournal):
+        original = classe.close
+        monkeypatch.setattr(classe, "close", lambda self, original=original: fechados.append(self) or original(self))
+    monkeypatch.setattr(auth, "authenticate", lambda *args, **kwargs: SimpleNamespace(cookies={}))
+    monkeypatch.setattr(jobqueue, "_run_claimed", lambda fila, item, *args: fila.cancel(item["id"]))
+
+    jobqueue.worker_main(path, "login", "senha", once=True)
+
+    assert {type(objeto) for objeto in fechados} == {JobQueue, MigrationJournal}
+    fila = JobQueue(path)
+    assert fila.get(job_id)["state"] == "cancelled"
+    fila.close()
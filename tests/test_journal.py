@@ -0,0 +1,28 @@
+from journal import MigrationJournal, job_fingerprint
+from migration import _journal_recorder
+
+URI = "/gdc/md/ws1/obj/1"
+
+
+def test_job_fingerprint_ignores_order():
+    job = {"source": "ws1", "destinations": ["ws2", "ws3"], "reports": [URI, "/gdc/md/ws1/obj/2"],
+           "export": {}, "import": {}}
+    invertido = dict(job, destinations=["ws3", "ws2"], reports=list(reversed(job["reports"])))
+    assert job_fingerprint(job) == job_fingerprint(invertido)
+
+
+def test_token_renewal_keeps_finished_and_running_pairs(tmp_path):
+    journal = MigrationJournal(str(tmp_path / "journal.sqlite"))
+    on_event = _journal_recorder(journal, "job", [URI], ("ws2", "ws3", "ws4"))
+    on_event("export", None, {"token": "t1"})
+    on_event("import", "ws2", {"token": "t1", "task_uri": "/gdc/md/ws2/tasks/a/status"})
+    on_event("done", "ws2", {"status": "OK"})
+    on_event("import", "ws3", {"token": "t1", "task_uri": "/gdc/md/ws3/tasks/b/status"})
+    # ws4 encontrou o token expirado e a exportação foi refeita no meio do fan-out.
+    on_event("export", None, {"token": "t2"})
+
+    assert journal.completed("job") == {(URI, "ws2")}
+    assert [t["destination"] for t in journal.running_tasks("job")] == ["ws3"]
+    etapas = {s["destination"]: s for s in journal.steps("job")}
+    assert etapas["ws4"]["stage"] == "export" and etapas["ws4"]["token"] == "t2"
+    journal.close()
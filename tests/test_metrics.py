@@ -0,0 +1,28 @@
+import math
+import socket
+import threading
+import time
+
+from metrics import Metrics
+
+
+def test_dns_probe_does_not_block_the_request(monkeypatch):
+    liberar = threading.Event()
+
+    def getaddrinfo_lento(*args, **kwargs):
+        liberar.wait(5)
+        raise socket.gaierror("sem DNS no teste")
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo_lento)
+    metrics = Metrics()
+    inicio = time.perf_counter()
+    metrics.measure_dns("analytics.example.com")
+    metrics.measure_dns("analytics.example.com")
+    assert time.perf_counter() - inicio < 0.5
+    assert metrics.summary()["dns_s"] == {}
+
+    liberar.set()
+    metrics.wait_probes()
+    assert len(metrics._probes) == 1
+    assert "gooddata_dns_seconds" in metrics.prometheus_text()
+    assert math.isnan(metrics.dns["analytics.example.com"])
@@ -0,0 +1,44 @@
+import pytest
+
+import migration
+from apigooddata import GoodDataAPIError
+from migration import JobError, normalize_job
+
+
+def test_normalize_job_fills_defaults():
+    job = normalize_job({"source": "ws1", "destinations": "ws2", "reports": ["/gdc/md/ws1/obj/1"],
+                         "import": {"overwriteNewer": True}})
+    assert job["destinations"] == ["ws2"]
+    assert job["import"] == {"overwriteNewer": 1, "updateLDMObjects": 0, "importAttributeProperties": 0}
+    assert job["chunk_size"] == 50 and not job["incremental"]
+
+
+@pytest.mark.parametrize("job", [
+    {"source": "ws1", "destinations": ["ws2"]},
+    {"source": "ws1", "destinations": ["ws2"], "reports": ["not-a-link"]},
+    {"source": "ws1", "destinations": ["ws2"], "reports": ["/gdc/md/ws1/obj/1"], "export": {"bogus": 1}},
+    {"source": "ws1", "destinations": ["ws2"], "reports": "/gdc/md/ws1/obj/1"},
+    {"source": "ws1", "destinations": ["ws2"], "reports": ["/gdc/md/ws1/obj/1"], "chunk_size": 0},
+    {"source": "ws1", "destinations": ["ws2"], "reports": ["/gdc/md/ws1/obj/1"], "chunk_size": -5},
+    {"source": "ws1", "destinations": ["ws2"], "reports": ["/gdc/md/ws1/obj/1"], "chunk_size": "muitos"},
+    {"source": "ws1", "destinations": ["ws2"], "reports": ["/gdc/md/ws1/obj/1"], "max_workers": 0},
+])
+def test_normalize_job_rejects_invalid_jobs(job):
+    with pytest.raises(JobError):
+        normalize_job(job)
+
+
+def test_dependency_lookup_failure_becomes_an_error_result(monkeypatch):
+    class FailingResolver:
+        def __init__(self, cookies):
+            pass
+
+        def resolve(self, workspace_id, uris):
+            raise GoodDataAPIError("Erro ao buscar dependências: 503", status_code=503)
+
+    monkeypatch.setattr(migration, "DependencyResolver", FailingResolver)
+    job = normalize_job({"source": "ws1", "destinations": ["ws2", "ws3"], "resolve_dependencies": True,
+                         "reports": ["/gdc/md/ws1/obj/1", "/gdc/md/ws1/obj/2"]})
+    resumo = migration.run_job(job, {})
+    assert resumo["failed"] == 4
+    assert all("dependências" in r["error"] for r in resumo["results"])
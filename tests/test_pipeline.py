@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+import pipeline
+from apigooddata import GoodDataAPIError
+
+
+def test_pipelined_migration_against_mock(client, mock_server):
+    links = [f"/gdc/md/ws1/obj/{i}" for i in range(1, 8)]
+    resultados = pipeline.pipelined_batch_export_and_import("ws1", "ws2", links, {}, {}, {}, chunk_size=3)
+    assert [r["status"] for r in resultados] == ["OK"] * 7
+    assert [r["chunk"] for r in resultados] == [1, 1, 1, 2, 2, 2, 3]
+
+
+def test_producer_splits_refused_batches(monkeypatch):
+    def exportar(workspace_id, uris, cookies, **opts):
+        if len(uris) > 2:
+            raise GoodDataAPIError("payload too large", status_code=413)
+        return "tok"
+
+    monkeypatch.setattr(pipeline, "export_when_ready", exportar)
+    monkeypatch.setattr(pipeline, "import_partial_metadata", lambda *args, **kwargs: {})
+    links = [f"/gdc/md/ws1/obj/{i}" for i in range(1, 6)]
+    resultados = pipeline.pipelined_batch_export_and_import("ws1", "ws2", links, {}, {}, {}, chunk_size=5)
+    assert [r["status"] for r in resultados] == ["OK"] * 5
+    assert [r["chunk"] for r in resultados] == [1, 1, 2, 3, 3]
+
+
+@pytest.mark.parametrize("prefetch", [1, 2])
+def test_prefetch_bounds_the_tokens_ahead_of_the_importer(monkeypatch, prefetch):
+    lock = threading.Lock()
+    estado = {"pendentes": 0, "maximo": 0}
+
+    def exportar(workspace_id, uris, cookies, **opts):
+        with lock:
+            estado["pendentes"] += 1
+            estado["maximo"] = max(estado["maximo"], estado["pendentes"])
+        return f"tok-{uris[0]}"
+
+    def importar(workspace_id, token, cookies, **opts):
+        with lock:
+            estado["pendentes"] -= 1
+        time.sleep(0.05)
+        return {}
+
+    monkeypatch.setattr(pipeline, "export_when_ready", exportar)
+    monkeypatch.setattr(pipeline, "import_partial_metadata", importar)
+    migracao = pipeline.PipelinedMigration("ws1", "ws2", {}, {}, {}, prefetch=prefetch)
+    resultados = migracao.run([[f"/gdc/md/ws1/obj/{i}"] for i in range(6)])
+    assert [r["status"] for r in resultados] == ["OK"] * 6
+    assert estado["maximo"] == prefetch
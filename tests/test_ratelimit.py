@@ -0,0 +1,37 @@
+import pytest
+
+from ratelimit import EndpointLimiter, RateLimiter, TokenBucket, parse_limit
+
+
+def test_parse_limit():
+    assert parse_limit("export=2/4") == ("export", {"rate": 2.0, "burst": 2, "concurrency": 4})
+    assert parse_limit("status=0.5") == ("status", {"rate": 0.5, "burst": 1})
+
+
+@pytest.mark.parametrize("texto", ["export", "export=", "export=0", "export=-1", "export=2/0", "export=abc",
+                                   "export=nan", "desconhecido=1"])
+def test_parse_limit_rejects_invalid_values(texto):
+    with pytest.raises(ValueError):
+        parse_limit(texto)
+
+
+def test_configure_rejects_unknown_classes():
+    with pytest.raises(ValueError):
+        RateLimiter(limits={"exprot": {"rate": 1}})
+
+
+def test_token_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(rate=50.0, burst=2)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() > 0.0
+
+
+def test_throttling_halves_and_recovers():
+    limiter = EndpointLimiter(rate=4.0, burst=4, concurrency=4)
+    limiter.feedback(429)
+    assert (limiter.bucket.rate, limiter.semaphore.limit) == (2.0, 2)
+    for _ in range(20):
+        limiter.feedback(200)
+    assert limiter.bucket.rate == pytest.approx(2.4)
+    assert limiter.semaphore.limit == 3
@@ -0,0 +1,69 @@
+import html
+import json
+
+import pytest
+
+from response_parser import parse_export_artifact, parse_json_stream, parse_json_text
+
+STATUS = "/gdc/md/ws1/tasks/t1/status"
+
+
+def _artifact_html(token="abc", uri=STATUS, **extra):
+    artifact = {"partialMDArtifact": {"status": {"uri": uri}, "token": token, **extra}}
+    corpo = html.escape(json.dumps(artifact, indent=2)).replace("&quot;", "&#x22;")
+    return f"<html><body><pre>{corpo}</pre></body></html>"
+
+
+def test_parse_export_artifact_survives_chunk_boundaries():
+    texto = _artifact_html("tok-2")
+    chunks = [texto[i:i + 7] for i in range(0, len(texto), 7)]
+    assert parse_export_artifact(chunks) == ("tok-2", STATUS)
+
+
+def test_parse_export_artifact_from_plain_json_bytes():
+    dados = json.dumps({"partialMDArtifact": {"token": "tok-é", "status": {"uri": STATUS}}}).encode()
+    # Pedaços de 1 byte partem o "é" ao meio.
+    assert parse_export_artifact(dados[i:i + 1] for i in range(len(dados))) == ("tok-é", STATUS)
+
+
+def test_parse_export_artifact_stops_reading_once_found():
+    texto = _artifact_html("tok-3", padding="x" * 10000)
+    lidos = []
+
+    def chunks():
+        for i in range(0, len(texto), 100):
+            lidos.append(i)
+            yield texto[i:i + 100]
+
+    assert parse_export_artifact(chunks()) == ("tok-3", STATUS)
+    assert len(lidos) < len(texto) // 100 // 2
+
+
+def test_parse_export_artifact_without_token():
+    assert parse_export_artifact(("<pre>{&#x22;partialMDArtifact&#x22;: {}}</pre>",)) == (None, None)
+
+
+@pytest.mark.parametrize("chunks", [
+    (),
+    ("   ",),
+    ("<html><body>erro interno</body></html>",),
+    ("[1, 2, 3]",),
+    (b"\xff\xfe",),
+    (b'{"partialMDArtifact": {"token": "a\xc3',),
+    (42,),
+])
+def test_parse_export_artifact_malformed_input_raises_value_error(chunks):
+    with pytest.raises(ValueError):
+        parse_export_artifact(chunks)
+
+
+def test_parse_json_stream_html_and_plain():
+    assert parse_json_text("<html><pre>{&quot;a&quot;: [1, 2]}</pre></html>") == {"a": [1, 2]}
+    assert parse_json_stream([b'{"a"', b": 1}"]) == {"a": 1}
+    assert parse_json_text('<p>resultado: {"b": 2} fim</p>') == {"b": 2}
+
+
+@pytest.mark.parametrize("texto", ["", "<p>sem json</p>", "<pre>{quebrado</pre>", '{"a": 1'])
+def test_parse_json_stream_malformed_input_raises_value_error(texto):
+    with pytest.raises(ValueError):
+        parse_json_text(texto)
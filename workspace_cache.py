@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from apigooddata import get_workspace_meta, list_user_projects
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".reporttransfer", "workspaces.json")
+DEFAULT_TTL = 3600
+DEFAULT_MAX_ENTRIES = 1000
+
+logger = logging.getLogger("workspace_cache")
+
+
+class WorkspaceCache:
+    """Cache de nomes de workspace com TTL, despejo LRU e revalidação condicional.
+
+    Entradas vencidas são revalidadas com If-None-Match / If-Modified-Since; um
+    304 apenas renova a entrada. O conteúdo é gravado em disco para a próxima
+    sessão.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                dados = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Cache de workspaces ignorado: %s", e)
+            return
+        with self._lock:
+            for workspace_id, entry in dados.items():
+                self._entries[workspace_id] = entry
+            self._evict()
+
+    def save(self):
+        if not self.path:
+            return
+        # Uma gravação por vez: a última a terminar sempre leva a cópia mais recente.
+        with self._save_lock:
+            with self._lock:
+                dados = dict(self._entries)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Um temporário por gravação: várias threads podem salvar ao mesmo tempo.
+            fd, temporario = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(dados, f, ensure_ascii=False)
+                os.replace(temporario, self.path)
+            except BaseException:
+                os.unlink(temporario)
+                raise
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _store(self, workspace_id, title, etag=None, last_modified=None):
+        with self._lock:
+            self._entries[workspace_id] = {
+                "title": title, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()
+            }
+            self._entries.move_to_end(workspace_id)
+            self._evict()
+
+    def peek(self, workspace_id):
+        """Nome em cache (mesmo vencido), sem acessar a rede."""
+        with self._lock:
+            entry = self._entries.get(workspace_id)
+            return entry["title"] if entry else None
+
+    def get_name(self, workspace_id, cookies):
+        with self._lock:
+            entry = self._entries.get(workspace_id)
+            if entry:
+                self._entries.move_to_end(workspace_id)
+                if time.time() - entry["fetched_at"] < self.ttl:
+                    return entry["title"]
+                entry = dict(entry)
+        if entry:
+            titulo, etag, last_modified = get_workspace_meta(workspace_id, cookies, entry.get("etag"),
+                                                             entry.get("last_modified"))
+            self._store(workspace_id, titulo or entry["title"], etag, last_modified)
+        else:
+            titulo, etag, last_modified = get_workspace_meta(workspace_id, cookies)
+            self._store(workspace_id, titulo, etag, last_modified)
+        self.save()
+        return self.peek(workspace_id)
+
+    def preload(self, cookies):
+        """Carrega todos os workspaces do usuário de uma vez (base do autocompletar)."""
+        projetos = list_user_projects(cookies)
+        for workspace_id, titulo in projetos:
+            self._store(workspace_id, titulo)
+        self.save()
+        return len(projetos)
+
+    def search(self, texto, limit=10):
+        """Workspaces cujo id começa com `texto` ou cujo nome contém `texto`."""
+        texto = texto.strip().lower()
+        if not texto:
+            return []
+        with self._lock:
+            itens = [(workspace_id, entry["title"]) for workspace_id, entry in reversed(self._entries.items())]
+        encontrados = [item for item in itens if item[0].lower().startswith(texto)]
+        encontrados += [item for item in itens if texto in (item[1] or "").lower() and item not in encontrados]
+        return encontrados[:limit]